@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 20:31:48 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to save named variables (results, summaries and
+    configuration) into a directory with one file per variable and a JSON
+    manifest. Numeric arrays are saved as compressed npz files, DataFrames as
+    parquet files (when pyarrow is installed and the frame is supported,
+    otherwise as compressed pickles), small JSON serialisable values inline
+    in the manifest and everything else as compressed pickles:
+
+        manifest.json              {format_version, variables: {key: entry}}
+        <key>-<hash>.<rev>.<ext>   one file per variable
+
+    Adding variables only writes the new files and the manifest, so existing
+    variables are never rewritten, and variables are read lazily one key at
+    a time. Each entry has a revision which is increased whenever the key is
+    overwritten
+
+'''
+
+#%% import necessary libraries
+
+import os
+import re
+import gzip
+import json
+import pickle
+import hashlib
+import numpy as np
+import pandas as pd
+
+#%% define functions
+
+def json_value(value, max_size = 4096):
+
+    ''' Returns the value converted into JSON serialisable types (NumPy
+    scalars into Python scalars), or None if the value cannot be stored in
+    the manifest exactly or its JSON exceeds max_size characters '''
+
+    def convert(value):
+
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        elif isinstance(value, np.generic) and value.dtype.kind in 'biuf':
+            return value.item()
+        elif type(value) is list:
+            return [convert(v) for v in value]
+        elif type(value) is dict and all(isinstance(k, str) for k in value):
+            return dict((k, convert(v)) for k, v in value.items())
+        else:
+            raise TypeError
+
+    try:
+        value = convert(value)
+    except TypeError:
+        return None
+
+    if len(json.dumps(value)) > max_size:
+        return None
+
+    return value
+
+#%% define class
+
+class ArtifactStore:
+
+    format_version = 1
+    manifest_name = 'manifest.json'
+
+    def __init__(self, directory):
+
+        '''
+        Args:
+            directory: path to the store directory, created if it does not
+            exist (str)
+        '''
+
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, self.manifest_name)
+        self._cache = {}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as file_in:
+                manifest = json.load(file_in)
+            if manifest.get('format_version', 0) > self.format_version:
+                raise ValueError('Unknown artifact store format version: %s' % manifest['format_version'])
+            self.variables = manifest['variables']
+        else:
+            self.variables = {}
+
+    @classmethod
+    def exists(cls, directory):
+
+        ''' Checks whether the directory contains an artifact store '''
+
+        return os.path.exists(os.path.join(directory, cls.manifest_name))
+
+    def keys(self):
+        return list(self.variables.keys())
+
+    def __contains__(self, key):
+        return key in self.variables
+
+    def __len__(self):
+        return len(self.variables)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, key):
+
+        ''' Reads a single variable on first access '''
+
+        if key not in self.variables:
+            raise KeyError(key)
+
+        if key not in self._cache:
+            self._cache[key] = self._read(self.variables[key])
+
+        return self._cache[key]
+
+    def load(self, keys = None):
+
+        ''' Reads the given variables
+
+        Args:
+            keys: names of the variables, all variables if None (list)
+        Returns:
+            variables: the variables (dict)
+        '''
+
+        if keys is None:
+            keys = self.keys()
+        elif isinstance(keys, str):
+            keys = [keys]
+
+        return dict((key, self[key]) for key in keys)
+
+    def save(self, variables):
+
+        ''' Writes the given variables and adds them into the manifest, the
+        other variables are left untouched
+
+        Args:
+            variables: variables to save (dict)
+        '''
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        old_files = []
+
+        for key, value in variables.items():
+
+            entry = self.variables.get(key)
+            revision = entry['revision'] + 1 if entry else 1
+
+            if entry and entry.get('file'):
+                old_files.append(entry['file'])
+
+            self.variables[key] = self._write(key, value, revision)
+            self._cache.pop(key, None)
+
+        self._write_manifest()
+
+        # remove the files of overwritten variables only after the manifest
+        # points to the new files
+
+        for fname in old_files:
+            try:
+                os.remove(os.path.join(self.directory, fname))
+            except OSError:
+                pass
+
+    def _file_name(self, key, revision, extension):
+
+        ''' Returns a file name which is unique for the key and revision '''
+
+        safe_key = re.sub(r'[^\w.-]', '_', key)[:64]
+        digest = hashlib.md5(key.encode()).hexdigest()[:8]
+
+        return '%s-%s.%d%s' % (safe_key, digest, revision, extension)
+
+    def _write(self, key, value, revision):
+
+        ''' Writes a single variable and returns its manifest entry '''
+
+        entry = {'revision': revision}
+
+        if isinstance(value, np.ndarray) and value.dtype.kind in 'biufcmM':
+
+            entry.update(kind = 'npz', file = self._file_name(key, revision, '.npz'))
+            self._atomic(entry['file'], lambda file_out: np.savez_compressed(file_out, array = value))
+            return entry
+
+        if isinstance(value, pd.DataFrame):
+
+            entry.update(kind = 'parquet', file = self._file_name(key, revision, '.parquet'))
+            try:
+                self._atomic(entry['file'], lambda file_out: value.to_parquet(file_out))
+                return entry
+            except Exception:
+                pass                                                            # pyarrow missing or unsupported frame
+
+        else:
+
+            value_json = json_value(value)
+
+            if value_json is not None or value is None:
+                entry.update(kind = 'json', value = value_json)
+                return entry
+
+        entry.update(kind = 'pickle', file = self._file_name(key, revision, '.pkl.gz'))
+
+        def dump(file_out):
+            with gzip.GzipFile(fileobj = file_out, mode = 'wb', compresslevel = 6) as gzip_out:
+                pickle.dump(value, gzip_out, protocol = pickle.HIGHEST_PROTOCOL)
+
+        self._atomic(entry['file'], dump)
+
+        return entry
+
+    def _read(self, entry):
+
+        ''' Reads a single variable from its manifest entry '''
+
+        if entry['kind'] == 'json':
+            return entry['value']
+
+        file_path = os.path.join(self.directory, entry['file'])
+
+        if entry['kind'] == 'npz':
+            with np.load(file_path, allow_pickle = False) as npz:
+                return npz['array']
+        elif entry['kind'] == 'parquet':
+            return pd.read_parquet(file_path)
+        elif entry['kind'] == 'pickle':
+            with gzip.open(file_path, 'rb') as file_in:
+                return pickle.load(file_in)
+        else:
+            raise ValueError('Unknown artifact kind: %s' % entry['kind'])
+
+    def _atomic(self, fname, write):
+
+        ''' Writes a file through a temporary file so that a reader never
+        sees a partially written file '''
+
+        file_path = os.path.join(self.directory, fname)
+        tmp_path = file_path + '.tmp'
+
+        try:
+            with open(tmp_path, 'wb') as file_out:
+                write(file_out)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, file_path)
+
+    def _write_manifest(self):
+
+        manifest = json.dumps({'format_version': self.format_version,
+                               'variables': self.variables}, indent = 1)
+
+        self._atomic(self.manifest_name, lambda file_out: file_out.write(manifest.encode()))
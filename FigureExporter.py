@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 20:58:14 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to save figures into files in background processes.
+    Each exported figure is pickled and rendered into the selected formats
+    (and dpi) by a separate Python process using the non-interactive Agg
+    backend (at most max_workers at a time), so that the script can continue
+    (e.g. saving the variables) while the figures are written. The rendering
+    processes run this file instead of forking or re-importing the calling
+    script, which is safe in IPython and on Windows. The hash of the data
+    plotted in each figure is saved into figures.json in the output
+    directory, and figures whose data, formats and dpi have not changed since
+    the last export are not rendered again. Since the scripts write each run
+    into a new directory, the rendered files can also be kept in a cache
+    directory shared by the runs (cache_dir), from which unchanged figures
+    are copied instead of rendered
+
+'''
+
+#%% import necessary libraries
+
+import os
+import json
+import shutil
+import pickle
+import hashlib
+import sys
+import subprocess
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+#%% define functions
+
+def initialise_worker():
+
+    ''' Selects the non-interactive backend in the rendering processes '''
+
+    import matplotlib
+    matplotlib.use('Agg', force = True)
+
+
+def run_renderer(figure_bytes, file_paths, dpi):
+
+    ''' Renders a pickled figure in a new Python process (see render_figure) '''
+
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), str(dpi)] + list(file_paths),
+                             input = figure_bytes, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.decode(errors = 'replace').strip().split('\n')[-1])
+
+    return file_paths
+
+
+def render_figure(figure_bytes, file_paths, dpi):
+
+    ''' Renders a pickled figure into the given files (the format is
+    defined by the file extension)
+
+    Args:
+        figure_bytes: pickled figure (bytes)
+        file_paths: paths of the output files (list)
+        dpi: resolution of the raster formats (int)
+    Returns:
+        file_paths: paths of the written files (list)
+    '''
+
+    import matplotlib.pyplot as plt
+
+    figure = pickle.loads(figure_bytes)
+
+    for file_path in file_paths:
+
+        filetype = os.path.splitext(file_path)[1][1:]
+        tmp_path = file_path + '.tmp'
+
+        figure.savefig(tmp_path, dpi = dpi, format = filetype, bbox_inches = 'tight', pad_inches = 0)
+        os.replace(tmp_path, file_path)
+
+    plt.close(figure)
+
+    return file_paths
+
+
+def data_hash(data):
+
+    ''' Returns a hash of the data plotted in a figure
+
+    Args:
+        data: DataFrame, Series, ndarray or a list/tuple of them (any
+        picklable value is accepted)
+    Returns:
+        hash: hexadecimal SHA-1 digest (str)
+    '''
+
+    digest = hashlib.sha1()
+
+    def update(value):
+
+        if isinstance(value, (list, tuple)):
+            for v in value:
+                update(v)
+            return
+
+        try:
+            if isinstance(value, pd.DataFrame):
+                digest.update(repr((list(value.columns), list(value.dtypes.astype(str)))).encode())
+                digest.update(pd.util.hash_pandas_object(value, index = True).values.tobytes())
+                return
+            elif isinstance(value, pd.Series):
+                digest.update(repr((value.name, str(value.dtype))).encode())
+                digest.update(pd.util.hash_pandas_object(value, index = True).values.tobytes())
+                return
+            elif isinstance(value, np.ndarray) and value.dtype.kind != 'O':
+                digest.update(repr((value.dtype.str, value.shape)).encode())
+                digest.update(np.ascontiguousarray(value).tobytes())
+                return
+        except TypeError:
+            pass                                                                # unhashable objects
+
+        digest.update(pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL))
+
+    update(data)
+
+    return digest.hexdigest()
+
+#%% define class
+
+class FigureExporter:
+
+    manifest_name = 'figures.json'
+
+    def __init__(self, directory, formats = ['pdf', 'png', 'eps'], dpi = 600, max_workers = None,
+                 cache_dir = None):
+
+        '''
+        Args:
+            directory: output directory of the figures (str)
+            formats: file formats of each figure (list)
+            dpi: resolution of the raster formats (int)
+            max_workers: number of rendering processes (int, None for up to
+            four processes and 0 for rendering in the calling process)
+            cache_dir: directory of rendered figures shared by the runs, keyed
+            by the name, data, formats and dpi of each figure (str, None for
+            no cache)
+        '''
+
+        self.directory = directory
+        self.formats = list(formats)
+        self.dpi = dpi
+        self.max_workers = min(4, os.cpu_count() or 1) if max_workers is None else max_workers
+        self.cache_dir = cache_dir
+
+        self.manifest_path = os.path.join(directory, self.manifest_name)
+        self.manifest = {}
+        self.pending = {}
+        self.executor = None
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as file_in:
+                self.manifest = json.load(file_in)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def file_paths(self, name):
+        return [os.path.join(self.directory, '%s.%s' % (name, filetype)) for filetype in self.formats]
+
+    def cache_paths(self, name, figure_hash):
+        key = hashlib.sha1(('%s:%s' % (name, figure_hash)).encode()).hexdigest()
+        return [os.path.join(self.cache_dir, key, '%s.%s' % (name, filetype)) for filetype in self.formats]
+
+    def copy_files(self, source_paths, target_paths):
+
+        ''' Copies the rendered files (through temporary files, so that a
+        partially copied file is never left behind) '''
+
+        for source_path, target_path in zip(source_paths, target_paths):
+            directory = os.path.dirname(target_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            shutil.copyfile(source_path, target_path + '.tmp')
+            os.replace(target_path + '.tmp', target_path)
+
+    def rendered(self, name, figure_hash):
+
+        ''' Records a rendered figure in the manifest and in the cache '''
+
+        self.manifest[name] = figure_hash
+
+        if self.cache_dir is not None and figure_hash is not None:
+            self.copy_files(self.file_paths(name), self.cache_paths(name, figure_hash))
+
+    def export(self, name, figure, data = None):
+
+        ''' Queues a figure for rendering
+
+        Args:
+            name: file name of the figure without extension (str)
+            figure: the figure (matplotlib Figure)
+            data: data plotted in the figure, used to skip rendering when
+            unchanged (always rendered if None)
+        Returns:
+            queued: whether the figure was queued for rendering (bool)
+        '''
+
+        file_paths = self.file_paths(name)
+
+        if data is None:
+            figure_hash = None
+        else:
+            figure_hash = '%s:%s:%s' % (','.join(self.formats), self.dpi, data_hash(data))
+
+            if (self.manifest.get(name) == figure_hash and
+                all(os.path.exists(file_path) for file_path in file_paths)):
+                return False
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        # copy unchanged figures rendered by earlier runs from the cache
+
+        if self.cache_dir is not None and figure_hash is not None:
+
+            cache_paths = self.cache_paths(name, figure_hash)
+
+            if all(os.path.exists(cache_path) for cache_path in cache_paths):
+                self.copy_files(cache_paths, file_paths)
+                self.manifest[name] = figure_hash
+                self.write_manifest()
+                return False
+
+        # the figure is pickled immediately, so later changes to it (or
+        # closing it) do not affect the exported files
+
+        figure_bytes = pickle.dumps(figure, protocol = pickle.HIGHEST_PROTOCOL)
+
+        if self.max_workers == 0:
+            render_figure(figure_bytes, file_paths, self.dpi)
+            self.rendered(name, figure_hash)
+            self.write_manifest()
+            return True
+
+        # the threads only wait for the rendering processes
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers = self.max_workers)
+
+        self.pending[name] = (self.executor.submit(run_renderer, figure_bytes, file_paths, self.dpi),
+                              figure_hash)
+
+        return True
+
+    def wait(self):
+
+        ''' Waits until the queued figures are written and updates the
+        manifest, errors of the rendering processes are raised here '''
+
+        errors = []
+
+        for name, (future, figure_hash) in self.pending.items():
+            try:
+                future.result()
+                self.rendered(name, figure_hash)
+            except Exception as error:
+                self.manifest.pop(name, None)
+                errors.append('%s: %s' % (name, error))
+
+        self.pending = {}
+        self.write_manifest()
+
+        if errors:
+            raise RuntimeError('Figure export failed for %s' % '; '.join(errors))
+
+    def close(self):
+
+        ''' Waits for the queued figures and shuts down the processes '''
+
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+    def write_manifest(self):
+
+        if not os.path.exists(self.directory) or (not self.manifest and not os.path.exists(self.manifest_path)):
+            return
+
+        tmp_path = self.manifest_path + '.tmp'
+
+        with open(tmp_path, 'w') as file_out:
+            json.dump(self.manifest, file_out, indent = 1)
+
+        os.replace(tmp_path, self.manifest_path)
+
+#%% render a figure from stdin (used by run_renderer)
+
+if __name__ == '__main__':
+
+    initialise_worker()
+    render_figure(sys.stdin.buffer.read(), sys.argv[2:], int(sys.argv[1]))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 09:12:41 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to checkpoint the results of long iteration loops so
+    that a killed run can be resumed by skipping the finished cells. Each
+    (iteration, random state, number of features, model) result is written
+    into its own file as soon as it has been completed. A hash of the run
+    configuration is stored with the checkpoint, and a run with a different
+    configuration is not allowed to resume from it
+
+'''
+
+#%% import necessary libraries
+
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
+
+#%% define class
+
+class IterationCheckpoint:
+
+    def __init__(self, checkpoint_dir, config = None):
+        self.checkpoint_dir = checkpoint_dir
+        if not os.path.exists(checkpoint_dir):
+            os.makedirs(checkpoint_dir)
+        if config is not None:
+            self.check_config(config)
+
+    def check_config(self, config):
+
+        ''' Stores the hash of the run configuration in a new checkpoint, or
+        compares it with the stored hash when a run is resumed.
+
+        Args:
+            config: parameters which affect the results of the cells (dict)
+        Raises:
+            ValueError: if the checkpoint was created with another configuration
+        '''
+
+        config_hash = hashlib.sha1(json.dumps(config, sort_keys = True, 
+                                              default = repr).encode('utf-8')).hexdigest()
+
+        file_path = os.path.join(self.checkpoint_dir, 'config_hash.txt')
+
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as file_in:
+                saved_hash = file_in.read().strip()
+            if saved_hash != config_hash:
+                raise ValueError('Checkpoint %s was created with a different configuration, '
+                                 'use a new checkpoint_dir' % self.checkpoint_dir)
+        else:
+            tmp_path = file_path + '.tmp'
+            with open(tmp_path, 'w') as file_out:
+                file_out.write(config_hash)
+            os.replace(tmp_path, file_path)
+
+    def random_states(self, n_iterations):
+
+        ''' Returns the random states of the run. States of previously started
+        iterations are loaded from the checkpoint and only the missing ones
+        are drawn, so that a resumed run repeats the same splits.
+
+        Args:
+            n_iterations: number of iterations (int)
+        Returns:
+            random_states: random state for each iteration (list)
+        '''
+
+        file_path = os.path.join(self.checkpoint_dir, 'random_states.pkl')
+
+        if os.path.exists(file_path):
+            with open(file_path, 'rb') as pickle_in:
+                random_states = pickle.load(pickle_in)
+        else:
+            random_states = []
+
+        if len(random_states) < n_iterations:
+            while len(random_states) < n_iterations:
+                random_states.append(np.random.randint(0, 10000))
+            self._dump(random_states, file_path)
+
+        return random_states[0:n_iterations]
+
+    def is_done(self, iteration, random_state, n, model):
+        return os.path.exists(self._cell_path(iteration, random_state, n, model))
+
+    def is_iteration_done(self, iteration, random_state, n_features, models):
+        return all(self.is_done(iteration, random_state, n, model)
+                   for n in n_features for model in models)
+
+    def save(self, iteration, random_state, n, model, result):
+        self._dump(result, self._cell_path(iteration, random_state, n, model))
+
+    def load(self, iteration, random_state, n, model):
+        with open(self._cell_path(iteration, random_state, n, model), 'rb') as pickle_in:
+            return pickle.load(pickle_in)
+
+    def _cell_path(self, iteration, random_state, n, model):
+
+        # the iteration is part of the key, because the same random state
+        # can be drawn for more than one iteration
+
+        fname = 'IT%d_RS%d_NF%d_%s.pkl' % (iteration, random_state, n, model)
+        return os.path.join(self.checkpoint_dir, fname)
+
+    def _dump(self, variables, file_path):
+
+        # write into a temporary file first so that a killed run never
+        # leaves a partially written checkpoint behind
+
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as pickle_out:
+            pickle.dump(variables, pickle_out)
+        os.replace(tmp_path, file_path)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 19:52:33 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to save and load trained models as single-file
+    bundles for inference. A bundle contains only the fitted pre-processing
+    (without the oversampler), the fitted estimator, the feature list and
+    metadata. The file consists of an uncompressed joblib payload, whose
+    NumPy arrays are memory-mapped when loaded, followed by a JSON metadata
+    trailer:
+
+        [joblib payload][JSON metadata][metadata length (8 bytes)][magic]
+
+    The metadata is read from the end of the file without deserialising the
+    payload, and the payload is loaded lazily when the model or the
+    pre-processing is first accessed
+
+'''
+
+#%% import necessary libraries
+
+import os
+import copy
+import json
+import time
+import struct
+import joblib
+import sklearn
+
+#%% define class
+
+class ModelBundle:
+
+    magic = b'FIBRBNDL'
+    format_version = 1
+
+    def __init__(self, file_path, mmap_mode = 'c'):
+
+        '''
+        Args:
+            file_path: path to the bundle file (str)
+            mmap_mode: memory-map mode of the NumPy arrays ('c' for
+            copy-on-write, which some Cython estimators such as SVC require,
+            'r' or None)
+        '''
+
+        self.file_path = file_path
+        self.mmap_mode = mmap_mode
+        self.metadata = self.read_metadata(file_path)
+        self.feature_labels = self.metadata['feature_labels']
+        self._payload = None
+
+    @property
+    def model(self):
+        return self.payload()['model']
+
+    @property
+    def preprocessing(self):
+        return self.payload()['preprocessing']
+
+    def payload(self):
+
+        ''' Loads the payload on first access '''
+
+        if self._payload is None:
+            self._payload = joblib.load(self.file_path, mmap_mode = self.mmap_mode)
+
+        return self._payload
+
+    @classmethod
+    def read_metadata(cls, file_path):
+
+        ''' Reads the metadata trailer of a bundle
+
+        Args:
+            file_path: path to the bundle file (str)
+        Returns:
+            metadata: metadata of the bundle (dict)
+        '''
+
+        with open(file_path, 'rb') as file_in:
+
+            file_in.seek(-(8 + len(cls.magic)), os.SEEK_END)
+            length, magic = struct.unpack('<Q%ds' % len(cls.magic), file_in.read(8 + len(cls.magic)))
+
+            if magic != cls.magic:
+                raise ValueError('Not a model bundle: %s' % file_path)
+
+            file_in.seek(-(8 + len(cls.magic) + length), os.SEEK_END)
+
+            return json.loads(file_in.read(length).decode())
+
+    @classmethod
+    def is_bundle(cls, file_path):
+
+        ''' Checks whether the file is a model bundle '''
+
+        try:
+            cls.read_metadata(file_path)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    @classmethod
+    def save(cls, file_path, preprocessing, model, metadata = None):
+
+        ''' Saves the fitted pre-processing and model into a bundle
+
+        Args:
+            file_path: path to the bundle file (str)
+            preprocessing: fitted pre-processing (PreprocessingPipeline)
+            model: fitted estimator
+            metadata: additional metadata such as scores and parameters,
+            has to be JSON serialisable (dict)
+        Returns:
+            metadata: metadata of the bundle (dict)
+        '''
+
+        # the oversampler is only needed for training
+
+        preprocessing = copy.copy(preprocessing)
+        preprocessing.oversampler = None
+
+        bundle_metadata = {'format_version': cls.format_version,
+                           'created': time.strftime('%Y%m%d-%H%M%S'),
+                           'model': type(model).__name__,
+                           'feature_labels': list(preprocessing.feature_labels),
+                           'classes': [c.item() if hasattr(c, 'item') else c
+                                       for c in getattr(model, 'classes_', [])],
+                           'sklearn_version': sklearn.__version__}
+        bundle_metadata.update(metadata or {})
+
+        trailer = json.dumps(bundle_metadata, default = str).encode()
+
+        # write into a temporary file first so that a service never loads a
+        # partially written bundle
+
+        tmp_path = file_path + '.tmp'
+
+        with open(tmp_path, 'wb') as file_out:
+            joblib.dump({'preprocessing': preprocessing, 'model': model}, file_out)
+            file_out.write(trailer)
+            file_out.write(struct.pack('<Q%ds' % len(cls.magic), len(trailer), cls.magic))
+
+        os.replace(tmp_path, file_path)
+
+        return bundle_metadata
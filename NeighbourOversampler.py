@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 18:41:27 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to oversample the minority classes with SMOTE or
+    ADASYN using KD-trees for the nearest neighbour search. A KD-tree is
+    built once for each class (and once for all samples with ADASYN) and
+    queried for all samples at once. The trees are cached by the content of
+    the samples, so the SMOTE and ADASYN resamples (and repeated resamples)
+    of the same split share their trees. The synthetic samples are then
+    generated in a single vectorised batch for each class. The random
+    numbers are drawn in the same order as in imbalanced-learn, so the
+    output follows the same distribution as imblearn's SMOTE and ADASYN
+    (and is identical for a fixed random_state unless the data has
+    equidistant neighbours, which the two searches may order differently)
+
+'''
+
+#%% import necessary libraries
+
+import hashlib
+import numpy as np
+
+from scipy.spatial import cKDTree
+from sklearn.base import BaseEstimator
+from sklearn.utils import check_random_state
+from imblearn.utils import check_sampling_strategy
+
+#%% define functions
+
+_tree_cache = {}
+_max_trees = 32
+
+def neighbour_tree(X):
+
+    ''' Returns the KD-tree of the samples, building it only if the same
+    samples have not been used recently '''
+
+    X = np.ascontiguousarray(X)
+    key = (X.shape, X.dtype.str, hashlib.sha1(X.tobytes()).hexdigest())
+
+    if key not in _tree_cache:
+        if len(_tree_cache) >= _max_trees:
+            del _tree_cache[next(iter(_tree_cache))]
+        _tree_cache[key] = cKDTree(X)
+
+    return _tree_cache[key]
+
+
+def query_neighbours(tree, X, k):
+
+    ''' Returns the indices of the k nearest neighbours of each sample,
+    excluding the sample itself '''
+
+    try:
+        _, indices = tree.query(X, k = k + 1, workers = -1)
+    except TypeError:
+        _, indices = tree.query(X, k = k + 1, n_jobs = -1)
+
+    return indices[:, 1:]
+
+#%% define class
+
+class NeighbourOversampler(BaseEstimator):
+
+    def __init__(self, strategy = 'smote', sampling_strategy = 'not majority', k_neighbors = 5,
+                 n_neighbors = 5, random_state = None):
+
+        '''
+        Args:
+            strategy: oversampling method ('smote' or 'adasyn')
+            sampling_strategy: classes to oversample (str or dict, see imblearn)
+            k_neighbors: number of class neighbours used to generate samples (int)
+            n_neighbors: number of neighbours used to weight the samples in
+            ADASYN (int)
+            random_state: random state of the sample generation (int)
+        '''
+
+        self.strategy = strategy
+        self.sampling_strategy = sampling_strategy
+        self.k_neighbors = k_neighbors
+        self.n_neighbors = n_neighbors
+        self.random_state = random_state
+
+    def fit_resample(self, X, y):
+
+        '''
+        Args:
+            X: features (ndarray)
+            y: targets (ndarray)
+        Returns:
+            X_resampled: original and synthetic features (ndarray)
+            y_resampled: original and synthetic targets (ndarray)
+        '''
+
+        if self.strategy not in ('smote', 'adasyn'):
+            raise ValueError('Unknown oversampling strategy: %s' % self.strategy)
+
+        X = np.asarray(X)
+        y = np.asarray(y)
+
+        self.sampling_strategy_ = check_sampling_strategy(self.sampling_strategy, y, 'over-sampling')
+
+        random_state = check_random_state(self.random_state)
+
+        if self.strategy == 'adasyn':
+            tree = neighbour_tree(X)
+
+        X_resampled = [X.copy()]
+        y_resampled = [y.copy()]
+
+        for class_sample, n_samples in self.sampling_strategy_.items():
+
+            if n_samples == 0:
+                continue
+
+            X_class = X[y == class_sample]
+
+            # each sample needs k_neighbors neighbours in addition to itself
+
+            if self.k_neighbors + 1 > len(X_class):
+                raise ValueError('Expected n_neighbors <= n_samples_fit, but n_neighbors = %d, '
+                                 'n_samples_fit = %d, n_samples = %d' % (self.k_neighbors + 1,
+                                                                        len(X_class), len(X_class)))
+
+            class_neighbours = query_neighbours(neighbour_tree(X_class), X_class, self.k_neighbors)
+
+            if self.strategy == 'smote':
+
+                # draw the samples uniformly over all sample-neighbour pairs
+                # (imblearn restarts the random state for each class)
+
+                random_state = check_random_state(self.random_state)
+                indices = random_state.randint(low = 0, high = class_neighbours.size, size = n_samples)
+                steps = random_state.uniform(size = n_samples)[:, np.newaxis]
+
+                rows = np.floor_divide(indices, class_neighbours.shape[1])
+                cols = np.mod(indices, class_neighbours.shape[1])
+
+            else:
+
+                # weight the samples by the proportion of other classes among
+                # their neighbours
+
+                neighbours = query_neighbours(tree, X_class, self.n_neighbors)
+                ratio = np.sum(y[neighbours] != class_sample, axis = 1) / self.n_neighbors
+
+                if not np.sum(ratio):
+                    raise RuntimeError('No neighbours belong to the other classes, use SMOTE instead')
+
+                ratio /= np.sum(ratio)
+                n_generate = np.rint(ratio * n_samples).astype(int)
+                n_samples = np.sum(n_generate)
+
+                if not n_samples:
+                    raise ValueError('No samples will be generated with the provided ratio settings')
+
+                rows = np.repeat(np.arange(len(X_class)), n_generate)
+                cols = random_state.choice(self.k_neighbors, size = n_samples)
+                steps = random_state.uniform(size = (n_samples, 1))
+
+            X_new = X_class[rows] + steps * (X_class[class_neighbours[rows, cols]] - X_class[rows])
+
+            X_resampled.append(X_new.astype(X.dtype))
+            y_resampled.append(np.full(n_samples, fill_value = class_sample, dtype = y.dtype))
+
+        return np.vstack(X_resampled), np.hstack(y_resampled)
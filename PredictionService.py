@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 19:15:06 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to predict the treatment outcome of new patients with
+    a trained scikit model. The model bundle or directory (saved by
+    fibroid_softmax_classification_scikit.py) is loaded once, and each
+    request of patient rows is pre-processed with the saved pre-processing
+    chain and predicted with the saved model. Concurrent requests are
+    collected into micro-batches by a worker thread, so that the
+    pre-processing and prediction are done once for the whole batch.
+
+    The service can be run from the command line using either a local HTTP
+    server or JSON lines through stdin/stdout:
+
+        python PredictionService.py <model_dir or bundle> --port 8000
+        python PredictionService.py <model_dir or bundle> --stdin < patients.jsonl
+
+    Each request is a JSON object of one patient (feature name: value) or a
+    list of them, missing features are imputed if an imputer was fitted.
+    Requests with unknown features or missing values of features without an
+    imputer are rejected on their own, without failing the micro-batch.
+    HTTP requests are sent with POST to /predict and GET /health returns the
+    features of the model
+
+'''
+
+#%% import necessary libraries
+
+import os
+import sys
+import json
+import queue
+import pickle
+import argparse
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PreprocessingPipeline import PreprocessingPipeline
+from ModelBundle import ModelBundle
+
+#%% define functions
+
+def load_model_directory(model_dir):
+
+    ''' Loads the pre-processing chain and the model from a model bundle or
+    directory. Directories without model.bundle or preprocessing.joblib are
+    loaded from the separate imputer, discretiser and scaler files and the
+    saved variables
+
+    Args:
+        model_dir: path to the model directory or bundle file (str)
+    Returns:
+        preprocessing: fitted pre-processing (PreprocessingPipeline)
+        model: fitted model (estimator)
+    '''
+
+    if os.path.isdir(model_dir) and os.path.exists(os.path.join(model_dir, 'model.bundle')):
+        model_dir = os.path.join(model_dir, 'model.bundle')
+
+    if os.path.isfile(model_dir):
+        bundle = ModelBundle(model_dir)
+        return bundle.preprocessing, bundle.model
+
+    with open(os.path.join(model_dir, 'scikit_model.pkl'), 'rb') as pickle_in:
+        model = pickle.load(pickle_in)
+
+    file_path = os.path.join(model_dir, 'preprocessing.joblib')
+
+    if os.path.exists(file_path):
+        return joblib.load(file_path), model
+
+    # rebuild the pre-processing of older model directories
+
+    with open(os.path.join(model_dir, 'variables.pkl'), 'rb') as pickle_in:
+        variables = pickle.load(pickle_in)
+
+    preprocessing = PreprocessingPipeline(variables['feature_labels'],
+                                          impute_mean = variables.get('impute_mean', []),
+                                          impute_mode = variables.get('impute_mode', []),
+                                          impute_cons = variables.get('impute_cons', []),
+                                          discretise = variables.get('discretise', []),
+                                          scaling_type = variables.get('scaling_type'))
+
+    for attribute, fname in (('imputer_mean', 'imputer_mean.joblib'),
+                             ('imputer_mode', 'imputer_mode.joblib'),
+                             ('imputer_cons', 'imputer_cons.joblib'),
+                             ('discretiser', 'discretiser.joblib'),
+                             ('scaler', 'scaler.joblib')):
+        file_path = os.path.join(model_dir, fname)
+        if os.path.exists(file_path):
+            setattr(preprocessing, attribute, joblib.load(file_path))
+
+    return preprocessing, model
+
+
+def to_json(value):
+
+    ''' Converts NumPy values into JSON serialisable values '''
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        return value
+
+#%% define class
+
+class PredictionService:
+
+    def __init__(self, model_dir, max_batch_size = 256, max_latency = 0.005):
+
+        '''
+        Args:
+            model_dir: path to the model directory or bundle file (str)
+            max_batch_size: maximum number of patients in a micro-batch (int)
+            max_latency: maximum time to wait for more requests before
+            predicting a micro-batch (float, seconds)
+        '''
+
+        self.preprocessing, self.model = load_model_directory(model_dir)
+        self.feature_labels = self.preprocessing.feature_labels
+        self.max_batch_size = max_batch_size
+
+        # features which can be missing (imputed by the pre-processing)
+
+        imputed_labels = set()
+
+        for imputer, labels in ((self.preprocessing.imputer_mean, self.preprocessing.impute_mean),
+                                (self.preprocessing.imputer_mode, self.preprocessing.impute_mode),
+                                (self.preprocessing.imputer_cons, self.preprocessing.impute_cons)):
+            if imputer is not None:
+                imputed_labels.update(labels)
+
+        self.required = np.array([label not in imputed_labels for label in self.feature_labels])
+        self.max_latency = max_latency
+
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target = self.run, daemon = True)
+        self.worker.start()
+
+    def submit(self, rows):
+
+        ''' Submits patient rows for prediction
+
+        Args:
+            rows: patients (dict or list of dicts)
+        Returns:
+            future: future of the predictions of the rows (Future)
+        '''
+
+        if isinstance(rows, dict):
+            rows = [rows]
+
+        future = Future()
+
+        # convert and check the rows in the calling thread, so that invalid
+        # requests fail without affecting the other requests of the micro-batch
+
+        try:
+            features = self.check_rows(rows)
+        except Exception as error:
+            future.set_exception(error)
+            return future
+
+        self.requests.put((features, future))
+
+        return future
+
+    def check_rows(self, rows):
+
+        ''' Converts the patient rows into an array of features in the order
+        of feature_labels
+
+        Args:
+            rows: patients (list of dicts)
+        Returns:
+            features: features of the patients (ndarray)
+        Raises:
+            ValueError: if the rows contain unknown features or missing values
+            of features which are not imputed
+        '''
+
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError('Unknown request format: each patient must be a JSON object')
+
+        unknown = sorted(set(key for row in rows for key in row) - set(self.feature_labels))
+
+        if unknown:
+            raise ValueError('Unknown features: %s' % ', '.join(map(str, unknown)))
+
+        features = pd.DataFrame(rows, columns = self.feature_labels, dtype = np.float64).values
+
+        missing = self.required & np.isnan(features).any(axis = 0)
+
+        if missing.any():
+            raise ValueError('Missing values of features: %s' % 
+                             ', '.join(np.array(self.feature_labels)[missing]))
+
+        return features
+
+    def predict(self, rows, timeout = None):
+
+        ''' Predicts patient rows and waits for the result (see submit) '''
+
+        return self.submit(rows).result(timeout)
+
+    def run(self):
+
+        ''' Collects the requests into micro-batches and predicts them '''
+
+        while True:
+
+            batch = [self.requests.get()]
+            n_rows = len(batch[0][0])
+
+            # wait for more requests until the batch is full or the latency
+            # limit is reached
+
+            while n_rows < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout = self.max_latency)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                n_rows += len(request[0])
+
+            try:
+                predictions = self.predict_batch(np.vstack([features for features, _ in batch]))
+            except Exception:
+                self.predict_requests(batch)
+                continue
+
+            start = 0
+
+            for features, future in batch:
+                future.set_result(predictions[start:start + len(features)])
+                start += len(features)
+
+    def predict_requests(self, batch):
+
+        ''' Predicts the requests of a failed micro-batch one at a time, so
+        that only the invalid requests fail '''
+
+        for features, future in batch:
+            try:
+                future.set_result(self.predict_batch(features))
+            except Exception as error:
+                future.set_exception(error)
+
+    def predict_batch(self, features):
+
+        ''' Pre-processes and predicts a batch of patients
+
+        Args:
+            features: features of the patients in the order of feature_labels (ndarray)
+        Returns:
+            predictions: predicted class and class probabilities of each
+            patient (list of dicts)
+        '''
+
+        features = self.preprocessing.transform(features)
+
+        classes = self.model.predict(features)
+        predictions = [{'prediction': to_json(c)} for c in classes]
+
+        if hasattr(self.model, 'predict_proba'):
+            probabilities = self.model.predict_proba(features)
+            for prediction, p in zip(predictions, probabilities):
+                prediction['probabilities'] = dict((str(to_json(c)), float(value))
+                                                   for c, value in zip(self.model.classes_, p))
+
+        return predictions
+
+    def serve_http(self, host = '127.0.0.1', port = 8000):
+
+        ''' Serves the predictions with a local HTTP server '''
+
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def respond(self, status, content):
+                body = json.dumps(content).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/health':
+                    self.respond(200, {'features': service.feature_labels})
+                else:
+                    self.respond(404, {'error': 'Unknown path: %s' % self.path})
+
+            def do_POST(self):
+                if self.path != '/predict':
+                    self.respond(404, {'error': 'Unknown path: %s' % self.path})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    rows = json.loads(self.rfile.read(length))
+                    self.respond(200, {'predictions': service.predict(rows)})
+                except Exception as error:
+                    self.respond(400, {'error': str(error)})
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        print('Serving predictions at http://%s:%d/predict' % (host, port))
+
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+    def serve_stdin(self, stdin = sys.stdin, stdout = sys.stdout):
+
+        ''' Reads one JSON request per line from stdin and writes the
+        predictions of each request as one JSON line into stdout (in the same
+        order). The lines are submitted without waiting, so that they are
+        predicted in micro-batches '''
+
+        futures = []
+
+        def write(future):
+            try:
+                content = {'predictions': future.result()}
+            except Exception as error:
+                content = {'error': str(error)}
+            stdout.write(json.dumps(content) + '\n')
+
+        for line in stdin:
+
+            if not line.strip():
+                continue
+
+            try:
+                futures.append(self.submit(json.loads(line)))
+            except ValueError as error:
+                future = Future()
+                future.set_exception(error)
+                futures.append(future)
+
+            while futures and futures[0].done():
+                write(futures.pop(0))
+
+        for future in futures:
+            write(future)
+
+        stdout.flush()
+
+#%% run service
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Predict treatment outcomes with a trained model')
+    parser.add_argument('model_dir', help = 'path to the model directory or bundle file')
+    parser.add_argument('--stdin', action = 'store_true', help = 'read JSON lines from stdin')
+    parser.add_argument('--host', default = '127.0.0.1', help = 'host of the HTTP server')
+    parser.add_argument('--port', type = int, default = 8000, help = 'port of the HTTP server')
+    parser.add_argument('--max_batch_size', type = int, default = 256, help = 'maximum micro-batch size')
+    parser.add_argument('--max_latency', type = float, default = 0.005, help = 'maximum micro-batch wait (s)')
+    args = parser.parse_args()
+
+    service = PredictionService(args.model_dir, max_batch_size = args.max_batch_size,
+                                max_latency = args.max_latency)
+
+    if args.stdin:
+        service.serve_stdin()
+    else:
+        service.serve_http(args.host, args.port)
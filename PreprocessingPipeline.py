@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 16:58:20 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to pre-process the features for the classification
+    models (impute, oversample, discretise and scale). The features are
+    converted once into a contiguous float64 array, after which every step
+    operates on the array in place (apart from oversampling, which adds new
+    samples). The pipeline is fitted with the training set and the fitted
+    imputers, oversampler, discretiser and scaler are kept as attributes, so
+    that the same pre-processing can be applied to the testing set or new
+    data
+
+'''
+
+#%% import necessary libraries
+
+import numpy as np
+
+from sklearn.preprocessing import MinMaxScaler, StandardScaler, KBinsDiscretizer
+from sklearn.impute import SimpleImputer
+from imblearn.over_sampling import RandomOverSampler
+
+from NeighbourOversampler import NeighbourOversampler
+
+#%% define functions
+
+def create_oversampler(oversample, random_state = None):
+
+    ''' Returns the oversampler of the given strategy
+
+    Args:
+        oversample: oversampling strategy ('random', 'smote', 'adasyn' or None)
+        random_state: random state of the oversampling (int)
+    Returns:
+        oversampler: unfitted oversampler (or None)
+    '''
+
+    if oversample == 'random':
+        return RandomOverSampler(sampling_strategy = 'not majority', random_state = random_state)
+    elif oversample in ('smote', 'adasyn'):
+        return NeighbourOversampler(oversample, sampling_strategy = 'not majority', 
+                                    random_state = random_state)
+    elif oversample is None:
+        return None
+    else:
+        raise ValueError('Unknown oversampling strategy: %s' % oversample)
+
+#%% define class
+
+class PreprocessingPipeline:
+
+    def __init__(self, feature_labels, impute_mean = [], impute_mode = [], impute_cons = [],
+                 oversample = None, discretise = [], scaling_type = None, random_state = None):
+
+        '''
+        Args:
+            feature_labels: names of the features in the order of the columns (list)
+            impute_mean: features imputed with mean (list)
+            impute_mode: features imputed with mode (list)
+            impute_cons: features imputed with zero (list)
+            oversample: oversampling strategy ('random', 'smote', 'adasyn' or None)
+            discretise: features discretised into 10 uniform bins (list)
+            scaling_type: type of scaling ('log', 'minmax', 'standard' or None)
+            random_state: random state of the oversampling (int)
+        '''
+
+        self.feature_labels = list(feature_labels)
+        self.impute_mean = list(impute_mean)
+        self.impute_mode = list(impute_mode)
+        self.impute_cons = list(impute_cons)
+        self.oversample = oversample
+        self.discretise = list(discretise)
+        self.scaling_type = scaling_type
+        self.random_state = random_state
+
+        self.imputer_mean = None
+        self.imputer_mode = None
+        self.imputer_cons = None
+        self.oversampler = None
+        self.discretiser = None
+        self.scaler = None
+
+    def columns(self, labels):
+
+        ''' Returns the column indices of the given features '''
+
+        return [self.feature_labels.index(label) for label in labels]
+
+    def to_array(self, features):
+
+        ''' Converts the features into a contiguous float64 array (a single
+        copy, which the following steps modify in place) '''
+
+        if hasattr(features, 'columns'):
+            features = features[self.feature_labels].values
+
+        return np.array(features, dtype = np.float64, order = 'C')
+
+    def fit_transform(self, features, targets):
+
+        '''
+        Args:
+            features: training features (DataFrame or ndarray)
+            targets: training targets (DataFrame, Series or ndarray)
+        Returns:
+            features: pre-processed training features (ndarray)
+            targets: training targets including oversampled samples (ndarray)
+        '''
+
+        X = self.to_array(features)
+        y = np.asarray(targets).ravel()
+
+        # impute features
+
+        if self.impute_mean:
+            self.imputer_mean = SimpleImputer(missing_values = np.nan, strategy = 'mean')
+            idx = self.columns(self.impute_mean)
+            X[:, idx] = self.imputer_mean.fit_transform(X[:, idx])
+
+        if self.impute_mode:
+            self.imputer_mode = SimpleImputer(missing_values = np.nan, strategy = 'most_frequent')
+            idx = self.columns(self.impute_mode)
+            X[:, idx] = self.imputer_mode.fit_transform(X[:, idx])
+
+        if self.impute_cons:
+            self.imputer_cons = SimpleImputer(missing_values = np.nan, strategy = 'constant', fill_value = 0)
+            idx = self.columns(self.impute_cons)
+            X[:, idx] = self.imputer_cons.fit_transform(X[:, idx])
+
+        # oversample imbalanced training data
+
+        self.oversampler = create_oversampler(self.oversample, self.random_state)
+
+        if self.oversampler is not None:
+            X, y = self.oversampler.fit_resample(X, y)
+            X = np.ascontiguousarray(X, dtype = np.float64)
+
+        # discretise features
+
+        if self.discretise:
+            self.discretiser = KBinsDiscretizer(n_bins = 10, encode = 'ordinal', strategy = 'uniform')
+            idx = self.columns(self.discretise)
+            X[:, idx] = self.discretiser.fit_transform(X[:, idx])
+
+        # scale features
+
+        if self.scaling_type == 'minmax':
+            self.scaler = MinMaxScaler(feature_range = (0, 1), copy = False)
+        elif self.scaling_type == 'standard':
+            self.scaler = StandardScaler(copy = False)
+        elif self.scaling_type not in ('log', None):
+            raise ValueError('Unknown scaling type: %s' % self.scaling_type)
+
+        if self.scaling_type == 'log':
+            np.log1p(X, out = X)
+        elif self.scaler is not None:
+            X = self.scaler.fit_transform(X)
+
+        return X, y
+
+    def transform(self, features):
+
+        '''
+        Args:
+            features: testing features or new data (DataFrame or ndarray)
+        Returns:
+            features: pre-processed features (ndarray)
+        '''
+
+        X = self.to_array(features)
+
+        for imputer, labels in ((self.imputer_mean, self.impute_mean),
+                                (self.imputer_mode, self.impute_mode),
+                                (self.imputer_cons, self.impute_cons)):
+            if imputer is not None:
+                idx = self.columns(labels)
+                X[:, idx] = imputer.transform(X[:, idx])
+
+        if self.discretiser is not None:
+            idx = self.columns(self.discretise)
+            X[:, idx] = self.discretiser.transform(X[:, idx])
+
+        if self.scaling_type == 'log':
+            np.log1p(X, out = X)
+        elif self.scaler is not None:
+            X = self.scaler.transform(X)
+
+        return X
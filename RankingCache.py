@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 12:20:48 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to cache feature rankings on disk. The rankings are
+    content-addressed using a hash of the training features, training targets,
+    feature selection method, scorer implementation and number of selected
+    features, so that reruns with different n_features or classifier grids
+    reuse the rankings instead of recomputing them. The cache version is
+    increased whenever the rankings of an existing scorer change
+
+'''
+
+#%% import necessary libraries
+
+import os
+import sys
+import hashlib
+import tempfile
+import numpy as np
+
+#%% define class
+
+class RankingCache:
+
+    version = 2
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def rank(self, method, function, features, targets, k, scorer = None):
+
+        ''' Returns the cached ranking or computes and caches it
+
+        Args:
+            method: name of the feature selection method (str)
+            function: function returning the k best feature indices for
+            (features, targets, k)
+            features: training features (ndarray)
+            targets: training targets (ndarray)
+            k: number of selected features (int)
+            scorer: scorer function of the method, whose module, name and
+            package version are part of the key (function)
+        Returns:
+            indices: indices of the k best features (ndarray)
+        '''
+
+        file_path = os.path.join(self.cache_dir, '%s_%s.npy' % (method, self.key(method, features, targets, k,
+                                                                                 scorer)))
+
+        if os.path.exists(file_path):
+            return np.load(file_path)
+
+        indices = np.asarray(function(features, targets, k))
+
+        # write into a temporary file first so that parallel workers never
+        # read a partially written ranking
+
+        fd, tmp_path = tempfile.mkstemp(suffix = '.tmp', dir = self.cache_dir)
+        with os.fdopen(fd, 'wb') as file_out:
+            np.save(file_out, indices)
+        os.replace(tmp_path, file_path)
+
+        return indices
+
+    @staticmethod
+    def scorer_tag(scorer):
+
+        ''' Returns the module, name and package version of the scorer '''
+
+        if scorer is None:
+            return ''
+
+        module = getattr(scorer, '__module__', '') or ''
+        package = sys.modules.get(module.split('.')[0])
+
+        return '%s.%s@%s' % (module, getattr(scorer, '__qualname__', repr(scorer)),
+                             getattr(package, '__version__', ''))
+
+    @classmethod
+    def key(cls, method, features, targets, k, scorer = None):
+
+        ''' Calculates the content hash of the ranking inputs '''
+
+        sha = hashlib.sha1()
+        sha.update(('%d|%s|%s|%d|' % (cls.version, method, cls.scorer_tag(scorer), k)).encode())
+
+        for array in (features, targets):
+            array = np.ascontiguousarray(array)
+            sha.update(('%s|%s|' % (array.dtype.str, array.shape)).encode())
+            sha.update(array.tobytes())
+
+        return sha.hexdigest()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 10:02:17 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to collect results from iteration loops into a list of
+    records which is converted into a DataFrame only once at the end. This
+    replaces repeated DataFrame.append calls which copy the whole results
+    frame every time a result is added
+
+'''
+
+#%% import necessary libraries
+
+import pandas as pd
+
+#%% define class
+
+class ResultsStore:
+
+    def __init__(self, sort = False):
+        self.sort = sort
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record):
+
+        ''' Adds a single result (e.g. best parameters and scores)
+
+        Args:
+            record: result with column names as keys (dict)
+        '''
+
+        self.records.append(dict(record))
+
+    def add_frame(self, frame):
+
+        ''' Adds all rows of a DataFrame as separate results (index is ignored)
+
+        Args:
+            frame: results with one row per result (DataFrame)
+        '''
+
+        self.records.extend(frame.to_dict('records'))
+
+    def to_dataframe(self):
+
+        ''' Materialises the collected results
+
+        Returns:
+            results: results with one row per record (DataFrame)
+        '''
+
+        results = pd.DataFrame(self.records)
+
+        if self.sort:
+            results = results.reindex(sorted(results.columns), axis = 1)
+
+        return results
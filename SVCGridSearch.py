@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 14:48:55 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used as a faster replacement of GridSearchCV for RBF
+    support vector classifiers. The squared distance matrices of each
+    cross-validation fold are calculated once, after which the kernel of each
+    gamma value is obtained by exponentiating the cached matrix and shared by
+    all C values. The candidates are fitted using precomputed kernels and the
+    best parameters are refitted with the RBF kernel, so that the fitted
+    object can be used in the same way as a fitted GridSearchCV
+
+'''
+
+#%% import necessary libraries
+
+import numpy as np
+
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import check_scoring
+from sklearn.metrics.pairwise import euclidean_distances
+from sklearn.model_selection import ParameterGrid, check_cv
+
+#%% define functions
+
+def fold_scores(estimator, candidates, X, y, train, test, scorer, probability):
+
+    ''' Scores all candidates on a single fold using precomputed kernels
+
+    Returns:
+        scores: score of each candidate (ndarray)
+    '''
+
+    distances_train = euclidean_distances(X[train], squared = True)
+    distances_test = euclidean_distances(X[test], X[train], squared = True)
+
+    scores = np.empty(len(candidates))
+    kernels = {}
+
+    for i, params in enumerate(candidates):
+
+        gamma = params['gamma']
+
+        if gamma not in kernels:
+            kernels = {gamma: (np.exp(-gamma * distances_train), np.exp(-gamma * distances_test))}
+
+        kernel_train, kernel_test = kernels[gamma]
+
+        model = clone(estimator).set_params(**params)
+        model.set_params(kernel = 'precomputed', probability = probability)
+        model.fit(kernel_train, y[train])
+
+        scores[i] = scorer(model, kernel_test, y[test])
+
+    return scores
+
+#%% define class
+
+class SVCGridSearch(BaseEstimator):
+
+    def __init__(self, estimator, param_grid, scoring = None, cv = 5, n_jobs = None,
+                 refit = True, probability = False):
+
+        '''
+        Args:
+            estimator: support vector classifier (SVC)
+            param_grid: parameters to search, kernel has to be 'rbf' and gamma
+            numeric (dict or list of dicts)
+            scoring: scoring metric (str or callable)
+            cv: number of folds or cross-validation generator
+            n_jobs: number of folds calculated in parallel (int)
+            refit: refit the best parameters using all data (True/False)
+            probability: calculate probability estimates during the search,
+            only needed if the scorer uses probabilities (True/False)
+        '''
+
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.probability = probability
+
+    def fit(self, X, y):
+
+        X = np.asarray(X, dtype = np.float64)
+        y = np.asarray(y)
+
+        candidates = list(ParameterGrid(self.param_grid))
+
+        for params in candidates:
+            if params.get('kernel', 'rbf') != 'rbf' or isinstance(params.get('gamma'), str):
+                raise ValueError('SVCGridSearch requires rbf kernel and numeric gamma: %s' % params)
+
+        # ensure that gamma values are in consecutive order so that each
+        # kernel is calculated only once per fold
+
+        order = np.argsort([params['gamma'] for params in candidates], kind = 'stable')
+
+        cv = check_cv(self.cv, y, classifier = True)
+        scorer = check_scoring(self.estimator, scoring = self.scoring)
+
+        fold_results = Parallel(n_jobs = self.n_jobs)(
+                delayed(fold_scores)(self.estimator, [candidates[i] for i in order], X, y,
+                                     train, test, scorer, self.probability)
+                for train, test in cv.split(X, y))
+
+        split_scores = np.empty((len(fold_results), len(candidates)))
+        split_scores[:, order] = np.array(fold_results)
+
+        # summarise results in the same way as GridSearchCV
+
+        mean_scores = split_scores.mean(axis = 0)
+
+        self.cv_results_ = {'params': candidates,
+                            'mean_test_score': mean_scores,
+                            'std_test_score': split_scores.std(axis = 0)}
+
+        for i in range(0, split_scores.shape[0]):
+            self.cv_results_['split%d_test_score' % i] = split_scores[i]
+
+        self.n_splits_ = split_scores.shape[0]
+        self.best_index_ = int(np.nanargmax(mean_scores))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = mean_scores[self.best_index_]
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
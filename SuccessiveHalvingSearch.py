@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 15:31:04 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used as a replacement of GridSearchCV using successive
+    halving. All candidates of the parameter grid are first cross-validated
+    on a small stratified subsample of the training data, after which only
+    the best 1/factor of the candidates are kept and the subsample is
+    increased by the factor. The last round uses all training data and the
+    same folds as GridSearchCV, so the best score is directly comparable to
+    an exhaustive search. The fitted object has the same best_params_,
+    best_score_ and predict as a fitted GridSearchCV, and n_fits_ and
+    n_fits_saved_ report the number of fits compared to the full grid. The
+    fits on subsamples are cheaper, so fit_cost_ reports the fits weighted
+    by their proportion of the training samples (i.e. the number of fits in
+    full training set equivalents)
+
+'''
+
+#%% import necessary libraries
+
+import math
+import numpy as np
+
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import resample
+
+from fit_and_score import fit_and_score
+
+#%% define class
+
+class SuccessiveHalvingSearch(BaseEstimator):
+
+    def __init__(self, estimator, param_grid, scoring = None, cv = 5, n_jobs = None,
+                 refit = True, factor = 3, min_resources = 'auto', random_state = None):
+
+        '''
+        Args:
+            estimator: model to search (unfitted estimator)
+            param_grid: parameters to search (dict or list of dicts)
+            scoring: scoring metric (str or callable)
+            cv: number of folds or cross-validation generator
+            n_jobs: number of fits calculated in parallel (int)
+            refit: refit the best parameters using all data (True/False)
+            factor: proportion of candidates kept and increase of samples
+            in each round (int)
+            min_resources: number of samples in the first round ('auto' uses
+            2 * cv * number of classes), increased if needed so that each
+            class has at least cv samples in every subsample
+            random_state: random state of the subsampling (int)
+        '''
+
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.factor = factor
+        self.min_resources = min_resources
+        self.random_state = random_state
+
+    def rounds(self, n_candidates, n_splits, class_counts):
+
+        ''' Returns the number of samples used in each round, the last round
+        always using all samples '''
+
+        n_samples = int(np.sum(class_counts))
+
+        if self.min_resources == 'auto':
+            min_resources = 2 * n_splits * len(class_counts)
+        else:
+            min_resources = self.min_resources
+
+        # the stratified subsamples must have at least n_splits samples of
+        # the smallest class for the stratified folds
+
+        min_resources = max(min_resources, int(math.ceil(n_splits * n_samples / np.min(class_counts))))
+        min_resources = min(min_resources, n_samples)
+
+        n_required = 1 + int(math.floor(math.log(n_candidates, self.factor)))
+        n_possible = 1 + int(math.floor(math.log(n_samples / min_resources, self.factor)))
+        n_rounds = min(n_required, n_possible)
+
+        return [n_samples // self.factor ** (n_rounds - 1 - i) for i in range(0, n_rounds)]
+
+    def fit(self, X, y):
+
+        X = np.asarray(X)
+        y = np.asarray(y)
+
+        candidates = list(ParameterGrid(self.param_grid))
+        scorer = check_scoring(self.estimator, scoring = self.scoring)
+        n_splits = check_cv(self.cv, y, classifier = True).get_n_splits(X, y)
+
+        resources = self.rounds(len(candidates), n_splits, np.unique(y, return_counts = True)[1])
+
+        self.cv_results_ = {'iter': [], 'n_resources': [], 'params': [], 'mean_test_score': []}
+        n_fits = 0
+        fit_cost = 0.0
+
+        remaining = list(range(0, len(candidates)))
+
+        for i, n_resources in enumerate(resources):
+
+            # draw a stratified subsample of the training data
+
+            if n_resources < len(y):
+                subset = np.sort(resample(np.arange(len(y)), replace = False, n_samples = n_resources,
+                                          stratify = y, random_state = self.random_state))
+            else:
+                subset = np.arange(len(y))
+
+            X_subset = X[subset]
+            y_subset = y[subset]
+
+            folds = list(check_cv(self.cv, y_subset, classifier = True).split(X_subset, y_subset))
+
+            # cross-validate the remaining candidates
+
+            scores = Parallel(n_jobs = self.n_jobs)(
+                    delayed(fit_and_score)(self.estimator, candidates[j], X_subset, y_subset,
+                                           train, test, scorer)
+                    for j in remaining for train, test in folds)
+
+            mean_scores = np.array(scores).reshape(len(remaining), len(folds)).mean(axis = 1)
+
+            n_fits += len(scores)
+            fit_cost += len(scores) * n_resources / len(y)
+            self.cv_results_['iter'].extend([i] * len(remaining))
+            self.cv_results_['n_resources'].extend([n_resources] * len(remaining))
+            self.cv_results_['params'].extend([candidates[j] for j in remaining])
+            self.cv_results_['mean_test_score'].extend(mean_scores)
+
+            # keep the best candidates for the next round
+
+            order = np.argsort(-mean_scores, kind = 'stable')
+
+            if i < len(resources) - 1:
+                n_keep = int(math.ceil(len(remaining) / self.factor))
+                remaining = [remaining[j] for j in order[0:n_keep]]
+
+        self.n_fits_ = n_fits
+        self.n_fits_saved_ = len(candidates) * n_splits - self.n_fits_
+        self.fit_cost_ = fit_cost
+        self.best_index_ = remaining[order[0]]
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = mean_scores[order[0]]
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
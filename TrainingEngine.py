@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sun Oct 18 00:41:09 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used to train and predict the linear and neural network
+    classification and regression models with TensorFlow 2 / Keras. A
+    linear model is a network without hidden units, and a regression model
+    is a network without classes. The training steps are compiled with XLA
+    (tf.function with jit_compile), and the whole training including the
+    periodic evaluations runs in-graph, so there is no checkpoint I/O or
+    return to Python between the periods. The optimisers are selected with the
+    same names as in the TF1 Estimator versions, and the gradients are
+    clipped by their global norm
+
+'''
+
+#%% import necessary libraries
+
+import os
+import json
+import numpy as np
+import tensorflow as tf
+
+from classification_metrics import classification_metrics
+
+#%% define optimisers
+
+# the proximal optimisers equal the plain ones without L1/L2 regularisation
+
+optimiser_classes = {
+                    'GradientDescent': 'SGD',
+                    'ProximalGradientDescent': 'SGD',
+                    'Adagrad': 'Adagrad',
+                    'ProximalAdagrad': 'Adagrad',
+                    'Adam': 'Adam',
+                    'Ftrl': 'Ftrl'
+                    }
+
+#%% define function
+
+def create_optimiser(optimiser, learning_rate, clip_norm = 5.0):
+
+    '''
+    Args:
+        optimiser: type of the optimiser (GradientDescent, ProximalGradientDescent,
+        Adagrad, ProximalAdagrad, Adam, Ftrl)
+        learning_rate: the learning rate (float)
+        clip_norm: maximum global norm of the gradients, None = no clipping (float)
+    Returns:
+        optimiser: Keras optimiser
+    '''
+
+    if optimiser not in optimiser_classes:
+        raise ValueError('Unknown optimiser: %s' % optimiser)
+
+    optimiser_class = getattr(tf.keras.optimizers, optimiser_classes[optimiser])
+
+    return optimiser_class(learning_rate = learning_rate, global_clipnorm = clip_norm)
+
+#%% define class
+
+class TrainingEngine:
+
+    weights_name = 'model.weights.h5'
+    config_name = 'model.json'
+
+    def __init__(self, hidden_units = [], n_classes = None, optimiser = 'Adam', learning_rate = 0.001,
+                 clip_norm = 5.0, dropout = None, batch_norm = False, weight_column = None,
+                 jit_compile = True, seed = None):
+
+        '''
+        Args:
+            hidden_units: number of neurons in each layer, [] for a linear
+            model (list)
+            n_classes: number of classes, None for a regression model (int)
+            optimiser: type of the optimiser (see create_optimiser)
+            learning_rate: the learning rate (float)
+            clip_norm: maximum global norm of the gradients (float)
+            dropout: the probability to drop out a node output (float)
+            batch_norm: to use batch normalization after each hidden layer (True/False)
+            weight_column: name of the feature used as sample weights in the
+            training, None = equal weights (str)
+            jit_compile: whether to compile the training and prediction with
+            XLA (True/False)
+            seed: random seed of the initialisation and shuffling (int)
+        '''
+
+        self.hidden_units = list(hidden_units)
+        self.n_classes = n_classes
+        self.optimiser = optimiser
+        self.learning_rate = learning_rate
+        self.clip_norm = clip_norm
+        self.dropout = dropout
+        self.batch_norm = batch_norm
+        self.weight_column = weight_column
+        self.jit_compile = jit_compile
+        self.seed = seed
+
+        self.feature_labels = None
+        self.model = None
+
+    def build(self, feature_labels):
+
+        ''' Builds the model and the compiled training and prediction
+        functions for the given features '''
+
+        self.feature_labels = [label for label in feature_labels if label != self.weight_column]
+
+        if self.seed is not None:
+            tf.keras.utils.set_random_seed(self.seed)
+
+        layers = [tf.keras.Input(shape = (len(self.feature_labels),))]
+
+        for units in self.hidden_units:
+            layers.append(tf.keras.layers.Dense(units, activation = 'relu'))
+            if self.batch_norm:
+                layers.append(tf.keras.layers.BatchNormalization())
+            if self.dropout:
+                layers.append(tf.keras.layers.Dropout(self.dropout))
+
+        layers.append(tf.keras.layers.Dense(self.n_classes or 1))
+
+        self.model = tf.keras.Sequential(layers)
+        self.optimizer = create_optimiser(self.optimiser, self.learning_rate, self.clip_norm)
+        self.optimizer.build(self.model.trainable_variables)
+
+        if self.n_classes is None:
+            self.loss = tf.keras.losses.MeanSquaredError()
+        else:
+            self.loss = tf.keras.losses.SparseCategoricalCrossentropy(from_logits = True)
+
+        # a single training step is compiled with XLA, and the steps and
+        # evaluations of all periods are looped in-graph
+
+        @tf.function(jit_compile = self.jit_compile)
+        def train_step(features, targets, weights):
+
+            with tf.GradientTape() as tape:
+                outputs = self.model(features, training = True)
+                loss = self.loss(targets, outputs, sample_weight = weights)
+
+            gradients = tape.gradient(loss, self.model.trainable_variables)
+            self.optimizer.apply_gradients(zip(gradients, self.model.trainable_variables))
+
+            return loss
+
+        @tf.function(jit_compile = self.jit_compile, reduce_retracing = True)
+        def predict_step(features):
+
+            outputs = self.model(features, training = False)
+
+            if self.n_classes is None:
+                return outputs[:, 0]
+
+            return tf.nn.softmax(outputs)
+
+        @tf.function
+        def train_steps(iterator, period_steps, evaluation_features, evaluation_targets, verbose):
+
+            # predictions of each set are written into a tensor array after
+            # each period, and the loss of the first set is printed
+
+            n_periods = tf.shape(period_steps)[0]
+            predictions = tuple(tf.TensorArray(tf.float32, size = n_periods)
+                                for _ in evaluation_features)
+
+            for period in tf.range(n_periods):
+
+                for _ in tf.range(period_steps[period]):
+                    train_step(*next(iterator))
+
+                outputs = tuple(predict_step(x_eval) for x_eval in evaluation_features)
+                predictions = tuple(array.write(period, output) for array, output in
+                                    zip(predictions, outputs))
+
+                if verbose and outputs:
+                    if self.n_classes is None:
+                        loss = tf.sqrt(tf.reduce_mean((outputs[0] - evaluation_targets[0]) ** 2))
+                    else:
+                        probabilities = tf.gather(outputs[0], evaluation_targets[0], batch_dims = 1)
+                        loss = -tf.reduce_mean(tf.math.log(tf.maximum(probabilities, 1e-15)))
+                    tf.print(tf.strings.join(['Period ', tf.strings.as_string(period, width = 2, fill = '0'),
+                                              ': ', tf.strings.as_string(loss, precision = 2)]))
+
+            return tuple(array.stack() for array in predictions)
+
+        self.train_steps = train_steps
+        self.predict_step = predict_step
+
+    def arrays(self, features, targets = None):
+
+        ''' Converts the features, weights and targets into arrays '''
+
+        x = np.asarray(features[self.feature_labels], dtype = np.float32)
+
+        if self.weight_column is not None and self.weight_column in features:
+            w = np.asarray(features[self.weight_column], dtype = np.float32)
+        else:
+            w = np.ones(len(x), dtype = np.float32)
+
+        if targets is None:
+            return x, w
+
+        y = np.asarray(targets).reshape(-1)
+        y = y.astype(np.float32) if self.n_classes is None else y.astype(np.int32)
+
+        return x, w, y
+
+    def fit(self, features, targets, steps, batch_size, periods = 10, evaluation_sets = {},
+            verbose = True, evaluation_steps = None):
+
+        ''' Trains the model and evaluates the given sets after each period
+        (in-graph, each set is predicted at once)
+
+        Args:
+            features: one or more columns of training features (DataFrame)
+            targets: a single column of training targets (DataFrame)
+            steps: total number of training steps (int)
+            batch_size: batch size to used to calculate the gradient (int)
+            periods: number of evaluations during the training, used if
+            evaluation_steps is None (int)
+            evaluation_sets: features and targets of each evaluated set by
+            name (dict of tuples)
+            verbose: whether to print the loss of the first set after each
+            period (True/False)
+            evaluation_steps: number of training steps between the
+            evaluations, the remaining steps are trained in a last shorter
+            period (int)
+        Returns:
+            history: learning curves (one value per period) of each set, i.e.
+            log_loss, brier_score, accuracy and ece for classification and
+            rmse for regression, and the predictions of the last period
+            ('probabilities' or 'predictions') (dict of dicts)
+        '''
+
+        if self.model is None:
+            self.build(list(features.columns))
+
+        x, w, y = self.arrays(features, targets)
+
+        # samples are shuffled before batching, and the batches span the
+        # epochs so that each batch has the same shape (compiled once)
+
+        dataset = tf.data.Dataset.from_tensor_slices((x, y, w))
+        dataset = dataset.shuffle(len(x), seed = self.seed, reshuffle_each_iteration = True)
+        dataset = dataset.repeat().batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+        iterator = iter(dataset)
+
+        # training steps of each period (evaluated after each period)
+
+        if evaluation_steps is None:
+            period_steps = np.diff(np.round(np.linspace(0, steps, periods + 1)).astype(int))
+        else:
+            period_steps = [evaluation_steps] * int(steps // evaluation_steps)
+            if steps % evaluation_steps or not period_steps:
+                period_steps.append(steps % evaluation_steps)
+
+        evaluation_arrays = dict((name, self.arrays(*evaluation_set)) for name, evaluation_set in
+                                 evaluation_sets.items())
+
+        outputs = self.train_steps(iterator, tf.constant(period_steps, dtype = tf.int32),
+                                   tuple(tf.constant(x_eval) for x_eval, _, _ in evaluation_arrays.values()),
+                                   tuple(tf.constant(y_eval) for _, _, y_eval in evaluation_arrays.values()),
+                                   verbose)
+
+        predictions = dict((name, output.numpy()) for name, output in zip(evaluation_arrays, outputs))
+
+        # learning curves of all periods are calculated at once
+
+        history = {}
+
+        for name, (_, _, y_eval) in evaluation_arrays.items():
+            history[name] = self.curves(y_eval, predictions[name])
+            history[name]['probabilities' if self.n_classes else 'predictions'] = predictions[name][-1]
+
+        return history
+
+    def curves(self, targets, predictions):
+
+        ''' Returns the metrics of the predictions of each period '''
+
+        if self.n_classes is None:
+            return {'rmse': np.sqrt(np.mean((predictions - targets) ** 2, axis = 1))}
+
+        return classification_metrics(targets, predictions)
+
+    def predict_array(self, x, batch_size = 1024):
+
+        ''' Predicts an array of features in batches into a preallocated
+        array '''
+
+        shape = (len(x),) if self.n_classes is None else (len(x), self.n_classes)
+        predictions = np.empty(shape, dtype = np.float32)
+
+        for start in range(0, len(x), batch_size):
+            predictions[start:start + batch_size] = self.predict_step(x[start:start + batch_size]).numpy()
+
+        return predictions
+
+    def predict(self, features, batch_size = 1024):
+
+        '''
+        Args:
+            features: one or more columns of features (DataFrame)
+            batch_size: number of samples predicted at once (int)
+        Returns:
+            predictions: class probabilities (n_samples x n_classes) or
+            predicted values (n_samples) (ndarray)
+        '''
+
+        x, _ = self.arrays(features)
+
+        return self.predict_array(x, batch_size)
+
+    def save(self, model_dir):
+
+        ''' Saves the weights and configuration of the model '''
+
+        if not os.path.exists(model_dir):
+            os.makedirs(model_dir)
+
+        self.model.save_weights(os.path.join(model_dir, self.weights_name))
+
+        config = {'feature_labels': self.feature_labels, 'hidden_units': self.hidden_units,
+                  'n_classes': self.n_classes, 'dropout': self.dropout, 'batch_norm': self.batch_norm,
+                  'weight_column': self.weight_column}
+
+        with open(os.path.join(model_dir, self.config_name), 'w') as file_out:
+            json.dump(config, file_out, indent = 1)
+
+    def load(self, model_dir):
+
+        ''' Loads the weights of a saved model (the architecture is read
+        from the saved configuration). Models saved by the TF1 Estimators
+        (checkpoint files) cannot be loaded and have to be retrained '''
+
+        if not os.path.exists(os.path.join(model_dir, self.config_name)):
+            if os.path.exists(os.path.join(model_dir, 'checkpoint')):
+                raise ValueError('%s contains a TF1 Estimator checkpoint, which cannot be loaded '
+                                 'with TensorFlow 2, retrain the model to save it in the current '
+                                 'format' % model_dir)
+            raise ValueError('No saved model found in %s' % model_dir)
+
+        with open(os.path.join(model_dir, self.config_name), 'r') as file_in:
+            config = json.load(file_in)
+
+        for key in ('hidden_units', 'n_classes', 'dropout', 'batch_norm', 'weight_column'):
+            setattr(self, key, config[key])
+
+        self.build(config['feature_labels'])
+        self.model.load_weights(os.path.join(model_dir, self.weights_name))
+
+        return self
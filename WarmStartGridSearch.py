@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 16:12:41 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This class is used as a replacement of GridSearchCV for ensembles with
+    n_estimators in the parameter grid. Instead of refitting each value of
+    n_estimators from scratch, every combination of the other parameters is
+    fitted once per fold and the smaller ensembles are evaluated from the
+    same fit:
+
+        - boosting models (GradientBoosting, AdaBoost, RUSBoost, LogitBoost)
+          are fitted with the largest n_estimators and scored from the
+          staged predictions
+        - XGBClassifier is fitted with the largest n_estimators and scored
+          using the first n trees of the booster
+        - forests and bagging ensembles (ExtraTrees, RandomForest,
+          BalancedRandomForest, BalancedBagging, EasyEnsemble) are grown
+          with warm_start from the smallest to the largest n_estimators
+          (BalancedRandomForest draws the random states of the added trees
+          differently from a fresh fit, so its scores are equivalent but not
+          identical to GridSearchCV)
+
+    Models without n_estimators in the grid are fitted for each candidate as
+    in GridSearchCV. The fitted object has the same best_params_,
+    best_score_ and predict as a fitted GridSearchCV, and n_fits_ and
+    n_fits_saved_ report the number of fits compared to the full grid
+
+'''
+
+#%% import necessary libraries
+
+import numpy as np
+
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from fit_and_score import fit_and_score
+
+#%% define functions
+
+def sweep_type(model):
+
+    ''' Returns how the n_estimators of the model can be swept ('staged',
+    'xgboost', 'warm_start' or None) '''
+
+    if hasattr(model, 'get_booster'):
+        return 'xgboost'
+    elif hasattr(model, 'staged_predict'):
+        return 'staged'
+    elif 'warm_start' in model.get_params():
+        return 'warm_start'
+    else:
+        return None
+
+
+def sweep_and_score(estimator, params, n_estimators, X, y, train, test, scorer):
+
+    ''' Fits the model once on the training fold and scores each value of
+    n_estimators on the validation fold
+
+    Returns:
+        scores: score of each value of n_estimators (list)
+    '''
+
+    model = clone(estimator).set_params(**params)
+    scores = {}
+
+    if sweep_type(model) == 'warm_start':
+
+        model.set_params(warm_start = True)
+
+        for n in sorted(n_estimators):
+            model.set_params(n_estimators = n)
+            model.fit(X[train], y[train])
+            scores[n] = scorer(model, X[test], y[test])
+
+    else:
+
+        model.set_params(n_estimators = max(n_estimators))
+        model.fit(X[train], y[train])
+
+        for n in n_estimators:
+            scores[n] = scorer(PrefixEnsemble(model, n), X[test], y[test])
+
+    return [scores[n] for n in n_estimators]
+
+#%% define classes
+
+class PrefixEnsemble(ClassifierMixin, BaseEstimator):
+
+    ''' Fitted ensemble restricted to its first n_estimators members, used
+    to score the smaller ensembles with the standard scorers '''
+
+    def __init__(self, model, n_estimators):
+        self.model = model
+        self.n_estimators = n_estimators
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    def staged(self, method, X):
+
+        output = None
+
+        for i, output in enumerate(getattr(self.model, method)(X)):
+            if i + 1 == self.n_estimators:
+                break
+
+        # boosting can stop early, in which case the last stage is used
+
+        return output
+
+    def boosted(self, method, X):
+
+        try:
+            return getattr(self.model, method)(X, iteration_range = (0, self.n_estimators))
+        except TypeError:
+            return getattr(self.model, method)(X, ntree_limit = self.n_estimators)
+
+    def predict(self, X):
+        if sweep_type(self.model) == 'xgboost':
+            return self.boosted('predict', X)
+        else:
+            return self.staged('staged_predict', X)
+
+    def predict_proba(self, X):
+        if sweep_type(self.model) == 'xgboost':
+            return self.boosted('predict_proba', X)
+        else:
+            return self.staged('staged_predict_proba', X)
+
+
+class WarmStartGridSearch(BaseEstimator):
+
+    def __init__(self, estimator, param_grid, scoring = None, cv = 5, n_jobs = None,
+                 refit = True):
+
+        '''
+        Args:
+            estimator: model to search (unfitted estimator)
+            param_grid: parameters to search (dict or list of dicts)
+            scoring: scoring metric (str or callable)
+            cv: number of folds or cross-validation generator
+            n_jobs: number of fits calculated in parallel (int)
+            refit: refit the best parameters using all data (True/False)
+        '''
+
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+
+    def fit(self, X, y):
+
+        X = np.asarray(X)
+        y = np.asarray(y)
+
+        scorer = check_scoring(self.estimator, scoring = self.scoring)
+        folds = list(check_cv(self.cv, y, classifier = True).split(X, y))
+
+        if isinstance(self.param_grid, dict):
+            grids = [self.param_grid]
+        else:
+            grids = self.param_grid
+
+        # group the candidates by all other parameters than n_estimators
+
+        sweepable = sweep_type(self.estimator) is not None
+
+        tasks = []
+
+        for grid in grids:
+            if sweepable and 'n_estimators' in grid:
+                other = dict((key, value) for key, value in grid.items() if key != 'n_estimators')
+                for params in ParameterGrid(other):
+                    tasks.append((params, list(grid['n_estimators'])))
+            else:
+                for params in ParameterGrid(grid):
+                    tasks.append((params, None))
+
+        fold_results = Parallel(n_jobs = self.n_jobs)(
+                delayed(sweep_and_score)(self.estimator, params, n_estimators, X, y,
+                                         train, test, scorer)
+                if n_estimators is not None else
+                delayed(fit_and_score)(self.estimator, params, X, y, train, test, scorer)
+                for params, n_estimators in tasks for train, test in folds)
+
+        # collect the scores in the order of the full parameter grid
+
+        split_scores = {}
+
+        for i, (params, n_estimators) in enumerate(tasks):
+
+            task_scores = np.array(fold_results[i * len(folds):(i + 1) * len(folds)])
+
+            if n_estimators is None:
+                split_scores[repr(sorted(params.items()))] = task_scores
+            else:
+                for j, n in enumerate(n_estimators):
+                    candidate = dict(params, n_estimators = n)
+                    split_scores[repr(sorted(candidate.items()))] = task_scores[:, j]
+
+        candidates = list(ParameterGrid(self.param_grid))
+        split_scores = np.array([split_scores[repr(sorted(params.items()))]
+                                 for params in candidates]).T
+
+        mean_scores = split_scores.mean(axis = 0)
+
+        self.cv_results_ = {'params': candidates,
+                            'mean_test_score': mean_scores,
+                            'std_test_score': split_scores.std(axis = 0)}
+
+        for i in range(0, split_scores.shape[0]):
+            self.cv_results_['split%d_test_score' % i] = split_scores[i]
+
+        self.n_splits_ = len(folds)
+        self.n_fits_ = len(tasks) * len(folds)
+        self.n_fits_saved_ = len(candidates) * len(folds) - self.n_fits_
+        self.best_index_ = int(np.nanargmax(mean_scores))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = mean_scores[self.best_index_]
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
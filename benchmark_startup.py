@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 22:14:40 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This code is used to measure the startup time of the entry-point
+    scripts. The cells of each script are run in a fresh Python process from
+    '#%% import necessary libraries' up to the cell defining the models or
+    feature scorers (e.g. '#%% define models'), so the backends imported by
+    create_model or create_feature_scorer at startup are included. The
+    median time of the import section and of the whole startup, the number
+    of loaded modules and the heavy backends that were imported are
+    reported. Cells failing for a missing dataset are skipped, and only
+    errors of the import and model cells are reported. An earlier git
+    revision of the scripts can be measured for comparison:
+
+        python benchmark_startup.py
+        python benchmark_startup.py model_selection.py --repeats 5 --revision HEAD~1
+
+'''
+
+#%% import necessary libraries
+
+import os
+import sys
+import json
+import glob
+import argparse
+import subprocess
+import numpy as np
+
+#%% define functions
+
+heavy_backends = ['tensorflow', 'keras', 'xgboost', 'logitboost', 'shap', 'skfeature',
+                  'matplotlib', 'seaborn', 'imblearn', 'sklearn']
+
+measure_code = '''
+import sys, time, json
+cells = json.loads(sys.stdin.read())
+namespace = {'__name__': '__benchmark__'}
+times = []
+error = None
+start = time.perf_counter()
+for source, reported in cells:
+    try:
+        exec(compile(source, %r, 'exec'), namespace)
+    except Exception as exception:
+        if reported and error is None:
+            error = '%%s: %%s' %% (type(exception).__name__, exception)
+    times.append(time.perf_counter() - start)
+print(json.dumps({'import time': times[0], 'time': times[-1], 'modules': len(sys.modules),
+                  'error': error, 'backends': [name for name in %r if name in sys.modules]}))
+'''
+
+
+def startup_cells(source):
+
+    '''
+    Returns the cells of a script (IPython magics removed) from the import
+    section up to the last cell defining the models or feature scorers, and
+    whether errors of each cell are reported
+    '''
+
+    cells = []
+
+    for cell in source.split('\n#%%')[1:]:
+        lines = cell.split('\n')
+        cells.append((lines[0].strip(), '\n'.join(line for line in lines[1:]
+                                                 if not line.lstrip().startswith('%'))))
+
+    start = [i for i, (title, _) in enumerate(cells) if title.startswith('import necessary')]
+
+    if not start:
+        raise ValueError('No import section found')
+
+    cells = cells[start[0]:]
+    created = [i for i, (title, _) in enumerate(cells)
+               if title.startswith('define') and 'models' in title]
+    end = created[-1] if created else 0
+
+    return [(code, i == 0 or i == end) for i, (_, code) in enumerate(cells[:end + 1])]
+
+
+def benchmark_startup(script, repeats = 3, revision = None):
+
+    '''
+    Args:
+        script: path to the script (str)
+        repeats: number of measurements (int)
+        revision: git revision of the script, working tree if None (str)
+    Returns:
+        result: median import and startup times (s), number of modules,
+        imported heavy backends and error of the import and model cells (dict)
+    '''
+
+    if revision is None:
+        with open(script, 'r') as file_in:
+            source = file_in.read()
+    else:
+        source = subprocess.run(['git', 'show', '%s:%s' % (revision, script)], check = True,
+                                stdout = subprocess.PIPE).stdout.decode()
+
+    cells = startup_cells(source)
+    directory = os.path.dirname(os.path.abspath(script))
+    environment = dict(os.environ, MPLBACKEND = 'Agg')
+    measurements = []
+
+    for _ in range(repeats):
+        process = subprocess.run([sys.executable, '-c', measure_code % (script, heavy_backends)],
+                                 input = json.dumps(cells).encode(), stdout = subprocess.PIPE,
+                                 cwd = directory, env = environment)
+        measurements.append(json.loads(process.stdout.decode().strip().split('\n')[-1]))
+
+    result = measurements[-1]
+    for key in ['import time', 'time']:
+        result[key] = float(np.median([measurement[key] for measurement in measurements]))
+
+    return result
+
+#%% run benchmark
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Measure the startup time of the entry-point scripts')
+    parser.add_argument('scripts', nargs = '*', help = 'scripts to measure (all entry points if none)')
+    parser.add_argument('--repeats', type = int, default = 3, help = 'number of measurements')
+    parser.add_argument('--revision', default = None, help = 'git revision of the scripts')
+    args = parser.parse_args()
+
+    scripts = args.scripts or sorted(glob.glob('fibroid_*.py') + glob.glob('evaluate_*.py') +
+                                     ['model_selection.py', 'feature_selection.py',
+                                      'PredictionService.py', 'report_figures.py'])
+
+    print('%-50s %10s %11s %8s  %s' % ('script', 'import (s)', 'startup (s)', 'modules',
+                                       'backends / error'))
+
+    for script in scripts:
+
+        try:
+            result = benchmark_startup(script, args.repeats, args.revision)
+        except (ValueError, subprocess.CalledProcessError) as error:
+            print('%-50s %10s %11s %8s  %s' % (script, '-', '-', '-', error))
+            continue
+
+        print('%-50s %10.2f %11.2f %8d  %s' % (script, result['import time'], result['time'],
+                                               result['modules'],
+                                               result['error'] or ', '.join(result['backends'])))
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sun Oct 18 00:14:27 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This code is used to calculate probabilistic classification metrics
+    (log loss, Brier score, accuracy and calibration) directly from the
+    predicted class probabilities. The probabilities can have a leading
+    axis of periods (periods x samples x classes), in which case all periods
+    are calculated in a single vectorised pass and the metrics are returned
+    as learning curves (one value per period)
+
+'''
+
+#%% import necessary libraries
+
+import numpy as np
+
+#%% define functions
+
+def check_probabilities(targets, probabilities):
+
+    ''' Returns the targets as class indices (n_samples), the probabilities
+    with a period axis (n_periods x n_samples x n_classes) and whether the
+    period axis was added. The probabilities can be given as samples (binary
+    probabilities of the positive class), samples x classes or periods x
+    samples x classes '''
+
+    targets = np.asarray(targets).reshape(-1).astype(int)
+    probabilities = np.asarray(probabilities, dtype = float)
+
+    if probabilities.ndim == 1:
+        probabilities = np.stack([1 - probabilities, probabilities], axis = -1)
+
+    single = probabilities.ndim == 2
+
+    if single:
+        probabilities = probabilities[np.newaxis]
+
+    if probabilities.ndim != 3 or probabilities.shape[1] != len(targets):
+        raise ValueError('Unknown probability shape: %s for %d targets' % (str(probabilities.shape), len(targets)))
+
+    return targets, probabilities, single
+
+
+def log_loss(targets, probabilities, eps = 1e-15):
+
+    '''
+    Args:
+        targets: true classes (ndarray, Series or DataFrame)
+        probabilities: predicted probabilities of each class (ndarray)
+        eps: probabilities are clipped to [eps, 1 - eps] (float)
+    Returns:
+        log_loss: mean cross-entropy (float, or ndarray for each period)
+    '''
+
+    targets, probabilities, single = check_probabilities(targets, probabilities)
+
+    true_probabilities = probabilities[:, np.arange(len(targets)), targets]
+
+    values = -np.mean(np.log(np.clip(true_probabilities, eps, 1 - eps)), axis = 1)
+
+    return values[0] if single else values
+
+
+def brier_score(targets, probabilities):
+
+    '''
+    Args:
+        targets: true classes (ndarray, Series or DataFrame)
+        probabilities: predicted probabilities of each class (ndarray)
+    Returns:
+        brier_score: mean squared error of the probabilities summed over
+        the classes (float, or ndarray for each period)
+    '''
+
+    targets, probabilities, single = check_probabilities(targets, probabilities)
+
+    one_hot = np.eye(probabilities.shape[-1])[targets]
+
+    values = np.mean(np.sum((probabilities - one_hot) ** 2, axis = -1), axis = 1)
+
+    return values[0] if single else values
+
+
+def calibration(targets, probabilities, n_bins = 10):
+
+    '''
+    Args:
+        targets: true classes (ndarray, Series or DataFrame)
+        probabilities: predicted probabilities of each class (ndarray)
+        n_bins: number of confidence bins (int)
+    Returns:
+        calibration: expected calibration error, and the confidence, accuracy
+        and number of samples in each bin (dict of ndarrays with a leading
+        axis for each period if given)
+    '''
+
+    targets, probabilities, single = check_probabilities(targets, probabilities)
+    n_periods, n_samples = probabilities.shape[:2]
+
+    # confidence of the predicted (most probable) class
+
+    confidence = np.max(probabilities, axis = -1)
+    correct = (np.argmax(probabilities, axis = -1) == targets).astype(float)
+
+    bins = np.minimum((confidence * n_bins).astype(int), n_bins - 1)
+    bins = (bins + n_bins * np.arange(n_periods)[:, np.newaxis]).reshape(-1)
+
+    counts = np.bincount(bins, minlength = n_periods * n_bins).reshape(n_periods, n_bins)
+    confidence_sum = np.bincount(bins, confidence.reshape(-1), n_periods * n_bins).reshape(n_periods, n_bins)
+    correct_sum = np.bincount(bins, correct.reshape(-1), n_periods * n_bins).reshape(n_periods, n_bins)
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        bin_confidence = confidence_sum / counts
+        bin_accuracy = correct_sum / counts
+
+    ece = np.sum(np.abs(correct_sum - confidence_sum), axis = 1) / n_samples
+
+    calibration = {'ece': ece,
+                   'bin_confidence': bin_confidence,
+                   'bin_accuracy': bin_accuracy,
+                   'bin_counts': counts}
+
+    if single:
+        calibration = dict((key, value[0]) for key, value in calibration.items())
+
+    return calibration
+
+#%% define function
+
+def classification_metrics(targets, probabilities, n_bins = 10):
+
+    '''
+    Args:
+        targets: true classes (ndarray, Series or DataFrame)
+        probabilities: predicted probabilities of each class, with an optional
+        leading axis for each period (ndarray)
+        n_bins: number of confidence bins of the calibration (int)
+    Returns:
+        metrics: log loss, Brier score, accuracy and expected calibration
+        error (floats, or learning curves as ndarrays for each period) and
+        the calibration bins (dict)
+    '''
+
+    metrics = calibration(targets, probabilities, n_bins)
+    metrics['log_loss'] = log_loss(targets, probabilities)
+    metrics['brier_score'] = brier_score(targets, probabilities)
+
+    targets, probabilities, single = check_probabilities(targets, probabilities)
+    accuracy = np.mean(np.argmax(probabilities, axis = -1) == targets, axis = 1)
+    metrics['accuracy'] = accuracy[0] if single else accuracy
+
+    return metrics
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 22:03:11 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to create the scorer function and ranker of a
+    feature selection method by name. The scikit-feature modules are
+    imported only when one of their methods is selected, so runs using
+    only the information theoretical methods do not import (or require)
+    scikit-feature
+
+'''
+
+#%% import necessary libraries
+
+import importlib
+
+#%% define methods
+
+# module, scorer function and ranker function (for scikit-feature only)
+
+scorer_functions =  {
+                    'FISH': ('skfeature.function.similarity_based.fisher_score', 'fisher_score', 'feature_ranking'),
+                    'RELF': ('skfeature.function.similarity_based.reliefF', 'reliefF', 'feature_ranking'),
+                    'TRAC': ('skfeature.function.similarity_based.trace_ratio', 'trace_ratio', None),
+                    'GINI': ('skfeature.function.statistical_based.gini_index', 'gini_index', 'feature_ranking'),
+                    'CHI2': ('skfeature.function.statistical_based.chi_square', 'chi_square', 'feature_ranking'),
+                    'FSCR': ('skfeature.function.statistical_based.f_score', 'f_score', 'feature_ranking'),
+                    'DISR': ('information_theoretical_selection', 'disr', None),
+                    'CMIM': ('information_theoretical_selection', 'cmim', None),
+                    'ICAP': ('information_theoretical_selection', 'icap', None),
+                    'JMI': ('information_theoretical_selection', 'jmi', None),
+                    'CIFE': ('information_theoretical_selection', 'cife', None),
+                    'MIM': ('information_theoretical_selection', 'mim', None),
+                    'MRMR': ('information_theoretical_selection', 'mrmr', None),
+                    'MIFS': ('information_theoretical_selection', 'mifs', None)
+                    }
+
+#%% define function
+
+def create_feature_scorer(method):
+
+    '''
+    Args:
+        method: name of the feature selection method (str)
+    Returns:
+        scorer: scorer function of the method (function)
+        ranker: ranker function of the method (function or None)
+    '''
+
+    if method not in scorer_functions:
+        raise ValueError('Unknown feature selection method: %s' % method)
+
+    module_name, scorer_name, ranker_name = scorer_functions[method]
+    module = importlib.import_module(module_name)
+
+    return getattr(module, scorer_name), getattr(module, ranker_name) if ranker_name else None
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 21:52:36 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to create classification models by name. The
+    model classes are imported only when a model is created, so the scripts
+    do not import (or require) backends such as XGBoost or LogitBoost unless
+    the model is selected. The models can be referred to with their short
+    names or class names (e.g. 'ExtraTrees' or 'ExtraTreesClassifier')
+
+'''
+
+#%% import necessary libraries
+
+import importlib
+
+#%% define models
+
+model_classes = {
+                'ExtraTrees': ('sklearn.ensemble', 'ExtraTreesClassifier'),
+                'RandomForest': ('sklearn.ensemble', 'RandomForestClassifier'),
+                'AdaBoost': ('sklearn.ensemble', 'AdaBoostClassifier'),
+                'GradientBoosting': ('sklearn.ensemble', 'GradientBoostingClassifier'),
+                'SVC': ('sklearn.svm', 'SVC'),
+                'LogitBoost': ('logitboost', 'LogitBoost'),
+                'XGBClassifier': ('xgboost', 'XGBClassifier'),
+                'ComplementNB': ('sklearn.naive_bayes', 'ComplementNB'),
+                'BalancedBagging': ('imblearn.ensemble', 'BalancedBaggingClassifier'),
+                'BalancedRandomForest': ('imblearn.ensemble', 'BalancedRandomForestClassifier'),
+                'RUSBoost': ('imblearn.ensemble', 'RUSBoostClassifier'),
+                'EasyEnsemble': ('imblearn.ensemble', 'EasyEnsembleClassifier')
+                }
+
+#%% define function
+
+def create_model(name, **params):
+
+    '''
+    Args:
+        name: short name or class name of the model (str)
+        params: parameters of the model
+    Returns:
+        model: unfitted model (estimator)
+    '''
+
+    if name in model_classes:
+        module_name, class_name = model_classes[name]
+    else:
+        matches = [value for value in model_classes.values() if value[1] == name]
+        if not matches:
+            raise ValueError('Unknown model: %s' % name)
+        module_name, class_name = matches[0]
+
+    model_class = getattr(importlib.import_module(module_name), class_name)
+
+    return model_class(**params)
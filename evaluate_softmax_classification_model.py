@@ -15,11 +15,6 @@ Created on Mon Sep 10 12:44:11 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 #import math
@@ -39,13 +34,29 @@ import seaborn as sns
 from scale_features import scale_features
 from save_load_variables import save_load_variables
 from test_neural_network_softmax_classification_model import test_neural_network_softmax_classification_model
+from load_config import load_config
 
-#%% load variables
+#%% define parameters
+
+# define model directory, which can be overridden from the command line, e.g.
+#
+#     python evaluate_softmax_classification_model.py --set "model_dir=models/<run>"
+#
+# (runs saved by the TF1 Estimators, i.e. with checkpoint files instead of
+# model.json and model.weights.h5, cannot be loaded and have to be retrained)
 
 model_dir = 'models\\20181220-132846'
+
+config = load_config(globals(), ['model_dir'])
+
+#%% load variables
+
+# the saved model directory is not loaded, since the run may have been moved
+
 variables_to_save = None
 variables = save_load_variables(model_dir, variables_to_save, 'variables', 'load')
 for key,val in variables.items():
+    if key != 'model_dir':
         exec(key + '=val')
                
 #%% calculate test predictions
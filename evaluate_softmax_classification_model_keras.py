@@ -15,13 +15,9 @@ Created on Wed Nov 14 14:53:46 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
+import os
 import keras as k
 import pandas as pd
 import numpy as np
@@ -31,16 +27,33 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 from save_load_variables import save_load_variables
+from FigureExporter import FigureExporter
+from load_config import load_config
 
-#%% load model and variables
+#%% define parameters
+
+# define model directory and the file formats and resolution of the saved
+# figures, which can be overridden from the command line, e.g.
+#
+#     python evaluate_softmax_classification_model_keras.py --set "model_dir=Keras models/<run>"
 
 model_dir = 'Keras models\\20181115-152225_TA71_VA60'
 
+figure_formats = ['eps', 'pdf', 'png']
+figure_dpi = 600
+
+config = load_config(globals(), ['model_dir', 'figure_formats', 'figure_dpi'])
+
+#%% load model and variables
+
+# the saved model directory is not loaded, since the run may have been moved
+
 variables = save_load_variables(model_dir, None, 'variables', 'load')
 for key,val in variables.items():
+    if key != 'model_dir':
         exec(key + '=val')
         
-model = k.models.load_model(model_dir + '\\keras_model.h5')
+model = k.models.load_model(os.path.join(model_dir, 'keras_model.h5'))
                
 #%% evaluate model performance
 
@@ -118,33 +131,14 @@ plt.grid()
 
 #%% save figures and metrics
 
-f1.savefig(model_dir + '\\' + 'cm_training.eps', dpi = 600, format = 'eps',
-            bbox_inches = 'tight', pad_inches = 0)
-f1.savefig(model_dir + '\\' + 'cm_training.pdf', dpi = 600, format = 'pdf',
-            bbox_inches = 'tight', pad_inches = 0)
-f1.savefig(model_dir + '\\' + 'cm_training.png', dpi = 600, format = 'png',
-            bbox_inches = 'tight', pad_inches = 0)
-
-f2.savefig(model_dir + '\\' + 'cm_validation.eps', dpi = 600, format = 'eps',
-            bbox_inches = 'tight', pad_inches = 0)
-f2.savefig(model_dir + '\\' + 'cm_validation.pdf', dpi = 600, format = 'pdf',
-            bbox_inches = 'tight', pad_inches = 0)
-f2.savefig(model_dir + '\\' + 'cm_validation.png', dpi = 600, format = 'png',
-            bbox_inches = 'tight', pad_inches = 0)
-
-f3.savefig(model_dir + '\\' + 'cm_testing.eps', dpi = 600, format = 'eps',
-            bbox_inches = 'tight', pad_inches = 0)
-f3.savefig(model_dir + '\\' + 'cm_testing.pdf', dpi = 600, format = 'pdf',
-            bbox_inches = 'tight', pad_inches = 0)
-f3.savefig(model_dir + '\\' + 'cm_testing.png', dpi = 600, format = 'png',
-            bbox_inches = 'tight', pad_inches = 0)
-
-f4.savefig(model_dir + '\\' + 'LogLoss.eps', dpi = 600, format = 'eps',
-            bbox_inches = 'tight', pad_inches = 0)
-f4.savefig(model_dir + '\\' + 'LogLoss.pdf', dpi = 600, format = 'pdf',
-            bbox_inches = 'tight', pad_inches = 0)
-f4.savefig(model_dir + '\\' + 'LogLoss.png', dpi = 600, format = 'png',
-            bbox_inches = 'tight', pad_inches = 0)
+# figures are rendered in background processes while the metrics are saved
+
+exporter = FigureExporter(model_dir, formats = figure_formats, dpi = figure_dpi)
+
+exporter.export('cm_training', f1, cm_training)
+exporter.export('cm_validation', f2, cm_validation)
+exporter.export('cm_testing', f3, cm_testing)
+exporter.export('LogLoss', f4, [history.epoch, history.history['loss'], history.history['val_loss']])
 
 variables_to_save = {'training_loss': training_loss,
                      'training_accuracy': training_accuracy,
@@ -159,4 +153,6 @@ variables_to_save = {'training_loss': training_loss,
                      'cm_validation': cm_validation,
                      'cm_testing': cm_testing}
 
-save_load_variables(model_dir, variables_to_save, 'variables', 'add')
\ No newline at end of file
+save_load_variables(model_dir, variables_to_save, 'variables', 'add')
+
+exporter.close()
\ No newline at end of file
@@ -14,45 +14,25 @@ Created on Fri Jan 18 10:59:43 2019
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import os
 import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
-from sklearn.model_selection import GridSearchCV, train_test_split
+from joblib import Parallel, delayed, cpu_count
 from sklearn.svm import SVC
 #from sklearn.feature_selection import SelectKBest, chi2, f_classif, mutual_info_classif
 #from sklearn.utils.class_weight import compute_class_weight
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
-from sklearn.metrics import f1_score
-
-from skfeature.function.similarity_based import fisher_score
-from skfeature.function.similarity_based import reliefF
-from skfeature.function.similarity_based import trace_ratio
-from skfeature.function.statistical_based import gini_index
-from skfeature.function.statistical_based import chi_square                     # same as chi2
-from skfeature.function.statistical_based import f_score                        # same as f_classif
-#from skfeature.function.statistical_based import CFS
-#from skfeature.function.statistical_based import t_score                        # only for binary
-from skfeature.function.information_theoretical_based import JMI
-from skfeature.function.information_theoretical_based import CIFE
-from skfeature.function.information_theoretical_based import DISR
-from skfeature.function.information_theoretical_based import MIM
-from skfeature.function.information_theoretical_based import CMIM
-from skfeature.function.information_theoretical_based import ICAP
-from skfeature.function.information_theoretical_based import MRMR
-from skfeature.function.information_theoretical_based import MIFS
 
 from save_load_variables import save_load_variables
+from ResultsStore import ResultsStore
+from feature_selection_iteration import feature_selection_iteration, top_features_iteration
+from RankingCache import RankingCache
+from SVCGridSearch import SVCGridSearch
+from FigureExporter import FigureExporter
+from create_feature_scorer import create_feature_scorer
+from load_config import load_config
 
 #%% define logging and data display format
 
@@ -68,10 +48,6 @@ dataframe = pd.read_csv(r'fibroid_dataframe.csv', sep = ',')
 
 nan_percent = pd.DataFrame(dataframe.isnull().mean() * 100, columns = ['NaN ratio'])
 
-#%% display NPV histogram
-
-dataframe['NPV ratio'].hist(bins = 20)
-
 #%% categorise NPV into classes according to bins
 
 NPV_bins = [-1, 29.9, 80, 100]
@@ -159,42 +135,6 @@ methods =   ['FISH',
              'MIFS'
              ]
 
-# define scorer functions
-
-scorers = [fisher_score.fisher_score, 
-           reliefF.reliefF,
-           trace_ratio.trace_ratio,
-           gini_index.gini_index,
-           chi_square.chi_square, 
-           f_score.f_score,
-           DISR.disr, 
-           CMIM.cmim,
-           ICAP.icap,
-           JMI.jmi,
-           CIFE.cife,
-           MIM.mim,
-           MRMR.mrmr,
-           MIFS.mifs
-           ]
-
-# define scorer rankers (for scikit-feature only)
-
-rankers = [fisher_score.feature_ranking, 
-           reliefF.feature_ranking,
-           None,
-           gini_index.feature_ranking,
-           chi_square.feature_ranking,
-           f_score.feature_ranking,
-           None,
-           None,
-           None,
-           None,
-           None,
-           None, 
-           None,
-           None
-           ]
-
 # define parameters for parameter search
 
 grid_param =    {
@@ -215,21 +155,84 @@ impute_labels = ['Height',
 max_iter = 200000
 class_weight = 'balanced'
 
-clf_model = SVC(probability = True, class_weight = class_weight, cache_size = 4000,
-                max_iter = max_iter)
-
-# define parameter search method
+# define the number of cross-validations and scoring metric for parameter
+# search
 
 cv = 10
 scoring = 'f1_micro'
+
+# define number of iterations run in parallel processes (1 runs serially) and
+# number of jobs for each parameter search (None divides the cores between 
+# the processes to avoid oversubscription)
+
+n_workers = 1
+n_inner_jobs = None
+
+# define directory for caching the feature rankings between runs (None 
+# disables caching)
+
+ranking_cache_dir = os.path.join('Feature selection', 'Ranking cache')
+
+# define file formats and resolution of the saved figures
+
+figure_formats = ['pdf', 'png', 'eps']
+figure_dpi = 600
+
+# headless mode skips all plotting (matplotlib is never imported), so batch
+# jobs do not need a display, the figures can be plotted afterwards from the
+# saved variables with report_figures.py
+
+headless = False
+
+# define output directory of the results
+
+output_dir = 'Feature selection'
+
+#%% read configuration
+
+# the parameters above are defaults, which can be overridden when the script
+# is run from the command line, e.g.
+#
+#     python feature_selection.py --config config.yaml --set n_workers=4
+
+config = load_config(globals(), ['feature_labels', 'target_label', 'n_iterations', 'split_ratio',
+                                 'scaling_type', 'n_features', 'methods', 'grid_param',
+                                 'impute_labels', 'max_iter', 'class_weight', 'cv', 'scoring',
+                                 'n_workers', 'n_inner_jobs', 'ranking_cache_dir',
+                                 'figure_formats', 'figure_dpi', 'headless', 'output_dir'])
+
+#%% display NPV histogram
+
+if not headless:
+    dataframe['NPV ratio'].hist(bins = 20)
+
+#%% define scorers and models
+
+# define scorer functions and rankers (rankers for scikit-feature only, the
+# modules are imported only for the selected methods)
+
+scorers, rankers = [list(functions) for functions in zip(*[create_feature_scorer(method) for method in methods])]
+
+# define classification model
+
+clf_model = SVC(probability = True, class_weight = class_weight, cache_size = 4000,
+                max_iter = max_iter)
+
+# define parameter search method (the kernel of each gamma is calculated once
+# per fold from cached squared distances, equivalent to GridSearchCV with
+# iid = False)
     
-clf_grid = GridSearchCV(clf_model, grid_param, n_jobs = -1, cv = cv, 
-                        scoring = scoring, refit = True, iid = False)
+clf_grid = SVCGridSearch(clf_model, grid_param, n_jobs = -1, cv = cv, 
+                         scoring = scoring, refit = True)
+
+if n_inner_jobs is None:
+    n_inner_jobs = -1 if n_workers == 1 else max(1, cpu_count() // n_workers)
 
 # initialise variables
 
-clf_results = pd.DataFrame()
-feature_rankings = pd.DataFrame()
+ranking_cache = RankingCache(ranking_cache_dir) if ranking_cache_dir is not None else None
+clf_store = ResultsStore()
+rankings_store = ResultsStore()
 k = len(feature_labels)
 
 #%% start the iteration
@@ -237,150 +240,31 @@ k = len(feature_labels)
 timestr = time.strftime('%Y%m%d-%H%M%S')
 start_time = time.time()
 
-for iteration in range(0, n_iterations):
-    
-    # define random state
+# draw random states for all iterations
 
-    random_state = np.random.randint(0, 10000)
-    
-    # assign random state to grid parameters
-    
-    grid_param['random_state'] = [random_state]
-    
-    # print progress
-    
-    print('Iteration %d with random state %d at %.1f min' % (iteration, random_state, 
-                                                             ((time.time() - start_time) / 60)))
-    
-    # randomise and divive data for cross-validation
-    
-    training_set, testing_set = train_test_split(dataframe, test_size = split_ratio,
-                                                 stratify = dataframe[target_label],
-                                                 random_state = random_state)
-    
-    impute_values = {}
-    
-    for label in impute_labels:
-        
-        if label in {'Height', 'ADC'}:
-            
-            impute_values[label] = training_set[label].mean()
-            
-            training_set[label] = training_set[label].fillna(impute_values[label])
-            testing_set[label] = testing_set[label].fillna(impute_values[label])
-            
-        else:
-            
-            impute_values[label] = training_set[label].mode()[0]
-            
-            training_set[label] = training_set[label].fillna(impute_values[label])
-            testing_set[label] = testing_set[label].fillna(impute_values[label])
-            
-    del label
-    
-    # define features and targets
-    
-    training_features = training_set[feature_labels]
-    testing_features = testing_set[feature_labels]
-    
-    training_targets = training_set[target_label]
-    testing_targets = testing_set[target_label]
-    
-    # scale features
-       
-    if scaling_type == 'log':
-        
-        training_features = np.log1p(training_features)
-        testing_features = np.log1p(testing_features)
-        
-    elif scaling_type == 'minmax':
-        
-        scaler = MinMaxScaler(feature_range = (0, 1)) 
-        training_features = pd.DataFrame(scaler.fit_transform(training_features),
-                                         columns = training_features.columns,
-                                         index = training_features.index)
-        testing_features = pd.DataFrame(scaler.transform(testing_features),
-                                        columns = testing_features.columns,
-                                        index = testing_features.index)
-        
-    elif scaling_type == 'standard':
-        
-        scaler = StandardScaler() 
-        training_features = pd.DataFrame(scaler.fit_transform(training_features),
-                                         columns = training_features.columns,
-                                         index = training_features.index)
-        testing_features = pd.DataFrame(scaler.transform(testing_features),
-                                        columns = testing_features.columns,
-                                        index = testing_features.index)
-    
-    # find k best features for each feature selection method
-    
-    k_features = pd.DataFrame(index = range(0, k), columns = methods)
-    
-    for scorer, ranker, method in zip(scorers, rankers, methods):
-        
-        if method in ('DISR', 'CMIM', 'ICAP', 'JMI', 'CIFE', 'MIM', 'MRMR', 'MIFS', 'TRAC'):
-            
-            indices, _, _ = scorer(training_features.values, training_targets.values[:, 0], n_selected_features = k)
-            k_features[method] = pd.DataFrame(training_features.columns.values[indices], columns = [method])
-            
-            del indices
-        
-        else:
-            
-            scores = scorer(training_features.values, training_targets.values[:, 0])
-            indices = ranker(scores)
-            k_features[method] = pd.DataFrame(training_features.columns.values[indices[0:k]], columns = [method])
-            
-            del scores, indices
-            
-    del scorer, ranker, method
-    
-    # calculate feature scores
-    
-    k_rankings = pd.DataFrame(k_features.T.values.argsort(1),
-                              columns = np.sort(k_features.iloc[:, 0].values),
-                              index = k_features.columns)
-    k_rankings['method'] = k_rankings.index
-    k_rankings['iteration'] = iteration
-    k_rankings['random_state'] = random_state
-    feature_rankings = feature_rankings.append(k_rankings, sort = False, ignore_index = True)
-    
-    del k_rankings
-    
-    # train model using parameter search
-
-    for n in n_features:
-        for method in methods:
-            
-            # fit parameter search
-        
-            clf_fit = clf_grid.fit(training_features[k_features[method][0:n]].values, training_targets.values[:, 0])
-            
-            # calculate predictions
-            
-            testing_predictions = clf_fit.predict(testing_features[k_features[method][0:n]].values)
-            test_score = f1_score(testing_targets.values[:, 0], testing_predictions, average = scoring[3:])
-            
-            # save results
-            
-            df = pd.DataFrame(clf_fit.best_params_, index = [0])
-            df['method'] = method
-            df['validation_score'] = clf_fit.best_score_
-            df['test_score'] = test_score
-            df['n_features'] = n
-            df['iteration'] = iteration
-            df['random_state'] = random_state
-            clf_results = clf_results.append(df, sort = False, ignore_index = True)
-            
-            del clf_fit, testing_predictions, test_score, df
-    
-    del n, method
-    del k_features, random_state, impute_values
-    del training_set, training_features, training_targets
-    del testing_set, testing_features, testing_targets
-    
-del iteration
+random_states = [np.random.randint(0, 10000) for iteration in range(0, n_iterations)]
+
+# run the iterations (in parallel if n_workers > 1)
+
+iteration_results = Parallel(n_jobs = n_workers)(
+        delayed(feature_selection_iteration)(
+                dataframe, feature_labels, target_label, impute_labels, split_ratio,
+                scaling_type, methods, scorers, rankers, n_features, clf_grid, scoring,
+                iteration, random_state, start_time, n_jobs = n_inner_jobs,
+                ranking_cache = ranking_cache)
+        for iteration, random_state in enumerate(random_states))
+
+# combine results in the order of iterations
+
+for results, k_rankings in iteration_results:
+    for result in results:
+        clf_store.add(result)
+    rankings_store.add_frame(k_rankings)
+
+clf_results = clf_store.to_dataframe()
+feature_rankings = rankings_store.to_dataframe()
+
+del clf_store, rankings_store, random_states, iteration_results, results, k_rankings, result
 
 end_time = time.time()
 
@@ -437,118 +321,27 @@ top_features_median['method'] = 'TOPN'
 
 #%% train model with only top features
 
-top_results = pd.DataFrame()
+top_store = ResultsStore()
 random_states = clf_results.random_state.unique()
-iteration = 0
 
 time_stamp = time.time()
 
-for random_state in random_states:
-    
-    # assign random state to grid parameters
-    
-    grid_param['random_state'] = [random_state]
-    
-    # print progress
-    
-    print('Iteration %d with random state %d at %.1f min' % (iteration, random_state, 
-                                                             ((time.time() - time_stamp) / 60)))
-    
-    # randomise and divive data for cross-validation
-    
-    training_set, testing_set = train_test_split(dataframe, test_size = split_ratio,
-                                                 stratify = dataframe[target_label],
-                                                 random_state = random_state)
-    
-    impute_values = {}
-    
-    for label in impute_labels:
-        
-        if label in {'Height', 'ADC'}:
-            
-            impute_values[label] = training_set[label].mean()
-            
-            training_set[label] = training_set[label].fillna(impute_values[label])
-            testing_set[label] = testing_set[label].fillna(impute_values[label])
-            
-        else:
-            
-            impute_values[label] = training_set[label].mode()[0]
-            
-            training_set[label] = training_set[label].fillna(impute_values[label])
-            testing_set[label] = testing_set[label].fillna(impute_values[label])
-            
-    del label
-    
-    # define features and targets
-    
-    training_features = training_set[feature_labels]
-    testing_features = testing_set[feature_labels]
-    
-    training_targets = training_set[target_label]
-    testing_targets = testing_set[target_label]
-    
-    # scale features
-       
-    if scaling_type == 'log':
-        
-        training_features = np.log1p(training_features)
-        testing_features = np.log1p(testing_features)
-        
-    elif scaling_type == 'minmax':
-        
-        scaler = MinMaxScaler(feature_range = (0, 1)) 
-        training_features = pd.DataFrame(scaler.fit_transform(training_features),
-                                         columns = training_features.columns,
-                                         index = training_features.index)
-        testing_features = pd.DataFrame(scaler.transform(testing_features),
-                                        columns = testing_features.columns,
-                                        index = testing_features.index)
-        
-    elif scaling_type == 'standard':
-        
-        scaler = StandardScaler() 
-        training_features = pd.DataFrame(scaler.fit_transform(training_features),
-                                         columns = training_features.columns,
-                                         index = training_features.index)
-        testing_features = pd.DataFrame(scaler.transform(testing_features),
-                                        columns = testing_features.columns,
-                                        index = testing_features.index)
-    
-    for n in n_features:
-        
-        # fit parameter search
-            
-        clf_fit = clf_grid.fit(training_features[top_features_median['feature'][0:n]].values, training_targets.values[:, 0])
-        
-        # calculate predictions
-        
-        testing_predictions = clf_fit.predict(testing_features[top_features_median['feature'][0:n]].values)
-        test_score = f1_score(testing_targets.values[:, 0], testing_predictions, average = scoring[3:])
-        
-        # save results
-        
-        df = pd.DataFrame(clf_fit.best_params_, index = [0])
-        df['method'] = 'TOPN'
-        df['validation_score'] = clf_fit.best_score_
-        df['test_score'] = test_score
-        df['n_features'] = n
-        df['iteration'] = iteration
-        df['random_state'] = random_state
-        top_results = top_results.append(df, sort = False, ignore_index = True)
-        
-        del clf_fit, testing_predictions, test_score, df
-        
-    del n
-    del impute_values
-    del training_set, training_features, training_targets
-    del testing_set, testing_features, testing_targets
-        
-    iteration += 1
+iteration_results = Parallel(n_jobs = n_workers)(
+        delayed(top_features_iteration)(
+                dataframe, feature_labels, target_label, impute_labels, split_ratio,
+                scaling_type, top_features_median['feature'], n_features, clf_grid,
+                scoring, iteration, random_state, time_stamp, n_jobs = n_inner_jobs)
+        for iteration, random_state in enumerate(random_states))
+
+for results in iteration_results:
+    for result in results:
+        top_store.add(result)
+
+top_results = top_store.to_dataframe()
 
 print('Total execution time: %.1f min' % ((time.time() - time_stamp) / 60))
 
-del random_state, iteration, time_stamp
+del random_states, time_stamp, top_store, iteration_results, results, result
 
 #%% calculate top summaries
 
@@ -605,115 +398,37 @@ method_corr_mask[np.triu_indices_from(method_corr_mask)] = True
 
 #%% plot figures
 
-# define colormap
-
-#cmap = sns.diverging_palette(220, 10, as_cmap = True)
-cmap = 'RdBu'
-
-# plot validation and test scores
-
-f1 = plt.figure()
-ax = sns.heatmap(heatmap_vscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = ".2f")
-#ax.set_aspect(1)
-plt.ylabel('Feature selection method')
-plt.xlabel('Number of features')
-
-f2 = plt.figure()
-ax = sns.heatmap(heatmap_tscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = ".2f")
-#ax.set_aspect(1)
-plt.ylabel('Feature selection method')
-plt.xlabel('Number of features')
-
-f3 = plt.figure()
-ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'validation_score', 
-                  label = 'Validation', ci = 95)
-ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'test_score', 
-                  label = 'Test', ci = 95)
-ax.grid(True)
-ax.xaxis.set_major_locator(ticker.MultipleLocator(2))
-ax.autoscale(enable = True, axis = 'x', tight = True)
-plt.legend(loc = 'lower right')
-plt.ylabel('Mean score')
-plt.xlabel('Number of features')
-
-# plot feature rankings
-
-f4 = plt.figure(figsize = (16, 4))
-ax = sns.boxplot(x = 'feature', y = 'ranking', data = feature_boxplot, order = top_features_median['feature'],
-                 whis = 1.5, palette = 'Blues', fliersize = 2, notch = True)
-#ax = sns.swarmplot(x = 'feature', y = 'ranking', data = feature_boxplot, order = feature_order, 
-#                   size = 2, color = '.3', linewidth = 0)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 90)
-plt.ylabel('Ranking')
-plt.xlabel('Feature')
-
-f5 = plt.figure(figsize = (22, 4))
-ax = sns.heatmap(heatmap_rankings_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.1f',
-                 cbar_kws = {'ticks': [0, 19, 38], 'pad': 0.01})
-#ax.set_aspect(1)
-plt.ylabel('Feature selection method')
-plt.xlabel('Feature')
-
-f6 = plt.figure(figsize = (18, 4))
-ax = sns.heatmap(heatmap_rankings_median, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.0f',
-                 cbar_kws = {'ticks': [0, 19, 38], 'pad': 0.01})
-#ax.set_aspect(1)
-plt.ylabel('Feature selection method')
-plt.xlabel('Feature')
-
-# plot parameter distributions
-
-f7 = plt.figure()
-ax = clf_results.C.value_counts().plot(kind = 'bar')
-plt.ylabel('Count')
-plt.xlabel('C')
-
-f8 = plt.figure()
-ax = clf_results.gamma.value_counts().plot(kind = 'bar')
-plt.ylabel('Count')
-plt.xlabel('Gamma')
-
-# plot correlations
-
-f9 = plt.figure(figsize = (4, 4))
-ax = sns.heatmap(feature_corr, mask = feature_corr_mask, cmap = cmap, vmin = -1, vmax = 1, center = 0,
-                 square = True, linewidths = 0.5, cbar_kws = {'shrink': 0.6, 'ticks': [-1, 0, 1],
-                                                              'pad': 0})
-
-f10 = plt.figure(figsize = (6, 6))
-ax = sns.heatmap(method_corr, mask = method_corr_mask, cmap = cmap, vmin = -1, vmax = 1, center = 0,
-                 square = True, linewidths = 0.5, cbar_kws = {'shrink': 0.5, 'ticks': [-1, 0, 1],
-                                                              'pad': -0.1})
+figures = []
+
+if not headless:
+    
+    from plot_feature_selection import plot_feature_selection
+    
+    figures = plot_feature_selection(heatmap_vscore_mean, heatmap_tscore_mean, clf_summary, clf_results,
+                                     feature_boxplot, top_features_median, heatmap_rankings_mean, 
+                                     heatmap_rankings_median, feature_corr, feature_corr_mask, 
+                                     method_corr, method_corr_mask)
 
 #%% save figures and variables
 
-model_dir = 'Feature selection\\%s_NF%d_NM%d_NI%d' % (timestr, max(n_features), len(methods), n_iterations)
+model_dir = os.path.join(output_dir, 
+                         '%s_NF%d_NM%d_NI%d' % (timestr, max(n_features), len(methods), n_iterations))
 
-if not os.path.exists(model_dir):
-    os.makedirs(model_dir)
-    
-for filetype in ['pdf', 'png', 'eps']:
+# the process id keeps the directories of runs started at the same time apart
+
+if os.path.exists(model_dir):
+    model_dir = '%s_%d' % (model_dir, os.getpid())
+
+os.makedirs(model_dir)
     
-    f1.savefig(model_dir + '\\' + 'heatmap_vscore_mean.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f2.savefig(model_dir + '\\' + 'heatmap_tscore_mean.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f3.savefig(model_dir + '\\' + 'lineplot_scores.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f4.savefig(model_dir + '\\' + 'boxplot_feature_rankings.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f5.savefig(model_dir + '\\' + 'heatmap_rankings_mean.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f6.savefig(model_dir + '\\' + 'heatmap_rankings_median.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f7.savefig(model_dir + '\\' + 'parameter_c.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f8.savefig(model_dir + '\\' + 'parameter_gamma.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f9.savefig(model_dir + '\\' + 'feature_corr.' + filetype, dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f10.savefig(model_dir + '\\' + 'method_corr.' + filetype, dpi = 600, format = filetype,
-                bbox_inches = 'tight', pad_inches = 0)
+# save figures (rendered in background processes while the variables are
+# saved, figures unchanged since an earlier run are copied from the cache)
+
+exporter = FigureExporter(model_dir, formats = figure_formats, dpi = figure_dpi,
+                          cache_dir = os.path.join(output_dir, 'Figure cache'))
+
+for name, figure, data in figures:
+    exporter.export(name, figure, data)
 
 variables_to_save = {'nan_percent': nan_percent,
                      'grid_param': grid_param,
@@ -748,9 +463,12 @@ variables_to_save = {'nan_percent': nan_percent,
                      'split_ratio': split_ratio,
                      'timestr': timestr,
                      'scaling_type': scaling_type,
+                     'config': config,
                      'model_dir': model_dir,
                      'dataframe': dataframe,
                      'feature_labels': feature_labels,
                      'target_label': target_label}
     
 save_load_variables(model_dir, variables_to_save, 'variables', 'save')
+
+exporter.close()
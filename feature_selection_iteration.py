@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 11:05:32 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    These functions run a single random state iteration of the feature
+    selection (split, impute, scale, rank features and fit the parameter
+    search). They are defined in a module so that the iterations can be
+    fanned out over a process pool from feature_selection.py
+
+'''
+
+#%% import necessary packages
+
+import time
+from functools import partial
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, check_cv
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.metrics import f1_score
+
+#%% define functions
+
+def split_features(dataframe, feature_labels, target_label, impute_labels,
+                   split_ratio, scaling_type, random_state):
+
+    ''' Splits, imputes and scales the data for a single iteration
+
+    Args:
+        dataframe: features and targets (DataFrame)
+        feature_labels: names of the features (list)
+        target_label: name of the target (list)
+        impute_labels: names of the features to impute (list)
+        split_ratio: ratio of the testing set (float)
+        scaling_type: type of scaling ('log', 'minmax', 'standard' or None)
+        random_state: random state for the split (int)
+    Returns:
+        training_features, testing_features: scaled features (DataFrame)
+        training_targets, testing_targets: targets (DataFrame)
+    '''
+
+    # randomise and divive data for cross-validation
+
+    training_set, testing_set = train_test_split(dataframe, test_size = split_ratio,
+                                                 stratify = dataframe[target_label],
+                                                 random_state = random_state)
+
+    # impute features using training set values
+
+    impute_values = {}
+
+    for label in impute_labels:
+        if label in {'Height', 'ADC'}:
+            impute_values[label] = training_set[label].mean()
+        else:
+            impute_values[label] = training_set[label].mode()[0]
+
+    training_set = training_set.fillna(impute_values)
+    testing_set = testing_set.fillna(impute_values)
+
+    # define features and targets
+
+    training_features = training_set[feature_labels]
+    testing_features = testing_set[feature_labels]
+
+    training_targets = training_set[target_label]
+    testing_targets = testing_set[target_label]
+
+    # scale features
+
+    if scaling_type == 'log':
+
+        training_features = np.log1p(training_features)
+        testing_features = np.log1p(testing_features)
+
+    elif scaling_type == 'minmax' or scaling_type == 'standard':
+
+        if scaling_type == 'minmax':
+            scaler = MinMaxScaler(feature_range = (0, 1))
+        else:
+            scaler = StandardScaler()
+
+        training_features = pd.DataFrame(scaler.fit_transform(training_features),
+                                         columns = training_features.columns,
+                                         index = training_features.index)
+        testing_features = pd.DataFrame(scaler.transform(testing_features),
+                                        columns = testing_features.columns,
+                                        index = testing_features.index)
+
+    return training_features, testing_features, training_targets, testing_targets
+
+
+def rank_features(scorer, ranker, method, features, targets, k):
+
+    ''' Returns the indices of the k best features using the given scorer
+    (and ranker for scikit-feature scores) '''
+
+    if method in ('DISR', 'CMIM', 'ICAP', 'JMI', 'CIFE', 'MIM', 'MRMR', 'MIFS', 'TRAC'):
+
+        indices, _, _ = scorer(features, targets, n_selected_features = k)
+
+    else:
+
+        scores = scorer(features, targets)
+        indices = ranker(scores)
+
+    return indices[0:k]
+
+
+def fit_parameter_search(clf_grid, scoring, training_features, testing_features,
+                         training_targets, testing_targets, labels):
+
+    ''' Fits the parameter search using the given features and scores it on
+    the testing set
+
+    Returns:
+        best_params: best parameters (dict)
+        validation_score: mean cross-validated score of the best parameters (float)
+        test_score: score on the testing set (float)
+    '''
+
+    clf_fit = clf_grid.fit(training_features[labels].values, training_targets.values[:, 0])
+
+    testing_predictions = clf_fit.predict(testing_features[labels].values)
+    test_score = f1_score(testing_targets.values[:, 0], testing_predictions, average = scoring[3:])
+
+    return clf_fit.best_params_, clf_fit.best_score_, test_score
+
+
+def iteration_grid(clf_grid, random_state, n_jobs, training_features, training_targets):
+
+    ''' Returns a copy of the parameter search with the random state of the
+    iteration, the number of jobs for the grid search and the fold indices of
+    the training set. The folds only depend on the targets, so they are
+    calculated once and shared by all feature subsets of the iteration '''
+
+    grid_param = dict(clf_grid.param_grid)
+    grid_param['random_state'] = [random_state]
+
+    targets = training_targets.values[:, 0]
+    folds = list(check_cv(clf_grid.cv, targets, classifier = True).split(
+            training_features.values, targets))
+
+    return clone(clf_grid).set_params(param_grid = grid_param, n_jobs = n_jobs, cv = folds)
+
+
+def feature_selection_iteration(dataframe, feature_labels, target_label, impute_labels,
+                                split_ratio, scaling_type, methods, scorers, rankers,
+                                n_features, clf_grid, scoring, iteration, random_state,
+                                start_time, n_jobs = -1, ranking_cache = None):
+
+    ''' Ranks the features using each selection method and fits the parameter
+    search for the top n features of each method
+
+    Args:
+        methods, scorers, rankers: feature selection methods and functions (list)
+        n_features: number of top features to train with (list)
+        clf_grid: parameter search (SVCGridSearch or GridSearchCV)
+        scoring: scoring metric ('f1_*')
+        iteration: index of the iteration (int)
+        random_state: random state of the iteration (int)
+        start_time: start time of the run for progress display (float)
+        n_jobs: number of jobs for the parameter search (int)
+        ranking_cache: cache for the feature rankings (RankingCache or None)
+    Returns:
+        results: best parameters and scores for each method and n (list)
+        k_rankings: feature rankings of each method (DataFrame)
+    '''
+
+    print('Iteration %d with random state %d at %.1f min' % (iteration, random_state,
+                                                             ((time.time() - start_time) / 60)))
+
+    training_features, testing_features, training_targets, testing_targets = split_features(
+            dataframe, feature_labels, target_label, impute_labels, split_ratio,
+            scaling_type, random_state)
+
+    # find k best features for each feature selection method
+
+    k = len(feature_labels)
+    k_features = pd.DataFrame(index = range(0, k), columns = methods)
+
+    for scorer, ranker, method in zip(scorers, rankers, methods):
+
+        function = partial(rank_features, scorer, ranker, method)
+
+        if ranking_cache is None:
+            indices = function(training_features.values, training_targets.values[:, 0], k)
+        else:
+            indices = ranking_cache.rank(method, function, training_features.values,
+                                         training_targets.values[:, 0], k, scorer = scorer)
+
+        k_features[method] = pd.DataFrame(training_features.columns.values[indices], columns = [method])
+
+    # calculate feature scores
+
+    k_rankings = pd.DataFrame(k_features.T.values.argsort(1),
+                              columns = np.sort(k_features.iloc[:, 0].values),
+                              index = k_features.columns)
+    k_rankings['method'] = k_rankings.index
+    k_rankings['iteration'] = iteration
+    k_rankings['random_state'] = random_state
+
+    # train model using parameter search, methods selecting the same feature
+    # subset reuse the results of the first one
+
+    grid = iteration_grid(clf_grid, random_state, n_jobs, training_features, training_targets)
+    subset_results = {}
+    results = []
+
+    for n in n_features:
+        for method in methods:
+
+            labels = k_features[method][0:n]
+            subset = tuple(sorted(labels))
+
+            if subset not in subset_results:
+                subset_results[subset] = fit_parameter_search(
+                        grid, scoring, training_features, testing_features,
+                        training_targets, testing_targets, labels)
+
+            best_params, validation_score, test_score = subset_results[subset]
+
+            result = dict(best_params)
+            result['method'] = method
+            result['validation_score'] = validation_score
+            result['test_score'] = test_score
+            result['n_features'] = n
+            result['iteration'] = iteration
+            result['random_state'] = random_state
+            results.append(result)
+
+    return results, k_rankings
+
+
+def top_features_iteration(dataframe, feature_labels, target_label, impute_labels,
+                           split_ratio, scaling_type, top_features, n_features,
+                           clf_grid, scoring, iteration, random_state, start_time,
+                           n_jobs = -1):
+
+    ''' Fits the parameter search for the top n features of all methods
+
+    Args:
+        top_features: features in the order of their combined ranking (list)
+        (see feature_selection_iteration for the other arguments)
+    Returns:
+        results: best parameters and scores for each n (list)
+    '''
+
+    print('Iteration %d with random state %d at %.1f min' % (iteration, random_state,
+                                                             ((time.time() - start_time) / 60)))
+
+    training_features, testing_features, training_targets, testing_targets = split_features(
+            dataframe, feature_labels, target_label, impute_labels, split_ratio,
+            scaling_type, random_state)
+
+    grid = iteration_grid(clf_grid, random_state, n_jobs, training_features, training_targets)
+    results = []
+
+    for n in n_features:
+
+        best_params, validation_score, test_score = fit_parameter_search(
+                grid, scoring, training_features, testing_features,
+                training_targets, testing_targets, top_features[0:n])
+
+        result = dict(best_params)
+        result['method'] = 'TOPN'
+        result['validation_score'] = validation_score
+        result['test_score'] = test_score
+        result['n_features'] = n
+        result['iteration'] = iteration
+        result['random_state'] = random_state
+        results.append(result)
+
+    return results
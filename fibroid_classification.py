@@ -15,11 +15,6 @@ Created on Fri May 25 09:31:49 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 #import math
@@ -44,7 +39,7 @@ from calculate_class_weights import calculate_class_weights
 
 #%% define logging and data display format
 
-tf.logging.set_verbosity(tf.logging.ERROR)
+tf.get_logger().setLevel('ERROR')
 pd.options.display.max_rows = 10
 pd.options.display.float_format = '{:.1f}'.format
 
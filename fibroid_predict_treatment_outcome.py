@@ -15,11 +15,6 @@ Created on Thu May 31 09:09:30 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 #import math
@@ -43,7 +38,7 @@ from save_load_variables import save_load_variables
 
 #%% define logging and data display format
 
-tf.logging.set_verbosity(tf.logging.ERROR)
+tf.get_logger().setLevel('ERROR')
 pd.options.display.max_rows = 10
 pd.options.display.float_format = '{:.1f}'.format
 
@@ -15,11 +15,6 @@ Created on Mon Dec 17 08:49:35 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import xgboost as xgb
@@ -15,11 +15,6 @@ Created on Tue Sep 18 10:34:21 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 from IPython import display
@@ -35,7 +30,7 @@ from save_load_variables import save_load_variables
 
 #%% define logging and data display format
 
-tf.logging.set_verbosity(tf.logging.ERROR)
+tf.get_logger().setLevel('ERROR')
 pd.options.display.max_rows = 10
 pd.options.display.float_format = '{:.1f}'.format
 
@@ -131,6 +126,12 @@ batch_norm = False
 optimiser = 'Adam'
 save_model = True
 
+# number of training steps between the evaluations of the training and
+# validation sets (run in-graph during the training), i.e. each period of the
+# learning curves is evaluation_steps long (None trains in ten periods)
+
+evaluation_steps = None
+
 # directory for saving the model
 
 if save_model is True:
@@ -155,7 +156,8 @@ dnn_classifier, training_predictions, validation_predictions = train_neural_netw
     training_features = training_features,
     training_targets = training_targets,
     validation_features = validation_features,
-    validation_targets = validation_targets)
+    validation_targets = validation_targets,
+    evaluation_steps = evaluation_steps)
 
 # save variables
 
@@ -171,6 +173,7 @@ if save_model is True:
                          'dropout': dropout,
                          'batch_norm': batch_norm,
                          'optimiser': optimiser,
+                         'evaluation_steps': evaluation_steps,
                          'model_dir': model_dir,
                          'training_set': training_set,
                          'training_features': training_features,
@@ -16,11 +16,6 @@ Created on Thu Nov  8 13:11:40 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import keras as k
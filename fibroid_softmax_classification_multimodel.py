@@ -15,11 +15,6 @@ Created on Thu Jan 10 13:05:04 2019
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import os
@@ -28,20 +23,12 @@ import pandas as pd
 import numpy as np
 import scipy as sp
 from sklearn import datasets
-from sklearn.ensemble import ExtraTreesClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.ensemble import AdaBoostClassifier
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.svm import SVC
-from sklearn.naive_bayes import ComplementNB
-from logitboost import LogitBoost
-from xgboost import XGBClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.utils.class_weight import compute_class_weight
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, KBinsDiscretizer
-from sklearn.impute import SimpleImputer
 
 from EstimatorSelectionHelper import EstimatorSelectionHelper
+from PreprocessingPipeline import PreprocessingPipeline
+from create_model import create_model
 
 #%% define random state
 
@@ -133,15 +120,7 @@ training_set, testing_set = train_test_split(df, test_size = split_ratio,
                                              stratify = df[target_label],
                                              random_state = random_state)
 
-#%% define features and targets
-
-training_features = training_set[feature_labels]
-testing_features = testing_set[feature_labels]
-
-training_targets = training_set[target_label]
-testing_targets = testing_set[target_label]
-
-#%% impute features
+#%% pre-process features (impute, discretise and scale)
 
 impute = True
 
@@ -152,16 +131,10 @@ if impute:
                      ]
     impute_mode =   ['Gravidity']
     
-    imp_mean = SimpleImputer(missing_values = np.nan, strategy = 'mean')
-    imp_mode = SimpleImputer(missing_values = np.nan, strategy = 'most_frequent')
+else:
     
-    training_features[impute_mean] = imp_mean.fit_transform(training_features[impute_mean])
-    testing_features[impute_mean] = imp_mean.transform(testing_features[impute_mean])
-    
-    training_features[impute_mode] = imp_mode.fit_transform(training_features[impute_mode])
-    testing_features[impute_mode] = imp_mode.transform(testing_features[impute_mode])
-
-#%% discretise features
+    impute_mean =   []
+    impute_mode =   []
 
 discretise = False
 
@@ -177,57 +150,47 @@ if discretise:
                      #'ADC'
                      ]
     
-    enc = KBinsDiscretizer(n_bins = 10, encode = 'ordinal', strategy = 'uniform')
-    
-    training_features[disc_labels] = enc.fit_transform(training_features[disc_labels])
-    testing_features[disc_labels] = enc.transform(testing_features[disc_labels])
+else:
     
-    disc_bins = enc.n_bins_
-    disc_edges = enc.bin_edges_
-
-#%% scale features
+    disc_labels =   []
 
 scaling_type = 'log'
 
-if scaling_type == 'log':
-        
-    training_features = np.log1p(training_features)
-    testing_features = np.log1p(testing_features)
-    
-elif scaling_type == 'minmax':
-    
-    scaler = MinMaxScaler(feature_range = (0, 1))
-    
-    training_features[feature_labels] = scaler.fit_transform(training_features[feature_labels])
-    testing_features[feature_labels] = scaler.transform(testing_features[feature_labels])
-    
-elif scaling_type == 'standard':
-    
-    scaler = StandardScaler()
+preprocessing = PreprocessingPipeline(feature_labels, impute_mean = impute_mean, 
+                                      impute_mode = impute_mode, discretise = disc_labels,
+                                      scaling_type = scaling_type)
+
+training_features, training_targets = preprocessing.fit_transform(training_set, training_set[target_label])
+testing_features = preprocessing.transform(testing_set)
+testing_targets = testing_set[target_label].values[:, 0]
+
+if discretise:
     
-    training_features[feature_labels] = scaler.fit_transform(training_features[feature_labels])
-    testing_features[feature_labels] = scaler.transform(testing_features[feature_labels])
+    disc_bins = preprocessing.discretiser.n_bins_
+    disc_edges = preprocessing.discretiser.bin_edges_
 
 #%% calculate class weights
 
 class_weights = compute_class_weight('balanced', np.unique(training_targets), 
-                                     training_targets[target_label[0]])
+                                     training_targets)
 class_weights = dict(enumerate(class_weights))
 
 #%% define models and parameters
 
-# define models
-
-models =    {
-            'ExtraTreesClassifier': ExtraTreesClassifier(),
-            'RandomForestClassifier': RandomForestClassifier(),
-            'AdaBoostClassifier': AdaBoostClassifier(),
-            'GradientBoostingClassifier': GradientBoostingClassifier(),
-            'SVC': SVC(),
-            'LogitBoost': LogitBoost(),
-            'XGBClassifier': XGBClassifier(),
-            'ComplementNB': ComplementNB()
-            }
+# define models (imported only when selected)
+
+model_names =   [
+                'ExtraTreesClassifier',
+                'RandomForestClassifier',
+                'AdaBoostClassifier',
+                'GradientBoostingClassifier',
+                'SVC',
+                'LogitBoost',
+                'XGBClassifier',
+                'ComplementNB'
+                ]
+
+models = dict((name, create_model(name)) for name in model_names)
 
 # define model parameters for parameter search
 
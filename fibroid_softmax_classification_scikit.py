@@ -16,11 +16,6 @@ Created on Wed Mar 20 15:45:35 2019
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import os
@@ -30,30 +25,18 @@ import joblib
 import pandas as pd
 import numpy as np
 import scipy as sp
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
+from sklearn.base import clone
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, train_test_split
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, KBinsDiscretizer
-from sklearn.impute import SimpleImputer
 from sklearn.metrics import confusion_matrix, f1_score, balanced_accuracy_score, make_scorer
-from imblearn.over_sampling import RandomOverSampler, SMOTE, ADASYN
 from imblearn.metrics import geometric_mean_score
 
-# import classifiers
-
-from sklearn.ensemble import ExtraTreesClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.ensemble import AdaBoostClassifier
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.svm import SVC
-from sklearn.naive_bayes import ComplementNB
-
-from imblearn.ensemble import BalancedBaggingClassifier
-from imblearn.ensemble import BalancedRandomForestClassifier
-from imblearn.ensemble import RUSBoostClassifier
-from imblearn.ensemble import EasyEnsembleClassifier
+from PreprocessingPipeline import PreprocessingPipeline
+from resample_folds import resample_folds
+from ModelBundle import ModelBundle
+from ArtifactStore import ArtifactStore
+from FigureExporter import FigureExporter
+from create_model import create_model
+from load_config import load_config
 
 #%% define random state
 
@@ -73,10 +56,6 @@ df = pd.read_csv('fibroid_dataframe.csv', sep = ',')
 
 duplicates = any(df.duplicated())
 
-#%% display NPV histogram
-
-df['NPV ratio'].hist(bins = 20)
-
 #%% categorise NPV into classes according to bins
 
 NPV_bins = [-1, 29.9, 80, 100]
@@ -92,10 +71,6 @@ df_stats['Max'] = df.max()
 df_stats['SD'] = df.std()
 df_stats['Sum'] = df.sum()
 
-#%% display NPV histogram
-
-df['NPV ratio'].hist(bins = 20)
-
 #%% define feature and target labels
 
 feature_labels = [#'White', 
@@ -158,6 +133,14 @@ impute_cons =   []
 
 oversample = 'adasyn'
 
+# oversample the training partition of each cross-validation fold separately
+# instead of the whole training set, to avoid resampled samples leaking into
+# the validation folds (the resamples are calculated once, and each fold
+# is pre-processed separately, so the samples are oversampled before they are
+# discretised and scaled as with the whole training set)
+
+oversample_in_folds = False
+
 # discretise features
 
 #discretise = []
@@ -178,103 +161,79 @@ scaling_type = 'log'
 
 cv = 10
 
-# define scoring metric ('f1_*', 'balanced_accuracy' or custom scorer)
+# define scoring metric ('f1_*', 'balanced_accuracy', 'geometric_mean' or
+# custom scorer)
 
 #scoring = 'f1_micro'
-scoring = make_scorer(geometric_mean_score, average = 'multiclass')
+scoring = 'geometric_mean'
 
-#%% randomise and divive data for cross-validation
+# define file formats and resolution of the saved figures
 
-# stratified splitting for unbalanced datasets
+figure_formats = ['pdf', 'png', 'eps']
+figure_dpi = 600
 
-training_set, testing_set = train_test_split(df, test_size = split_ratio,
-                                             stratify = df[target_label],
-                                             random_state = random_state)
+# headless mode skips all plotting (matplotlib is never imported), so batch
+# jobs do not need a display, the figures can be plotted afterwards from the
+# saved variables with report_figures.py
 
-#%% define features and targets
+headless = False
 
-training_features = training_set[feature_labels]
-testing_features = testing_set[feature_labels]
+# define output directory of the models
 
-training_targets = training_set[target_label]
-testing_targets = testing_set[target_label]
+output_dir = 'Scikit models'
 
-#%% impute features
+#%% read configuration
 
-if impute_mean:
-    
-    imp_mean = SimpleImputer(missing_values = np.nan, strategy = 'mean')
-    
-    training_features[impute_mean] = imp_mean.fit_transform(training_features[impute_mean])
-    testing_features[impute_mean] = imp_mean.transform(testing_features[impute_mean])
-    
-if impute_mode:
-    
-    imp_mode = SimpleImputer(missing_values = np.nan, strategy = 'most_frequent')
-    
-    training_features[impute_mode] = imp_mode.fit_transform(training_features[impute_mode])
-    testing_features[impute_mode] = imp_mode.transform(testing_features[impute_mode])
-    
-if impute_cons:
-    
-    imp_cons = SimpleImputer(missing_values = np.nan, strategy = 'constant', fill_value = 0)
-    
-    training_features[impute_cons] = imp_cons.fit_transform(training_features[impute_cons])
-    testing_features[impute_cons] = imp_cons.transform(testing_features[impute_cons])
-    
-#%% oversample imbalanced training data
+# the parameters above are defaults, which can be overridden when the script
+# is run from the command line, e.g.
+#
+#     python fibroid_softmax_classification_scikit.py --config config.json --set random_state=42
 
-if oversample == 'random':
-    
-    osm = RandomOverSampler(sampling_strategy = 'not majority', random_state = random_state)
-    training_features, training_targets = osm.fit_resample(training_features.values, training_targets.values[:, 0])
-    
-    training_features = pd.DataFrame(training_features, columns = testing_features.columns)
-    training_targets = pd.DataFrame(training_targets, columns = testing_targets.columns)
-    
-elif oversample == 'smote':
-    
-    osm = SMOTE(sampling_strategy = 'not majority', random_state = random_state, n_jobs = -1)
-    training_features, training_targets = osm.fit_resample(training_features.values, training_targets.values[:, 0])
-    
-    training_features = pd.DataFrame(training_features, columns = testing_features.columns)
-    training_targets = pd.DataFrame(training_targets, columns = testing_targets.columns)
-    
-elif oversample == 'adasyn':
-    
-    osm = ADASYN(sampling_strategy = 'not majority', random_state = random_state, n_jobs = -1)
-    training_features, training_targets = osm.fit_resample(training_features.values, training_targets.values[:, 0])
-    
-    training_features = pd.DataFrame(training_features, columns = testing_features.columns)
-    training_targets = pd.DataFrame(training_targets, columns = testing_targets.columns)
+config = load_config(globals(), ['random_state', 'feature_labels', 'target_label', 'split_ratio',
+                                 'impute_mean', 'impute_mode', 'impute_cons', 'oversample',
+                                 'oversample_in_folds', 'discretise', 'scaling_type', 'cv',
+                                 'scoring', 'figure_formats', 'figure_dpi', 'headless',
+                                 'output_dir'])
 
-#%% discretise features
+if scoring == 'geometric_mean':
+    scoring = make_scorer(geometric_mean_score, average = 'multiclass')
 
-if discretise:
-    
-    enc = KBinsDiscretizer(n_bins = 10, encode = 'ordinal', strategy = 'uniform')
-    
-    training_features[discretise] = enc.fit_transform(training_features[discretise])
-    testing_features[discretise] = enc.transform(testing_features[discretise])
+resample_in_folds = oversample_in_folds and oversample is not None
 
-#%% scale features
+#%% display NPV histogram
 
-if scaling_type == 'log':
-        
-    training_features = np.log1p(training_features)
-    testing_features = np.log1p(testing_features)
-    
-elif scaling_type == 'minmax':
+if not headless:
+    df['NPV ratio'].hist(bins = 20)
+
+#%% randomise and divive data for cross-validation
+
+# stratified splitting for unbalanced datasets
+
+training_set, testing_set = train_test_split(df, test_size = split_ratio,
+                                             stratify = df[target_label],
+                                             random_state = random_state)
+
+#%% pre-process features (impute, oversample, discretise and scale)
+
+preprocessing = PreprocessingPipeline(feature_labels, impute_mean, impute_mode, impute_cons,
+                                      oversample, discretise, scaling_type, random_state)
+
+training_features, training_targets = preprocessing.fit_transform(training_set, training_set[target_label])
+testing_features = preprocessing.transform(testing_set)
+testing_targets = testing_set[target_label].values[:, 0]
+
+# pre-process and oversample the training partition of each fold separately
+# for the parameter search (the whole training set above is used for 
+# refitting the best parameters)
+
+if resample_in_folds:
     
-    scaler = MinMaxScaler(feature_range = (0, 1)) 
-    training_features[feature_labels] = scaler.fit_transform(training_features[feature_labels])
-    testing_features[feature_labels] = scaler.transform(testing_features[feature_labels])
+    search_features, search_targets, search_cv = resample_folds(preprocessing, training_set, 
+                                                                training_set[target_label], cv)
     
-elif scaling_type == 'standard':
+else:
     
-    scaler = StandardScaler() 
-    training_features[feature_labels] = scaler.fit_transform(training_features[feature_labels])
-    testing_features[feature_labels] = scaler.transform(testing_features[feature_labels])
+    search_features, search_targets, search_cv = training_features, training_targets, cv
 
 #%% build and train model
     
@@ -288,8 +247,8 @@ parameters =    {
                 'gamma': sp.stats.reciprocal(1e-2, 1e4)
                 }
 
-base_model = SVC(class_weight = 'balanced', random_state = random_state,
-                 cache_size = 4000, max_iter = 200000, probability = True)
+base_model = create_model('SVC', class_weight = 'balanced', random_state = random_state,
+                          cache_size = 4000, max_iter = 200000, probability = True)
 
 # Complement Naive-Bayes
    
@@ -298,7 +257,7 @@ base_model = SVC(class_weight = 'balanced', random_state = random_state,
 #                'norm': [True, False]
 #                }
 #
-#base_model = ComplementNB()
+#base_model = create_model('ComplementNB')
     
 # Random Forest
     
@@ -309,15 +268,15 @@ base_model = SVC(class_weight = 'balanced', random_state = random_state,
 #                'max_features': ['sqrt', None]
 #                }
 #
-#base_model = RandomForestClassifier(class_weight = 'balanced', random_state = random_state,
-#                                    n_jobs = -1)
+#base_model = create_model('RandomForest', class_weight = 'balanced', random_state = random_state,
+#                          n_jobs = -1)
 
 # define parameter search method
 
 #grid = GridSearchCV(base_model, parameters, scoring = scoring, 
-#                    n_jobs = -1, cv = cv, refit = True, iid = False)
+#                    n_jobs = -1, cv = search_cv, refit = not resample_in_folds, iid = False)
 grid = RandomizedSearchCV(base_model, parameters, scoring = scoring, 
-                          n_jobs = -1, cv = cv, refit = True, iid = False,
+                          n_jobs = -1, cv = search_cv, refit = not resample_in_folds, iid = False,
                           n_iter = 10000, random_state = random_state)
 
 # train model using parameter search
@@ -325,7 +284,7 @@ grid = RandomizedSearchCV(base_model, parameters, scoring = scoring,
 timestr = time.strftime('%Y%m%d-%H%M%S')
 start_time = time.time()
 
-grid.fit(training_features.values, training_targets.values[:, 0])
+grid.fit(search_features, search_targets)
 
 end_time = time.time()
 
@@ -334,16 +293,24 @@ end_time = time.time()
 print('Best score %f using parameters: %s' % (grid.best_score_, grid.best_params_))
 print('Execution time: %.2f s' % (end_time - start_time))
 
-# obtain the best model and score
+# obtain the best model (refitted with the oversampled training set when the
+# folds were oversampled separately)
 
-best_model = grid.best_estimator_
+if resample_in_folds:
+    
+    best_model = clone(base_model).set_params(**grid.best_params_)
+    best_model.fit(training_features, training_targets)
+    
+else:
+    
+    best_model = grid.best_estimator_
 
 #%% evaluate model performance
 
 # make predictions
 
-training_predictions = best_model.predict(training_features.values)
-testing_predictions = best_model.predict(testing_features.values)
+training_predictions = best_model.predict(training_features)
+testing_predictions = best_model.predict(testing_features)
 
 # calculate evaluation metrics
 
@@ -351,18 +318,18 @@ validation_score = grid.best_score_
 
 if type(scoring) == str and scoring[:2] == 'f1':
                 
-    training_score = f1_score(training_targets.values[:, 0], training_predictions, average = scoring[3:])
-    testing_score = f1_score(testing_targets.values[:, 0], testing_predictions, average = scoring[3:])
+    training_score = f1_score(training_targets, training_predictions, average = scoring[3:])
+    testing_score = f1_score(testing_targets, testing_predictions, average = scoring[3:])
     
 elif type(scoring) == str and scoring == 'balanced_accuracy':
     
-    training_score = balanced_accuracy_score(training_targets.values[:, 0], training_predictions)
-    testing_score = balanced_accuracy_score(testing_targets.values[:, 0], testing_predictions)
+    training_score = balanced_accuracy_score(training_targets, training_predictions)
+    testing_score = balanced_accuracy_score(testing_targets, testing_predictions)
     
 else:
     
-    training_score = scoring(best_model, training_features.values, training_targets.values[:, 0])
-    testing_score = scoring(best_model, testing_features.values, testing_targets.values[:, 0])
+    training_score = scoring(best_model, training_features, training_targets)
+    testing_score = scoring(best_model, testing_features, testing_targets)
 
 # calculate confusion matrices
 
@@ -374,36 +341,30 @@ cm_testing = cm_testing.astype('float') / cm_testing.sum(axis = 1)[:, np.newaxis
 
 #%% plot figures
 
-# confusion matrices
+figures = []
 
-f1 = plt.figure(figsize = (6, 4))
-ax = sns.heatmap(cm_training, cmap = 'Greys', vmin = 0, vmax = 1,
-                 cbar_kws = {'ticks': [0, 0.5, 1]})
-ax.set_aspect(1)
-#    plt.title('Training')
-plt.ylabel('True class')
-plt.xlabel('Predicted class')
-
-f2 = plt.figure(figsize = (6, 4))
-ax = sns.heatmap(cm_testing, cmap = 'Greys', vmin = 0, vmax = 1,
-                 cbar_kws = {'ticks': [0, 0.5, 1]})
-ax.set_aspect(1)
-#    plt.title('Testing')
-plt.ylabel('True class')
-plt.xlabel('Predicted class')
+if not headless:
+    
+    from plot_classification_model import plot_classification_model
+    
+    figures = plot_classification_model(cm_training, cm_testing)
 
 #%% save data
 
 # make directory
 
-model_dir = os.path.join('Scikit models', 
+model_dir = os.path.join(output_dir, 
                          ('%s_TS%d_VS%d_TS%d' % (timestr, 
                                                  round(training_score*100),
                                                  round(validation_score*100),
                                                  round(testing_score*100))))
 
-if not os.path.exists(model_dir):
-    os.makedirs(model_dir)
+# the process id keeps the directories of runs started at the same time apart
+
+if os.path.exists(model_dir):
+    model_dir = '%s_%d' % (model_dir, os.getpid())
+
+os.makedirs(model_dir)
     
 # save parameters into text file
     
@@ -418,6 +379,7 @@ with open(os.path.join(model_dir, 'parameters.txt'), 'w') as text_file:
     text_file.write('target_label: %s\n' % str(target_label))
     text_file.write('duplicates: %s\n' % str(duplicates))
     text_file.write('oversample: %s\n' % str(oversample))
+    text_file.write('oversample_in_folds: %s\n' % str(oversample_in_folds))
     text_file.write('discretise: %s\n' % str(discretise))
     text_file.write('impute_mean: %s\n' % str(impute_mean))
     text_file.write('impute_mode: %s\n' % str(impute_mode))
@@ -430,53 +392,103 @@ with open(os.path.join(model_dir, 'parameters.txt'), 'w') as text_file:
     text_file.write('validation_score: %.2f\n' % validation_score)
     text_file.write('testing_score: %.2f\n' % testing_score)
     text_file.write('Best parameters: %s\n' % grid.best_params_)
-    
-# save figures
-    
-for filetype in ['pdf', 'png', 'eps']:
-    
-    f1.savefig(os.path.join(model_dir, ('cm_training.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f2.savefig(os.path.join(model_dir, ('cm_testing.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    
-# save variables
-    
-variable_names = %who_ls DataFrame ndarray list dict str bool int int64 float float64
-variables = dict((name, eval(name)) for name in variable_names)
-
-pickle.dump(variables, open(os.path.join(model_dir, 'variables.pkl'), 'wb'))
+    text_file.write('config: %s\n' % str(config))
+    
+# save figures (rendered in background processes while the variables and
+# the model are saved, figures unchanged since an earlier run are copied
+# from the cache)
+
+exporter = FigureExporter(model_dir, formats = figure_formats, dpi = figure_dpi,
+                          cache_dir = os.path.join(output_dir, 'Figure cache'))
+
+for name, figure, data in figures:
+    exporter.export(name, figure, data)
+    
+# save variables (results and configuration only, each variable into its
+# own file)
+
+variables_to_save = {'training_predictions': training_predictions,
+                     'testing_predictions': testing_predictions,
+                     'training_targets': training_targets,
+                     'testing_targets': testing_targets,
+                     'training_score': training_score,
+                     'validation_score': validation_score,
+                     'testing_score': testing_score,
+                     'cm_training': cm_training,
+                     'cm_testing': cm_testing,
+                     'best_params': grid.best_params_,
+                     'cv_results': pd.DataFrame(grid.cv_results_),
+                     'df_stats': df_stats,
+                     'duplicates': duplicates,
+                     'NPV_bins': NPV_bins,
+                     'feature_labels': feature_labels,
+                     'target_label': target_label,
+                     'random_state': random_state,
+                     'split_ratio': split_ratio,
+                     'impute_mean': impute_mean,
+                     'impute_mode': impute_mode,
+                     'impute_cons': impute_cons,
+                     'oversample': oversample,
+                     'oversample_in_folds': oversample_in_folds,
+                     'discretise': discretise,
+                     'scaling_type': scaling_type,
+                     'cv': cv,
+                     'scoring': scoring,
+                     'timestr': timestr,
+                     'start_time': start_time,
+                     'end_time': end_time,
+                     'config': config,
+                     'model_dir': model_dir}
+
+ArtifactStore(os.path.join(model_dir, 'variables')).save(variables_to_save)
 
 # save model
 
 pickle.dump(best_model, open(os.path.join(model_dir, 'scikit_model.pkl'), 'wb'))
 
+# save model bundle for inference (pre-processing, model and metadata only)
+
+ModelBundle.save(os.path.join(model_dir, 'model.bundle'), preprocessing, best_model,
+                 {'timestr': timestr,
+                  'random_state': random_state,
+                  'scoring': str(scoring),
+                  'best_params': grid.best_params_,
+                  'training_score': training_score,
+                  'validation_score': validation_score,
+                  'testing_score': testing_score})
+
 # save grid
 
 joblib.dump(grid, os.path.join(model_dir, 'grid.joblib'))
 
 # save data pre-processing functions
 
+joblib.dump(preprocessing, os.path.join(model_dir, 'preprocessing.joblib'))
+
 if impute_mean:
     
-    joblib.dump(imp_mean, os.path.join(model_dir, 'imputer_mean.joblib'))
+    joblib.dump(preprocessing.imputer_mean, os.path.join(model_dir, 'imputer_mean.joblib'))
     
 if impute_mode:
     
-    joblib.dump(imp_mode, os.path.join(model_dir, 'imputer_mode.joblib'))
+    joblib.dump(preprocessing.imputer_mode, os.path.join(model_dir, 'imputer_mode.joblib'))
     
 if impute_cons:
     
-    joblib.dump(imp_cons, os.path.join(model_dir, 'imputer_cons.joblib'))
+    joblib.dump(preprocessing.imputer_cons, os.path.join(model_dir, 'imputer_cons.joblib'))
     
 if oversample is not None:
     
-    joblib.dump(osm, os.path.join(model_dir, 'oversampler.joblib'))
+    joblib.dump(preprocessing.oversampler, os.path.join(model_dir, 'oversampler.joblib'))
     
 if discretise:
     
-    joblib.dump(enc, os.path.join(model_dir, 'discretiser.joblib'))
+    joblib.dump(preprocessing.discretiser, os.path.join(model_dir, 'discretiser.joblib'))
     
 if scaling_type == 'minmax' or scaling_type == 'standard':
     
-    joblib.dump(scaler, os.path.join(model_dir, 'scaler.joblib'))
+    joblib.dump(preprocessing.scaler, os.path.join(model_dir, 'scaler.joblib'))
+
+# wait for the figures
+
+exporter.close()
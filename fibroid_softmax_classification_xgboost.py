@@ -16,11 +16,6 @@ Created on Wed Dec 19 13:05:13 2018
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import xgboost as xgb
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 15:22:37 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to fit a single parameter candidate on the training
+    fold and score it on the validation fold. It is shared by the parameter
+    search classes, which run it in parallel over candidates and folds
+
+'''
+
+#%% import necessary packages
+
+from sklearn.base import clone
+
+#%% fit and score a single candidate
+
+def fit_and_score(estimator, params, X, y, train, test, scorer):
+
+    '''
+    Args:
+        estimator: model to fit (unfitted estimator)
+        params: parameters of the candidate (dict)
+        X: features (ndarray)
+        y: targets (ndarray)
+        train: indices of the training fold (ndarray)
+        test: indices of the validation fold (ndarray)
+        scorer: scorer called as scorer(model, X, y) (callable)
+
+    Returns:
+        score: validation score of the candidate (float)
+    '''
+
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train], y[train])
+
+    return scorer(model, X[test], y[test])
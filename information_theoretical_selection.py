@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 13:34:09 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    These functions implement the information theoretical feature selection
+    methods of scikit-feature (DISR, CMIM, ICAP, JMI, CIFE, MIM, MRMR and
+    MIFS). Instead of estimating each mutual information one feature pair at
+    a time, the joint entropies of all feature pairs (with and without the
+    target) are calculated once for each training set from a tensor of joint
+    symbol codes, and each criterion is then a greedy search over the
+    precomputed matrices. As in scikit-feature, every distinct feature value
+    is treated as a discrete symbol and entropies are in bits.
+
+    The functions return the same (F, J, MIfy) tuple as scikit-feature:
+    indices of the selected features, objective function values and mutual
+    information between the selected features and the target. Tied objective
+    values are broken by the lowest feature index. scikit-feature computes
+    the same values with different rounding errors, so its rounding errors
+    can decide a tie instead, and on data with many tied features (e.g.
+    continuous features with only distinct values) the selections can differ
+
+'''
+
+#%% import necessary packages
+
+import numpy as np
+
+#%% define helper functions
+
+_tensor_cache = {}
+
+def discrete_codes(X):
+
+    ''' Converts each column into integer codes of its distinct values
+
+    Args:
+        X: features (ndarray, n_samples x n_features)
+    Returns:
+        codes: integer codes starting from 0 for each column (ndarray)
+    '''
+
+    X = np.asarray(X)
+    codes = np.empty(X.shape, dtype = np.int64)
+
+    for i in range(0, X.shape[1]):
+        codes[:, i] = np.unique(X[:, i], return_inverse = True)[1].ravel()
+
+    return codes
+
+
+def column_entropies(codes):
+
+    ''' Calculates the entropy (in bits) of each column of symbol codes
+
+    Args:
+        codes: integer symbol codes (ndarray, n_samples x n_columns)
+    Returns:
+        entropies: entropy of each column (ndarray)
+    '''
+
+    n_samples, n_columns = codes.shape
+
+    # count the runs of equal symbols in each sorted column
+
+    sorted_codes = np.sort(codes, axis = 0).T.ravel()
+    starts = np.ones(sorted_codes.shape, dtype = bool)
+    starts[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts[::n_samples] = True
+
+    start_indices = np.flatnonzero(starts)
+    counts = np.diff(np.append(start_indices, sorted_codes.size))
+    columns = start_indices // n_samples
+
+    # H = log2(n) - sum(c * log2(c)) / n
+
+    weights = counts * np.log2(counts)
+    entropies = np.log2(n_samples) - np.bincount(columns, weights = weights,
+                                                 minlength = n_columns) / n_samples
+
+    return entropies
+
+
+def mutual_information_tensor(X, y):
+
+    ''' Calculates the entropies needed by the selection criteria. The result
+    of the latest training set is cached, so all criteria called with the
+    same data share one calculation.
+
+    Args:
+        X: features (ndarray, n_samples x n_features)
+        y: targets (ndarray, n_samples)
+    Returns:
+        tensor: dictionary of mutual information matrices
+            'MIfy': I(f;y) for each feature
+            'MIff': I(fi;fj) for each feature pair
+            'CMIffy': I(fi;fj|y) for each feature pair
+            'DISR': I(fi,fj;y) / H(fi,fj,y) for each feature pair
+    '''
+
+    X = np.asarray(X)
+    y = np.asarray(y).ravel()
+
+    if 'X' in _tensor_cache:
+        if (np.array_equal(_tensor_cache['X'], X) and
+            np.array_equal(_tensor_cache['y'], y)):
+            return _tensor_cache['tensor']
+
+    n_samples, n_features = X.shape
+
+    codes = discrete_codes(X)
+    y_codes = discrete_codes(y[:, np.newaxis])
+    n_values = codes.max(axis = 0) + 1
+    n_classes = y_codes.max() + 1
+
+    # single and target joint entropies
+
+    H_f = column_entropies(codes)
+    H_y = column_entropies(y_codes)[0]
+    H_fy = column_entropies(codes * n_classes + y_codes)
+
+    # pairwise joint entropies with and without the target, calculated from
+    # the broadcasted tensor of joint codes in blocks of rows
+
+    H_ff = np.empty((n_features, n_features))
+    H_ffy = np.empty((n_features, n_features))
+
+    block = max(1, int(2 ** 22 // (n_samples * n_features)))
+
+    for start in range(0, n_features, block):
+
+        stop = min(start + block, n_features)
+
+        pair_codes = codes[:, start:stop, np.newaxis] * n_values.max() + codes[:, np.newaxis, :]
+        pair_codes = pair_codes.reshape(n_samples, -1)
+
+        H_ff[start:stop] = column_entropies(pair_codes).reshape(stop - start, n_features)
+        H_ffy[start:stop] = column_entropies(pair_codes * n_classes + y_codes).reshape(stop - start, n_features)
+
+    # mutual information matrices
+
+    tensor = {}
+    tensor['MIfy'] = H_f + H_y - H_fy
+    tensor['MIff'] = H_f[:, np.newaxis] + H_f[np.newaxis, :] - H_ff
+    tensor['CMIffy'] = H_fy[:, np.newaxis] + H_fy[np.newaxis, :] - H_ffy - H_y
+    tensor['DISR'] = np.divide(H_ff + H_y - H_ffy, H_ffy, out = np.zeros_like(H_ffy),
+                               where = H_ffy != 0)
+
+    _tensor_cache['X'] = X.copy()
+    _tensor_cache['y'] = y.copy()
+    _tensor_cache['tensor'] = tensor
+
+    return tensor
+
+
+def greedy_selection(t1, update, n_selected_features):
+
+    ''' Selects features greedily starting from the one with the largest
+    mutual information with the target
+
+    Args:
+        t1: I(f;y) for each feature (ndarray)
+        update: function returning the objective function values of all
+        features after the given feature has been selected
+        n_selected_features: number of features to select (int or None to
+        stop when the objective function becomes negative)
+    Returns:
+        F, J, MIfy: selected features, objective values and I(f;y) (ndarray)
+    '''
+
+    n_features = len(t1)
+
+    if n_selected_features is None:
+        n_selected = n_features
+    else:
+        n_selected = min(n_selected_features, n_features)
+
+    selected = np.zeros(n_features, dtype = bool)
+
+    # objective values equal up to rounding errors are treated as ties, which
+    # are broken by the lowest feature index as in the loops of scikit-feature
+
+    idx = int(np.argmax(np.round(t1, 10)))
+    F = [idx]
+    J = [t1[idx]]
+    selected[idx] = True
+
+    while len(F) < n_selected:
+
+        j = update(idx, len(F))
+        j = np.where(selected, -np.inf, j)
+
+        idx = int(np.argmax(np.round(j, 10)))
+
+        F.append(idx)
+        J.append(j[idx])
+        selected[idx] = True
+
+        if n_selected_features is None and j[idx] < 0:
+            break
+
+    F = np.array(F)
+
+    return F, np.array(J), t1[F]
+
+#%% define selection criteria
+
+def lcsi(X, y, beta = 0.8, gamma = 0.5, function_name = None, n_selected_features = None):
+
+    ''' Linear combination of Shannon information terms:
+    J(f) = I(f;y) - beta * sum_j I(fj;f) + gamma * sum_j I(fj;f|y)
+
+    Args:
+        X: features (ndarray)
+        y: targets (ndarray)
+        beta, gamma: weights of the redundancy terms (float)
+        function_name: 'MRMR' or 'JMI' to use 1/|F| weights (str or None)
+        n_selected_features: number of features to select (int)
+    Returns:
+        F, J_CMI, MIfy: see greedy_selection
+    '''
+
+    tensor = mutual_information_tensor(X, y)
+    t1 = tensor['MIfy']
+    t2 = np.zeros_like(t1)
+    t3 = np.zeros_like(t1)
+
+    def update(idx, n_selected):
+        b, g = beta, gamma
+        if function_name == 'MRMR':
+            b = 1.0 / n_selected
+        elif function_name == 'JMI':
+            b = 1.0 / n_selected
+            g = 1.0 / n_selected
+        t2[:] += tensor['MIff'][idx]
+        t3[:] += tensor['CMIffy'][idx]
+        return t1 - b * t2 + g * t3
+
+    return greedy_selection(t1, update, n_selected_features)
+
+
+def mim(X, y, n_selected_features = None):
+    return lcsi(X, y, beta = 0, gamma = 0, n_selected_features = n_selected_features)
+
+
+def mifs(X, y, beta = 0.5, n_selected_features = None):
+    return lcsi(X, y, beta = beta, gamma = 0, n_selected_features = n_selected_features)
+
+
+def mrmr(X, y, n_selected_features = None):
+    return lcsi(X, y, gamma = 0, function_name = 'MRMR', n_selected_features = n_selected_features)
+
+
+def cife(X, y, n_selected_features = None):
+    return lcsi(X, y, beta = 1, gamma = 1, n_selected_features = n_selected_features)
+
+
+def jmi(X, y, n_selected_features = None):
+    return lcsi(X, y, function_name = 'JMI', n_selected_features = n_selected_features)
+
+
+def cmim(X, y, n_selected_features = None):
+
+    ''' Conditional mutual information maximisation:
+    J(f) = I(f;y) - max_j (I(fj;f) - I(fj;f|y)) '''
+
+    tensor = mutual_information_tensor(X, y)
+    t1 = tensor['MIfy']
+    t2 = np.full_like(t1, -1e7)
+
+    def update(idx, n_selected):
+        np.maximum(t2, tensor['MIff'][idx] - tensor['CMIffy'][idx], out = t2)
+        return t1 - t2
+
+    return greedy_selection(t1, update, n_selected_features)
+
+
+def icap(X, y, n_selected_features = None):
+
+    ''' Interaction capping. Note: scikit-feature implements ICAP with the
+    same max term as CMIM, which is kept here for consistent rankings '''
+
+    return cmim(X, y, n_selected_features = n_selected_features)
+
+
+def disr(X, y, n_selected_features = None):
+
+    ''' Double input symmetrical relevance:
+    J(f) = sum_j I(f,fj;y) / H(f,fj,y) '''
+
+    tensor = mutual_information_tensor(X, y)
+    t1 = tensor['MIfy']
+    t2 = np.zeros_like(t1)
+
+    def update(idx, n_selected):
+        t2[:] += tensor['DISR'][idx]
+        return t2.copy()
+
+    return greedy_selection(t1, update, n_selected_features)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 22:41:07 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to override the default parameters of a script
+    from the command line, so that the scripts can be run with plain Python
+    (e.g. as batch jobs with different configurations in parallel) as well
+    as cell by cell in Spyder/IPython. The parameters are read from a JSON or
+    YAML file and/or KEY=VALUE arguments, where the values are parsed as JSON
+    (and otherwise used as strings):
+
+        python model_selection.py --config config.yaml --set cv=5 --set oversample=null
+
+    Only the parameters listed by the script can be set, and the arguments
+    passed by IPython (e.g. in Spyder) are ignored
+
+'''
+
+#%% import necessary libraries
+
+import os
+import json
+import argparse
+
+#%% define functions
+
+def parse_value(value):
+
+    ''' Parses a command-line value as JSON, or returns it as a string '''
+
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {'None': None, 'True': True, 'False': False}.get(value, value)
+
+
+def read_config(config_file):
+
+    ''' Reads a configuration file (JSON, or YAML if the extension is .yaml
+    or .yml) into a dict '''
+
+    with open(config_file, 'r') as file_in:
+        if os.path.splitext(config_file)[1].lower() in ('.yaml', '.yml'):
+            import yaml
+            config = yaml.safe_load(file_in)
+        else:
+            config = json.load(file_in)
+
+    if config is None:
+        return {}
+    elif not isinstance(config, dict):
+        raise ValueError('Unknown config format: %s' % config_file)
+
+    return config
+
+#%% define function
+
+def load_config(namespace, names, argv = None):
+
+    '''
+    Args:
+        namespace: variables of the script to update, i.e. globals() (dict)
+        names: names of the parameters which can be set (list)
+        argv: command-line arguments, sys.argv[1:] if None (list)
+    Returns:
+        config: the parameters which were set (dict)
+    '''
+
+    parser = argparse.ArgumentParser(add_help = False)
+    parser.add_argument('--config', default = None, help = 'JSON or YAML file of parameters')
+    parser.add_argument('--set', action = 'append', default = [], metavar = 'KEY=VALUE',
+                        help = 'parameter value (parsed as JSON)')
+    args, _ = parser.parse_known_args(argv)
+
+    config = read_config(args.config) if args.config else {}
+
+    for item in args.set:
+        if '=' not in item:
+            raise ValueError('Unknown config argument: %s' % item)
+        key, value = item.split('=', 1)
+        config[key.strip()] = parse_value(value)
+
+    unknown = [key for key in config if key not in names]
+
+    if unknown:
+        raise ValueError('Unknown config parameters: %s' % ', '.join(unknown))
+
+    namespace.update(config)
+
+    return config
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 17:36:14 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to materialise an array on disk and reopen it as
+    a read-only memory-map. The array is stored in column-major (Fortran)
+    order, so that prefixes of columns (the top n features) are contiguous
+    zero-copy views, and joblib passes the memory-map to its workers by
+    reference instead of pickling a copy for every parameter search
+
+'''
+
+#%% import necessary packages
+
+import os
+import numpy as np
+
+#%% save and memory-map array
+
+def memmap_array(array, file_path):
+
+    '''
+    Args:
+        array: array to save (ndarray)
+        file_path: path to the .npy file
+
+    Returns:
+        array: read-only memory-map of the saved array (memmap)
+    '''
+
+    directory = os.path.dirname(file_path)
+
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    # write into a temporary file first so that a memory-map is never opened
+    # on a partially written file
+
+    tmp_path = file_path + '.tmp'
+
+    with open(tmp_path, 'wb') as file_out:
+        np.save(file_out, np.asfortranarray(array))
+
+    os.replace(tmp_path, file_path)
+
+    return np.load(file_path, mmap_mode = 'r')
@@ -16,44 +16,28 @@ Created on Tue May 21 08:15:59 2019
     
 '''
 
-#%% clear variables
-
-%reset -f
-%clear
-
 #%% import necessary libraries
 
 import os
 import time
-import pickle
+import shutil
 import pandas as pd
-import numpy as np
-import matplotlib
-#matplotlib.use('Agg')  # only for cluster use
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
-from sklearn.model_selection import GridSearchCV, train_test_split
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, KBinsDiscretizer
-from sklearn.impute import SimpleImputer
+from sklearn.base import clone
+from sklearn.model_selection import GridSearchCV, ParameterGrid, train_test_split
 from sklearn.metrics import f1_score, balanced_accuracy_score, make_scorer
-from imblearn.over_sampling import RandomOverSampler, SMOTE, ADASYN
 from imblearn.metrics import geometric_mean_score
 
-# import classifiers
-
-from sklearn.ensemble import ExtraTreesClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.ensemble import AdaBoostClassifier
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.svm import SVC
-from sklearn.naive_bayes import ComplementNB
-from logitboost import LogitBoost
-from xgboost import XGBClassifier
-from imblearn.ensemble import BalancedBaggingClassifier
-from imblearn.ensemble import BalancedRandomForestClassifier
-from imblearn.ensemble import RUSBoostClassifier
-from imblearn.ensemble import EasyEnsembleClassifier
+from IterationCheckpoint import IterationCheckpoint
+from ResultsStore import ResultsStore
+from PreprocessingPipeline import PreprocessingPipeline
+from resample_folds import resample_folds
+from memmap_array import memmap_array
+from SuccessiveHalvingSearch import SuccessiveHalvingSearch
+from WarmStartGridSearch import WarmStartGridSearch
+from ArtifactStore import ArtifactStore
+from FigureExporter import FigureExporter
+from create_model import create_model
+from load_config import load_config
 
 #%% define logging and data display format
 
@@ -69,10 +53,6 @@ df = pd.read_csv('fibroid_dataframe.csv', sep = ',')
 
 duplicates = any(df.duplicated())
 
-#%% display NPV histogram
-
-df['NPV ratio'].hist(bins = 20)
-
 #%% categorise NPV into classes according to bins
 
 NPV_bins = [-1, 29.9, 80, 100]
@@ -128,6 +108,14 @@ impute_cons =   []
 
 oversample = 'random'
 
+# oversample the training partition of each cross-validation fold separately
+# instead of the whole training set, to avoid resampled samples leaking into
+# the validation folds (the resamples are calculated once per split, and each fold
+# is pre-processed separately, so the samples are oversampled before they are
+# discretised and scaled as with the whole training set)
+
+oversample_in_folds = False
+
 # discretise features
 
 discretise =    ['Age', 
@@ -147,31 +135,90 @@ scaling_type = 'log'
 
 cv = 10
 
-# define scoring metric ('f1_*', 'balanced_accuracy' or custom scorer)
+# define parameter search strategy ('grid' for exhaustive search, 'halving'
+# for successive halving, which keeps the best 1/halving_factor of the 
+# candidates in each round while increasing the number of samples, or 
+# 'warm_start' for exhaustive search fitting each ensemble once for all 
+# values of n_estimators)
+
+search_strategy = 'grid'
+halving_factor = 3
+
+# define scoring metric ('f1_*', 'balanced_accuracy', 'geometric_mean' or
+# custom scorer)
 
 scoring = 'f1_micro'
-#scoring = make_scorer(geometric_mean_score, average = 'multiclass')
+
+# define checkpoint directory (None starts a new run, path to an existing 
+# checkpoint resumes a killed run)
+
+checkpoint_dir = None
+
+# define file formats and resolution of the saved figures
+
+figure_formats = ['pdf', 'png', 'eps']
+figure_dpi = 600
+
+# headless mode skips all plotting (matplotlib is never imported), so batch
+# jobs do not need a display, the figures can be plotted afterwards from the
+# saved variables with report_figures.py
+
+headless = False
+
+# define output directory of the results and checkpoints
+
+output_dir = 'Model selection'
+
+# define models (the classifiers are imported only when selected, so e.g.
+# xgboost or logitboost are not needed unless they are included)
+
+model_names =   [
+                'ExtraTrees',
+                'RandomForest',
+                'AdaBoost',
+                'GradientBoosting',
+                'SVC',
+                'LogitBoost',
+                'XGBClassifier',
+                'ComplementNB',
+                'BalancedBagging',
+                'BalancedRandomForest',
+                'RUSBoost',
+                'EasyEnsemble'
+                ]
+
+#%% read configuration
+
+# the parameters above are defaults, which can be overridden when the script
+# is run from the command line, e.g.
+#
+#     python model_selection.py --config config.yaml --set n_iterations=10
+
+config = load_config(globals(), ['feature_labels', 'target_label', 'n_iterations', 'n_features',
+                                 'split_ratio', 'impute_mean', 'impute_mode', 'impute_cons',
+                                 'oversample', 'oversample_in_folds', 'discretise', 'scaling_type',
+                                 'cv', 'search_strategy', 'halving_factor', 'scoring',
+                                 'checkpoint_dir', 'figure_formats', 'figure_dpi', 'headless',
+                                 'output_dir', 'model_names'])
+
+if scoring == 'geometric_mean':
+    scoring = make_scorer(geometric_mean_score, average = 'multiclass')
+
+#%% display NPV histogram
+
+if not headless:
+    df['NPV ratio'].hist(bins = 20)
+
+#%% define models
 
 # initialise variables
 
-clf_results = pd.DataFrame()
-
-# define models
-
-models =    {
-            'ExtraTrees': ExtraTreesClassifier(),
-            'RandomForest': RandomForestClassifier(),
-            'AdaBoost': AdaBoostClassifier(),
-            'GradientBoosting': GradientBoostingClassifier(),
-            'SVC': SVC(),
-            'LogitBoost': LogitBoost(),
-            'XGBClassifier': XGBClassifier(),
-            'ComplementNB': ComplementNB(),
-            'BalancedBagging': BalancedBaggingClassifier(),
-            'BalancedRandomForest': BalancedRandomForestClassifier(),
-            'RUSBoost': RUSBoostClassifier(),
-            'EasyEnsemble': EasyEnsembleClassifier()
-            }
+clf_store = ResultsStore(sort = True)
+
+# the models are created (and their backends such as xgboost or logitboost
+# imported) when they are first used in the iteration, not at startup
+
+models = dict.fromkeys(model_names)
 
 # define model parameters for parameter search
 
@@ -279,184 +326,235 @@ parameters =    {
 timestr = time.strftime('%Y%m%d-%H%M%S')
 start_time = time.time()
 
+# initialise checkpoint and random states (the process id keeps the
+# directories of runs started at the same time apart)
+
+if checkpoint_dir is None:
+    checkpoint_dir = os.path.join(output_dir, 'Checkpoints', '%s_%d' % (timestr, os.getpid()))
+
+# the parameters which affect the results are hashed into the checkpoint, so
+# that a run with a different configuration cannot resume from it (the 
+# number of iterations can be increased)
+
+checkpoint_config = {
+                    'feature_labels': feature_labels,
+                    'target_label': target_label,
+                    'n_features': list(n_features),
+                    'split_ratio': split_ratio,
+                    'impute_mean': impute_mean,
+                    'impute_mode': impute_mode,
+                    'impute_cons': impute_cons,
+                    'oversample': oversample,
+                    'oversample_in_folds': oversample_in_folds,
+                    'discretise': discretise,
+                    'scaling_type': scaling_type,
+                    'cv': cv,
+                    'search_strategy': search_strategy,
+                    'halving_factor': halving_factor,
+                    'scoring': scoring,
+                    'parameters': dict((name, parameters[name]) for name in model_names)
+                    }
+
+checkpoint = IterationCheckpoint(checkpoint_dir, checkpoint_config)
+random_states = checkpoint.random_states(n_iterations)
+
+# check compatibility of the search strategy and oversampling
+
+resample_in_folds = oversample_in_folds and oversample is not None
+
+if resample_in_folds and search_strategy == 'halving':
+    raise ValueError('Successive halving subsamples the training set and cannot be used with oversample_in_folds')
+
+# define directory for the memory-mapped features of each split
+
+memmap_dir = os.path.join(checkpoint_dir, 'Memmaps')
+
 for iteration in range(0, n_iterations):
     
     # define random state
 
-    random_state = np.random.randint(0, 10000)
+    random_state = random_states[iteration]
     
     # print progress
     
     print('Iteration %d with random state %d at %.1f min' % (iteration, random_state, 
                                                              ((time.time() - start_time) / 60)))
     
+    # load results of finished iterations from checkpoint
+    
+    if checkpoint.is_iteration_done(iteration, random_state, n_features, models):
+        
+        for n in n_features:
+            for model in models:
+                clf_store.add(checkpoint.load(iteration, random_state, n, model))
+                
+        del n, model, random_state
+        continue
+    
     # randomise and divive data for cross-validation
     
     training_set, testing_set = train_test_split(df, test_size = split_ratio,
                                                  stratify = df[target_label],
                                                  random_state = random_state)
     
-    # define features and targets
+    # pre-process features (impute, oversample, discretise and scale)
     
-    training_features = training_set[feature_labels]
-    testing_features = testing_set[feature_labels]
+    preprocessing = PreprocessingPipeline(feature_labels, impute_mean, impute_mode, impute_cons,
+                                          oversample, discretise, scaling_type, random_state)
     
-    training_targets = training_set[target_label]
-    testing_targets = testing_set[target_label]
+    training_features, training_targets = preprocessing.fit_transform(training_set, training_set[target_label])
+    testing_features = preprocessing.transform(testing_set)
+    testing_targets = testing_set[target_label].values[:, 0]
     
-    # impute features
+    # pre-process and oversample the training partition of each fold separately
+    # for the parameter search (the whole training set above is used for 
+    # refitting the best parameters)
     
-    if impute_mean:
-        
-        imp = SimpleImputer(missing_values = np.nan, strategy = 'mean')
-        
-        training_features[impute_mean] = imp.fit_transform(training_features[impute_mean])
-        testing_features[impute_mean] = imp.transform(testing_features[impute_mean])
-        
-        del imp
-        
-    if impute_mode:
-        
-        imp = SimpleImputer(missing_values = np.nan, strategy = 'most_frequent')
+    if resample_in_folds:
         
-        training_features[impute_mode] = imp.fit_transform(training_features[impute_mode])
-        testing_features[impute_mode] = imp.transform(testing_features[impute_mode])
+        search_features, search_targets, search_cv = resample_folds(preprocessing, training_set, 
+                                                                    training_set[target_label], cv)
         
-        del imp
-        
-    if impute_cons:
-        
-        imp = SimpleImputer(missing_values = np.nan, strategy = 'constant', fill_value = 0)
-        
-        training_features[impute_cons] = imp.fit_transform(training_features[impute_cons])
-        testing_features[impute_cons] = imp.transform(testing_features[impute_cons])
-        
-        del imp
-        
-    # oversample imbalanced training data
+        search_features = memmap_array(search_features, os.path.join(memmap_dir, 'search_features_RS%d.npy' % random_state))
     
-    if oversample == 'random':
-        
-        osm = RandomOverSampler(sampling_strategy = 'not majority', random_state = random_state)
-        training_features, training_targets = osm.fit_resample(training_features.values, training_targets.values[:, 0])
-        
-        training_features = pd.DataFrame(training_features, columns = testing_features.columns)
-        training_targets = pd.DataFrame(training_targets, columns = testing_targets.columns)
-        
-        del osm
-        
-    elif oversample == 'smote':
-        
-        osm = SMOTE(sampling_strategy = 'not majority', random_state = random_state, n_jobs = -1)
-        training_features, training_targets = osm.fit_resample(training_features.values, training_targets.values[:, 0])
-        
-        training_features = pd.DataFrame(training_features, columns = testing_features.columns)
-        training_targets = pd.DataFrame(training_targets, columns = testing_targets.columns)
-        
-        del osm
-        
-    elif oversample == 'adasyn':
-        
-        osm = ADASYN(sampling_strategy = 'not majority', random_state = random_state, n_jobs = -1)
-        training_features, training_targets = osm.fit_resample(training_features.values, training_targets.values[:, 0])
-        
-        training_features = pd.DataFrame(training_features, columns = testing_features.columns)
-        training_targets = pd.DataFrame(training_targets, columns = testing_targets.columns)
-        
-        del osm
-    
-    # discretise features
+    # materialise the pre-processed features once per split as read-only 
+    # memory-maps shared by all models, n_features and parameter search workers
     
-    if discretise:
+    training_features = memmap_array(training_features, os.path.join(memmap_dir, 'training_features_RS%d.npy' % random_state))
+    testing_features = memmap_array(testing_features, os.path.join(memmap_dir, 'testing_features_RS%d.npy' % random_state))
     
-        enc = KBinsDiscretizer(n_bins = 10, encode = 'ordinal', strategy = 'uniform')
+    if not resample_in_folds:
         
-        training_features[discretise] = enc.fit_transform(training_features[discretise])
-        testing_features[discretise] = enc.transform(testing_features[discretise])
-        
-        del enc
-    
-    # scale features
-       
-    if scaling_type == 'log':
-        
-        training_features = np.log1p(training_features)
-        testing_features = np.log1p(testing_features)
-        
-    elif scaling_type == 'minmax':
-        
-        scaler = MinMaxScaler(feature_range = (0, 1)) 
-        training_features[feature_labels] = scaler.fit_transform(training_features[feature_labels])
-        testing_features[feature_labels] = scaler.transform(testing_features[feature_labels])
-        
-        del scaler
-        
-    elif scaling_type == 'standard':
-        
-        scaler = StandardScaler() 
-        training_features[feature_labels] = scaler.fit_transform(training_features[feature_labels])
-        testing_features[feature_labels] = scaler.transform(testing_features[feature_labels])
-        
-        del scaler
+        search_features, search_targets, search_cv = training_features, training_targets, cv
     
     for n in n_features:    
         for model in models:
             
+            # load result from checkpoint if the cell has already been finished
+            
+            if checkpoint.is_done(iteration, random_state, n, model):
+                
+                clf_store.add(checkpoint.load(iteration, random_state, n, model))
+                continue
+            
             # obtain grid parameters and model
             
+            if models[model] is None:
+                models[model] = create_model(model)
+            
             clf_model = models.get(model)
             grid_param = parameters.get(model)
             
             # define parameter search method
             
-            clf_grid = GridSearchCV(clf_model, grid_param, n_jobs = -1, cv = cv, 
-                                    scoring = scoring, refit = True, iid = False)
+            if search_strategy == 'grid':
+                
+                clf_grid = GridSearchCV(clf_model, grid_param, n_jobs = -1, cv = search_cv, 
+                                        scoring = scoring, refit = not resample_in_folds, 
+                                        iid = False)
+                
+            elif search_strategy == 'halving':
+                
+                clf_grid = SuccessiveHalvingSearch(clf_model, grid_param, n_jobs = -1, cv = cv,
+                                                   scoring = scoring, refit = True,
+                                                   factor = halving_factor, 
+                                                   random_state = random_state)
+                
+            elif search_strategy == 'warm_start':
+                
+                clf_grid = WarmStartGridSearch(clf_model, grid_param, n_jobs = -1, cv = search_cv,
+                                               scoring = scoring, refit = not resample_in_folds)
+                
+            else:
+                
+                raise ValueError('Unknown search strategy: %s' % search_strategy)
             
             # fit parameter search
         
-            clf_fit = clf_grid.fit(training_features[feature_labels[0:n]].values, training_targets.values[:, 0])
+            clf_fit = clf_grid.fit(search_features[:, 0:n], search_targets)
+            
+            # obtain the best model (refitted with the oversampled training set 
+            # when the folds were oversampled separately)
+            
+            if resample_in_folds:
+                
+                best_model = clone(clf_model).set_params(**clf_fit.best_params_)
+                best_model.fit(training_features[:, 0:n], training_targets)
+                
+            else:
+                
+                best_model = clf_fit.best_estimator_
             
             # calculate predictions
             
-            testing_predictions = clf_fit.predict(testing_features[feature_labels[0:n]].values)
+            testing_predictions = best_model.predict(testing_features[:, 0:n])
             
             # calculate test score
             
             if type(scoring) == str and scoring[:2] == 'f1':
                 
-                test_score = f1_score(testing_targets.values[:, 0], testing_predictions, average = scoring[3:])
+                test_score = f1_score(testing_targets, testing_predictions, average = scoring[3:])
                 
             elif type(scoring) == str and scoring == 'balanced_accuracy':
                 
-                test_score = balanced_accuracy_score(testing_targets.values[:, 0], testing_predictions)
+                test_score = balanced_accuracy_score(testing_targets, testing_predictions)
                 
             else:
                 
-                test_score = scoring(clf_fit, testing_features[feature_labels[0:n]].values, testing_targets.values[:, 0])
+                test_score = scoring(best_model, testing_features[:, 0:n], testing_targets)
+            
+            # calculate number of fits compared to the exhaustive search, and
+            # the fit cost in full training set fits (fits on subsamples of
+            # successive halving are cheaper)
+            
+            n_grid_fits = len(ParameterGrid(grid_param)) * cv
+            n_fits = getattr(clf_fit, 'n_fits_', n_grid_fits)
+            fit_cost = getattr(clf_fit, 'fit_cost_', n_fits)
             
-            # save results
+            # save results and checkpoint
             
-            res = pd.DataFrame(clf_fit.best_params_, index = [0])
-            res['model'] = model
-            res['validation_score'] = clf_fit.best_score_
-            res['test_score'] = test_score
-            res['n_features'] = n
-            res['iteration'] = iteration
-            res['random_state'] = random_state
-            clf_results = clf_results.append(res, sort = True, ignore_index = True)
+            result = dict(clf_fit.best_params_)
+            result['model'] = model
+            result['validation_score'] = clf_fit.best_score_
+            result['test_score'] = test_score
+            result['n_features'] = n
+            result['iteration'] = iteration
+            result['random_state'] = random_state
+            result['n_fits'] = n_fits
+            result['n_fits_saved'] = n_grid_fits - n_fits
+            result['fit_cost'] = fit_cost
+            checkpoint.save(iteration, random_state, n, model, result)
+            clf_store.add(result)
             
-            del clf_model, grid_param, clf_grid, clf_fit, testing_predictions, test_score, res
+            del clf_model, grid_param, clf_grid, clf_fit, best_model, testing_predictions, test_score, result
+            del n_grid_fits, n_fits, fit_cost
                 
     del n, model, random_state
     del training_set, training_features, training_targets
-    del testing_set, testing_features, testing_targets
+    del testing_set, testing_features, testing_targets, preprocessing
+    del search_features, search_targets, search_cv
     
-del iteration
+del iteration, random_states
+
+shutil.rmtree(memmap_dir, ignore_errors = True)
+
+clf_results = clf_store.to_dataframe()
         
 end_time = time.time()
 
 print('Total execution time: %.1f min' % ((end_time - start_time) / 60))
 
+# report number of fits saved by the parameter search strategy
+
+n_fits_total = clf_results['n_fits'].sum()
+n_fits_saved = clf_results['n_fits_saved'].sum()
+fit_cost_total = clf_results['fit_cost'].sum()
+
+print('Number of fits: %d (%d saved, %.1f %%)' % (n_fits_total, n_fits_saved, 
+                                                  100 * n_fits_saved / (n_fits_total + n_fits_saved)))
+print('Fit cost: %.1f full training set fits (%.1f %% of exhaustive search)' % (
+        fit_cost_total, 100 * fit_cost_total / (n_fits_total + n_fits_saved)))
+
 #%% calculate summaries
 
 # summarise results
@@ -484,135 +582,25 @@ heatmap_tscore_mean.columns = heatmap_tscore_mean.columns.astype(int)
 
 #%% plot figures
 
-# define plotting order alphabetically
-
-order = list(models.keys())
-order.sort()
-
-# plot validation and test scores
-
-f1 = plt.figure(figsize = (6, 4))
-ax = sns.heatmap(heatmap_vscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.2f')
-#ax.set_aspect(1)
-plt.ylabel('Classification model')
-plt.xlabel('Number of features')
-
-f2 = plt.figure(figsize = (6, 4))
-ax = sns.heatmap(heatmap_tscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.2f')
-#ax.set_aspect(1)
-plt.ylabel('Classification model')
-plt.xlabel('Number of features')
-
-f3 = plt.figure(figsize = (6, 4))
-ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'validation_score', 
-                  label = 'Validation', ci = 95, color = 'blue')
-ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'test_score', 
-                  label = 'Test', ci = 95, color = 'k')
-ax.grid(True)
-ax.xaxis.set_major_locator(ticker.MultipleLocator(2))
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.05))
-ax.yaxis.set_major_formatter(ticker.FormatStrFormatter('%.2f'))
-ax.autoscale(enable = True, axis = 'x', tight = True)
-plt.legend(loc = 'lower right')
-plt.ylabel('Mean score')
-plt.xlabel('Number of features')
-
-# stripplots
-
-f4, ax = plt.subplots(figsize = (16, 4))
-#sns.despine(bottom=True, left=True)
-sns.stripplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results, 
-              order = order, dodge = True, jitter = True, alpha = .25, zorder = 1)
-sns.pointplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results,
-              order = order, dodge = .532, join = False, palette = 'dark', markers = 'd', scale = .75, ci = None)
-ax.yaxis.grid()
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles[5:], labels[5:], title = 'Number of features', handletextpad = 0, 
-          columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
-plt.ylabel('Score')
-plt.xlabel('Classification model')
-
-f5, ax = plt.subplots(figsize = (16, 4))
-sns.stripplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results, 
-              order = order, dodge = True, jitter = True, alpha = .25, zorder = 1)
-sns.pointplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results, 
-              order = order, dodge = .532, join = False, palette = 'dark', markers = 'd', scale = .75, ci = None)
-ax.yaxis.grid()
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles[5:], labels[5:], title = 'Number of features', handletextpad = 0, 
-          columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
-plt.ylabel('Score')
-plt.xlabel('Classification model')
-
-# boxplots
-
-f6 = plt.figure(figsize = (16, 4))
-ax = sns.boxplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results,
-                 order = order, whis = 1.5, fliersize = 2, notch = True)
-#ax = sns.swarmplot(x = 'model', y = 'validation_score', data = clf_results,
-#                   order = order, size = 2, color = '.3', linewidth = 0)
-ax.yaxis.grid()
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
-          columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
-plt.ylabel('Score')
-plt.xlabel('Classification model')
-
-f7 = plt.figure(figsize = (16, 4))
-ax = sns.boxplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results,
-                 order = order, whis = 1.5, fliersize = 2, notch = True)
-#ax = sns.swarmplot(x = 'model', y = 'test_score', data = clf_results,
-#                   order = order, size = 2, color = '.3', linewidth = 0)
-ax.yaxis.grid()
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
-          columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
-plt.ylabel('Score')
-plt.xlabel('Classification model')
-
-# violinplots
-
-f8 = plt.figure(figsize = (16, 4))
-ax = sns.violinplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results,
-                    order = order)
-ax.yaxis.grid()
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
-          columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
-plt.ylabel('Score')
-plt.xlabel('Classification model')
-
-f9 = plt.figure(figsize = (16, 4))
-ax = sns.violinplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results,
-                    order = order)
-ax.yaxis.grid()
-ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
-          columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
-ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
-plt.ylabel('Score')
-plt.xlabel('Classification model')
+figures = []
+
+if not headless:
+    
+    from plot_model_selection import plot_model_selection
+    
+    figures = plot_model_selection(clf_results, clf_summary, heatmap_vscore_mean, heatmap_tscore_mean)
 
 #%% save data
 
 # make directory
 
-model_dir = os.path.join('Model selection', 
+model_dir = os.path.join(output_dir, 
                          ('%s_NF%d_NM%d_NI%d' % (timestr, max(n_features), len(models), n_iterations)))
 
-if not os.path.exists(model_dir):
-    os.makedirs(model_dir)
+if os.path.exists(model_dir):
+    model_dir = '%s_%d' % (model_dir, os.getpid())
+
+os.makedirs(model_dir)
     
 # save parameters into text file
     
@@ -625,6 +613,7 @@ with open(os.path.join(model_dir, 'parameters.txt'), 'w') as text_file:
     text_file.write('duplicates: %s\n' % str(duplicates))
     text_file.write('n_iterations: %d\n' % n_iterations)
     text_file.write('oversample: %s\n' % str(oversample))
+    text_file.write('oversample_in_folds: %s\n' % str(oversample_in_folds))
     text_file.write('discretise: %s\n' % str(discretise))
     text_file.write('impute_mean: %s\n' % str(impute_mean))
     text_file.write('impute_mode: %s\n' % str(impute_mode))
@@ -633,33 +622,61 @@ with open(os.path.join(model_dir, 'parameters.txt'), 'w') as text_file:
     text_file.write('scoring: %s\n' % scoring)
     text_file.write('split_ratio: %.1f\n' % split_ratio)
     text_file.write('cv: %d\n' % cv)
+    text_file.write('search_strategy: %s\n' % search_strategy)
+    text_file.write('halving_factor: %d\n' % halving_factor)
+    text_file.write('n_fits_total: %d\n' % n_fits_total)
+    text_file.write('n_fits_saved: %d\n' % n_fits_saved)
+    text_file.write('fit_cost_total: %.1f\n' % fit_cost_total)
+    text_file.write('checkpoint_dir: %s\n' % checkpoint_dir)
+    text_file.write('config: %s\n' % str(config))
     
-# save figures
-    
-for filetype in ['pdf', 'png', 'eps']:
-    
-    f1.savefig(os.path.join(model_dir, ('heatmap_vscore_mean.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f2.savefig(os.path.join(model_dir, ('heatmap_tscore_mean.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f3.savefig(os.path.join(model_dir, ('lineplot_scores.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f4.savefig(os.path.join(model_dir, ('stripplot_vscore.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f5.savefig(os.path.join(model_dir, ('stripplot_tscore.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f6.savefig(os.path.join(model_dir, ('boxplot_vscore.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f7.savefig(os.path.join(model_dir, ('boxplot_tscore.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f8.savefig(os.path.join(model_dir, ('violinplot_vscore.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-    f9.savefig(os.path.join(model_dir, ('violinplot_tscore.' + filetype)), dpi = 600, format = filetype,
-               bbox_inches = 'tight', pad_inches = 0)
-
-# save variables
-    
-variable_names = %who_ls DataFrame ndarray list dict str bool int int64 float float64
-variables = dict((name, eval(name)) for name in variable_names)
-    
-pickle.dump(variables, open(os.path.join(model_dir, 'variables.pkl'), 'wb'))
+# save figures (rendered in background processes while the variables are
+# saved, figures unchanged since an earlier run are copied from the cache)
+
+exporter = FigureExporter(model_dir, formats = figure_formats, dpi = figure_dpi,
+                          cache_dir = os.path.join(output_dir, 'Figure cache'))
+
+for name, figure, data in figures:
+    exporter.export(name, figure, data)
+
+# save variables (results, summaries and configuration only, each variable
+# into its own file)
+
+variables_to_save = {'clf_results': clf_results,
+                     'clf_summary': clf_summary,
+                     'heatmap_vscore_mean': heatmap_vscore_mean,
+                     'heatmap_tscore_mean': heatmap_tscore_mean,
+                     'df_stats': df_stats,
+                     'duplicates': duplicates,
+                     'NPV_bins': NPV_bins,
+                     'feature_labels': feature_labels,
+                     'target_label': target_label,
+                     'n_iterations': n_iterations,
+                     'n_features': n_features,
+                     'split_ratio': split_ratio,
+                     'impute_mean': impute_mean,
+                     'impute_mode': impute_mode,
+                     'impute_cons': impute_cons,
+                     'oversample': oversample,
+                     'oversample_in_folds': oversample_in_folds,
+                     'discretise': discretise,
+                     'scaling_type': scaling_type,
+                     'cv': cv,
+                     'search_strategy': search_strategy,
+                     'halving_factor': halving_factor,
+                     'scoring': scoring,
+                     'models': models,
+                     'parameters': parameters,
+                     'n_fits_total': n_fits_total,
+                     'n_fits_saved': n_fits_saved,
+                     'fit_cost_total': fit_cost_total,
+                     'timestr': timestr,
+                     'start_time': start_time,
+                     'end_time': end_time,
+                     'checkpoint_dir': checkpoint_dir,
+                     'config': config,
+                     'model_dir': model_dir}
+
+ArtifactStore(os.path.join(model_dir, 'variables')).save(variables_to_save)
+
+exporter.close()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 21:31:47 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used for plotting the training and testing confusion
+    matrices of a trained classification model
+    (fibroid_softmax_classification_scikit.py)
+
+'''
+
+#%% import necessary libraries
+
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+#%% define function
+
+def plot_classification_model(cm_training, cm_testing):
+    
+    '''
+    Args:
+        cm_training: normalised training confusion matrix (ndarray)
+        cm_testing: normalised testing confusion matrix (ndarray)
+    Returns:
+        figures: name, figure and plotted data of each figure (list)
+    '''
+    
+    f1 = plt.figure(figsize = (6, 4))
+    ax = sns.heatmap(cm_training, cmap = 'Greys', vmin = 0, vmax = 1,
+                     cbar_kws = {'ticks': [0, 0.5, 1]})
+    ax.set_aspect(1)
+#    plt.title('Training')
+    plt.ylabel('True class')
+    plt.xlabel('Predicted class')
+    
+    f2 = plt.figure(figsize = (6, 4))
+    ax = sns.heatmap(cm_testing, cmap = 'Greys', vmin = 0, vmax = 1,
+                     cbar_kws = {'ticks': [0, 0.5, 1]})
+    ax.set_aspect(1)
+#    plt.title('Testing')
+    plt.ylabel('True class')
+    plt.xlabel('Predicted class')
+    
+    return [('cm_training', f1, cm_training),
+            ('cm_testing', f2, cm_testing)]
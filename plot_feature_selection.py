@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 21:24:09 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used for plotting the scores, feature rankings,
+    selected parameters and correlations of the feature selection
+    (feature_selection.py). The figures are plotted from the saved
+    summaries, so they can also be plotted afterwards for a headless run
+    (see report_figures.py)
+
+'''
+
+#%% import necessary libraries
+
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import seaborn as sns
+
+#%% define function
+
+def plot_feature_selection(heatmap_vscore_mean, heatmap_tscore_mean, clf_summary, clf_results,
+                           feature_boxplot, top_features_median, heatmap_rankings_mean, 
+                           heatmap_rankings_median, feature_corr, feature_corr_mask, 
+                           method_corr, method_corr_mask):
+    
+    '''
+    Args:
+        heatmap_vscore_mean: mean validation scores (DataFrame)
+        heatmap_tscore_mean: mean test scores (DataFrame)
+        clf_summary: mean scores of each method and number of features (DataFrame)
+        clf_results: scores and parameters of each iteration (DataFrame)
+        feature_boxplot: rankings of each feature (DataFrame)
+        top_features_median: median rankings of the top features (DataFrame)
+        heatmap_rankings_mean: mean feature rankings (DataFrame)
+        heatmap_rankings_median: median feature rankings (DataFrame)
+        feature_corr: correlations between the features (DataFrame)
+        feature_corr_mask: mask of the upper triangle (ndarray)
+        method_corr: correlations between the methods (DataFrame)
+        method_corr_mask: mask of the upper triangle (ndarray)
+    Returns:
+        figures: name, figure and plotted data of each figure (list)
+    '''
+    
+    # define colormap
+
+    #cmap = sns.diverging_palette(220, 10, as_cmap = True)
+    cmap = 'RdBu'
+
+    # plot validation and test scores
+
+    f1 = plt.figure()
+    ax = sns.heatmap(heatmap_vscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = ".2f")
+    #ax.set_aspect(1)
+    plt.ylabel('Feature selection method')
+    plt.xlabel('Number of features')
+
+    f2 = plt.figure()
+    ax = sns.heatmap(heatmap_tscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = ".2f")
+    #ax.set_aspect(1)
+    plt.ylabel('Feature selection method')
+    plt.xlabel('Number of features')
+
+    f3 = plt.figure()
+    ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'validation_score', 
+                      label = 'Validation', ci = 95)
+    ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'test_score', 
+                      label = 'Test', ci = 95)
+    ax.grid(True)
+    ax.xaxis.set_major_locator(ticker.MultipleLocator(2))
+    ax.autoscale(enable = True, axis = 'x', tight = True)
+    plt.legend(loc = 'lower right')
+    plt.ylabel('Mean score')
+    plt.xlabel('Number of features')
+
+    # plot feature rankings
+
+    f4 = plt.figure(figsize = (16, 4))
+    ax = sns.boxplot(x = 'feature', y = 'ranking', data = feature_boxplot, order = top_features_median['feature'],
+                     whis = 1.5, palette = 'Blues', fliersize = 2, notch = True)
+    #ax = sns.swarmplot(x = 'feature', y = 'ranking', data = feature_boxplot, order = feature_order, 
+    #                   size = 2, color = '.3', linewidth = 0)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 90)
+    plt.ylabel('Ranking')
+    plt.xlabel('Feature')
+
+    f5 = plt.figure(figsize = (22, 4))
+    ax = sns.heatmap(heatmap_rankings_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.1f',
+                     cbar_kws = {'ticks': [0, 19, 38], 'pad': 0.01})
+    #ax.set_aspect(1)
+    plt.ylabel('Feature selection method')
+    plt.xlabel('Feature')
+
+    f6 = plt.figure(figsize = (18, 4))
+    ax = sns.heatmap(heatmap_rankings_median, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.0f',
+                     cbar_kws = {'ticks': [0, 19, 38], 'pad': 0.01})
+    #ax.set_aspect(1)
+    plt.ylabel('Feature selection method')
+    plt.xlabel('Feature')
+
+    # plot parameter distributions
+
+    f7 = plt.figure()
+    ax = clf_results.C.value_counts().plot(kind = 'bar')
+    plt.ylabel('Count')
+    plt.xlabel('C')
+
+    f8 = plt.figure()
+    ax = clf_results.gamma.value_counts().plot(kind = 'bar')
+    plt.ylabel('Count')
+    plt.xlabel('Gamma')
+
+    # plot correlations
+
+    f9 = plt.figure(figsize = (4, 4))
+    ax = sns.heatmap(feature_corr, mask = feature_corr_mask, cmap = cmap, vmin = -1, vmax = 1, center = 0,
+                     square = True, linewidths = 0.5, cbar_kws = {'shrink': 0.6, 'ticks': [-1, 0, 1],
+                                                                  'pad': 0})
+
+    f10 = plt.figure(figsize = (6, 6))
+    ax = sns.heatmap(method_corr, mask = method_corr_mask, cmap = cmap, vmin = -1, vmax = 1, center = 0,
+                     square = True, linewidths = 0.5, cbar_kws = {'shrink': 0.5, 'ticks': [-1, 0, 1],
+                                                                  'pad': -0.1})
+    
+    return [('heatmap_vscore_mean', f1, heatmap_vscore_mean),
+            ('heatmap_tscore_mean', f2, heatmap_tscore_mean),
+            ('lineplot_scores', f3, clf_summary),
+            ('boxplot_feature_rankings', f4, [feature_boxplot, top_features_median]),
+            ('heatmap_rankings_mean', f5, heatmap_rankings_mean),
+            ('heatmap_rankings_median', f6, heatmap_rankings_median),
+            ('parameter_c', f7, clf_results['C']),
+            ('parameter_gamma', f8, clf_results['gamma']),
+            ('feature_corr', f9, feature_corr),
+            ('method_corr', f10, method_corr)]
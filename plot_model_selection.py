@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 21:24:09 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used for plotting the validation and test scores of
+    the model selection (model_selection.py). The figures are plotted from
+    the saved summaries, so they can also be plotted afterwards for a
+    headless run (see report_figures.py)
+
+'''
+
+#%% import necessary libraries
+
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import seaborn as sns
+
+#%% define function
+
+def plot_model_selection(clf_results, clf_summary, heatmap_vscore_mean, heatmap_tscore_mean):
+    
+    '''
+    Args:
+        clf_results: validation and test scores of each iteration (DataFrame)
+        clf_summary: mean scores of each model and number of features (DataFrame)
+        heatmap_vscore_mean: mean validation scores (DataFrame)
+        heatmap_tscore_mean: mean test scores (DataFrame)
+    Returns:
+        figures: name, figure and plotted data of each figure (list)
+    '''
+    
+    # define plotting order alphabetically
+    
+    order = sorted(clf_results['model'].unique())
+    
+    # plot validation and test scores
+
+    f1 = plt.figure(figsize = (6, 4))
+    ax = sns.heatmap(heatmap_vscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.2f')
+    #ax.set_aspect(1)
+    plt.ylabel('Classification model')
+    plt.xlabel('Number of features')
+
+    f2 = plt.figure(figsize = (6, 4))
+    ax = sns.heatmap(heatmap_tscore_mean, cmap = 'Blues', linewidths = 0.5, annot = True, fmt = '.2f')
+    #ax.set_aspect(1)
+    plt.ylabel('Classification model')
+    plt.xlabel('Number of features')
+
+    f3 = plt.figure(figsize = (6, 4))
+    ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'validation_score', 
+                      label = 'Validation', ci = 95, color = 'blue')
+    ax = sns.lineplot(data = clf_summary, x = 'n_features', y = 'test_score', 
+                      label = 'Test', ci = 95, color = 'k')
+    ax.grid(True)
+    ax.xaxis.set_major_locator(ticker.MultipleLocator(2))
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.05))
+    ax.yaxis.set_major_formatter(ticker.FormatStrFormatter('%.2f'))
+    ax.autoscale(enable = True, axis = 'x', tight = True)
+    plt.legend(loc = 'lower right')
+    plt.ylabel('Mean score')
+    plt.xlabel('Number of features')
+
+    # stripplots
+
+    f4, ax = plt.subplots(figsize = (16, 4))
+    #sns.despine(bottom=True, left=True)
+    sns.stripplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results, 
+                  order = order, dodge = True, jitter = True, alpha = .25, zorder = 1)
+    sns.pointplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results,
+                  order = order, dodge = .532, join = False, palette = 'dark', markers = 'd', scale = .75, ci = None)
+    ax.yaxis.grid()
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles[5:], labels[5:], title = 'Number of features', handletextpad = 0, 
+              columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
+    plt.ylabel('Score')
+    plt.xlabel('Classification model')
+
+    f5, ax = plt.subplots(figsize = (16, 4))
+    sns.stripplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results, 
+                  order = order, dodge = True, jitter = True, alpha = .25, zorder = 1)
+    sns.pointplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results, 
+                  order = order, dodge = .532, join = False, palette = 'dark', markers = 'd', scale = .75, ci = None)
+    ax.yaxis.grid()
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles[5:], labels[5:], title = 'Number of features', handletextpad = 0, 
+              columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
+    plt.ylabel('Score')
+    plt.xlabel('Classification model')
+
+    # boxplots
+
+    f6 = plt.figure(figsize = (16, 4))
+    ax = sns.boxplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results,
+                     order = order, whis = 1.5, fliersize = 2, notch = True)
+    #ax = sns.swarmplot(x = 'model', y = 'validation_score', data = clf_results,
+    #                   order = order, size = 2, color = '.3', linewidth = 0)
+    ax.yaxis.grid()
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
+              columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
+    plt.ylabel('Score')
+    plt.xlabel('Classification model')
+
+    f7 = plt.figure(figsize = (16, 4))
+    ax = sns.boxplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results,
+                     order = order, whis = 1.5, fliersize = 2, notch = True)
+    #ax = sns.swarmplot(x = 'model', y = 'test_score', data = clf_results,
+    #                   order = order, size = 2, color = '.3', linewidth = 0)
+    ax.yaxis.grid()
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
+              columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
+    plt.ylabel('Score')
+    plt.xlabel('Classification model')
+
+    # violinplots
+
+    f8 = plt.figure(figsize = (16, 4))
+    ax = sns.violinplot(x = 'model', y = 'validation_score', hue = 'n_features', data = clf_results,
+                        order = order)
+    ax.yaxis.grid()
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
+              columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
+    plt.ylabel('Score')
+    plt.xlabel('Classification model')
+
+    f9 = plt.figure(figsize = (16, 4))
+    ax = sns.violinplot(x = 'model', y = 'test_score', hue = 'n_features', data = clf_results,
+                        order = order)
+    ax.yaxis.grid()
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(0.1))
+    handles, labels = ax.get_legend_handles_labels()
+    ax.legend(handles, labels, title = 'Number of features', handletextpad = 0.1, 
+              columnspacing = 1, loc = 'lower center', ncol = 5, frameon = True)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation = 45)
+    plt.ylabel('Score')
+    plt.xlabel('Classification model')
+    
+    return [('heatmap_vscore_mean', f1, heatmap_vscore_mean),
+            ('heatmap_tscore_mean', f2, heatmap_tscore_mean),
+            ('lineplot_scores', f3, clf_summary),
+            ('stripplot_vscore', f4, clf_results[['model', 'n_features', 'validation_score']]),
+            ('stripplot_tscore', f5, clf_results[['model', 'n_features', 'test_score']]),
+            ('boxplot_vscore', f6, clf_results[['model', 'n_features', 'validation_score']]),
+            ('boxplot_tscore', f7, clf_results[['model', 'n_features', 'test_score']]),
+            ('violinplot_vscore', f8, clf_results[['model', 'n_features', 'validation_score']]),
+            ('violinplot_tscore', f9, clf_results[['model', 'n_features', 'test_score']])]
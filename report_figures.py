@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 21:36:22 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to plot and save the figures of a finished run from
+    its saved variables, so that model_selection.py, feature_selection.py
+    and fibroid_softmax_classification_scikit.py can be run in headless mode
+    (without plotting) on a cluster and the figures rendered afterwards:
+
+        python report_figures.py <model_dir> --formats pdf png --dpi 300
+
+    The type of the run is recognised from the saved variables, and figures
+    whose data has not changed since the last report are not rendered again
+
+'''
+
+#%% import necessary libraries
+
+import os
+import argparse
+import matplotlib
+matplotlib.use('Agg')
+
+from ArtifactStore import ArtifactStore
+from FigureExporter import FigureExporter
+from save_load_variables import save_load_variables
+
+#%% define function
+
+def report_figures(model_dir, formats = ['pdf', 'png', 'eps'], dpi = 600, max_workers = None):
+
+    '''
+    Args:
+        model_dir: directory of the run containing the saved variables (str)
+        formats: file formats of each figure (list)
+        dpi: resolution of the raster formats (int)
+        max_workers: number of rendering processes (int, see FigureExporter)
+    Returns:
+        figure_names: names of the plotted figures (list)
+    '''
+
+    # the store reads only the variables needed for the figures, older runs
+    # are loaded from a single pickle file
+
+    variables_dir = os.path.join(model_dir, 'variables')
+
+    if ArtifactStore.exists(variables_dir):
+        variables = ArtifactStore(variables_dir)
+    else:
+        variables = save_load_variables(model_dir, None, 'variables', 'load')
+
+    if 'feature_rankings' in variables:
+
+        from plot_feature_selection import plot_feature_selection
+
+        figures = plot_feature_selection(*[variables[key] for key in
+                                           ('heatmap_vscore_mean', 'heatmap_tscore_mean', 'clf_summary',
+                                            'clf_results', 'feature_boxplot', 'top_features_median',
+                                            'heatmap_rankings_mean', 'heatmap_rankings_median',
+                                            'feature_corr', 'feature_corr_mask', 'method_corr',
+                                            'method_corr_mask')])
+
+    elif 'clf_summary' in variables:
+
+        from plot_model_selection import plot_model_selection
+
+        figures = plot_model_selection(variables['clf_results'], variables['clf_summary'],
+                                       variables['heatmap_vscore_mean'], variables['heatmap_tscore_mean'])
+
+    elif 'cm_testing' in variables:
+
+        from plot_classification_model import plot_classification_model
+
+        figures = plot_classification_model(variables['cm_training'], variables['cm_testing'])
+
+    else:
+
+        raise ValueError('Unknown variables for plotting: %s' % model_dir)
+
+    with FigureExporter(model_dir, formats = formats, dpi = dpi, max_workers = max_workers) as exporter:
+        for name, figure, data in figures:
+            exporter.export(name, figure, data)
+
+    return [name for name, _, _ in figures]
+
+#%% plot figures
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Plot and save the figures of a finished run')
+    parser.add_argument('model_dir', help = 'directory of the run containing the saved variables')
+    parser.add_argument('--formats', nargs = '+', default = ['pdf', 'png', 'eps'], help = 'file formats')
+    parser.add_argument('--dpi', type = int, default = 600, help = 'resolution of the raster formats')
+    parser.add_argument('--max_workers', type = int, default = None, help = 'number of rendering processes')
+    args = parser.parse_args()
+
+    figure_names = report_figures(args.model_dir, args.formats, args.dpi, args.max_workers)
+
+    print('Saved figures: %s' % ', '.join(figure_names))
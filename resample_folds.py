@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Sat Oct 17 18:04:52 2026
+
+@author:
+
+    Visa Suomi
+    Turku University Hospital
+    October 2026
+
+@description:
+
+    This function is used to pre-process and oversample the training
+    partition of each cross-validation fold separately, so that synthetic or
+    duplicated samples never leak into the validation partition. Each fold
+    runs its own copy of the pre-processing pipeline, so the samples are
+    oversampled in the imputed feature space before they are discretised and
+    scaled, in the same order as when the whole training set is
+    pre-processed. The validation partition is transformed with the pipeline
+    of its fold. The pre-processed partitions of all folds are stacked into
+    a single array, and the folds are returned as (train, test) indices into
+    the stacked array. The resamples are therefore calculated once and
+    reused by every candidate of the parameter search (and every model and
+    number of features), by passing the indices as the cv argument of the
+    search
+
+'''
+
+#%% import necessary packages
+
+import copy
+import numpy as np
+
+from sklearn.model_selection import check_cv
+
+#%% resample cross-validation folds
+
+def resample_folds(preprocessing, features, targets, cv):
+
+    '''
+    Args:
+        preprocessing: unfitted pre-processing pipeline including the
+        oversampling (PreprocessingPipeline)
+        features: training features before pre-processing (DataFrame or ndarray)
+        targets: training targets (DataFrame, Series or ndarray)
+        cv: number of folds or cross-validation generator
+
+    Returns:
+        features: pre-processed and resampled training partition followed by
+        the pre-processed validation partition of each fold (ndarray)
+        targets: targets of the stacked samples (ndarray)
+        folds: (train, test) indices of each fold into the stacked arrays,
+        the test indices always pointing to original samples (list)
+    '''
+
+    features = preprocessing.to_array(features)
+    targets = np.asarray(targets).ravel()
+
+    cv = check_cv(cv, targets, classifier = True)
+
+    stacked_features = []
+    stacked_targets = []
+    folds = []
+    offset = 0
+
+    for train, test in cv.split(features, targets):
+
+        fold_preprocessing = copy.deepcopy(preprocessing)
+
+        train_features, train_targets = fold_preprocessing.fit_transform(features[train], targets[train])
+        test_features = fold_preprocessing.transform(features[test])
+
+        stacked_features.extend([train_features, test_features])
+        stacked_targets.extend([train_targets, targets[test]])
+        folds.append((np.arange(offset, offset + len(train_targets)),
+                      np.arange(offset + len(train_targets), offset + len(train_targets) + len(test))))
+
+        offset += len(train_targets) + len(test)
+
+    return np.concatenate(stacked_features), np.concatenate(stacked_targets), folds
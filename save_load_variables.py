@@ -10,15 +10,24 @@ Created on Fri Sep  7 09:30:00 2018
     
 @description:
     
-    This function is used to save variables from workspace into a pickle file
+    This function is used to save variables from workspace into an artifact
+    store (one file per variable and a manifest, see ArtifactStore), so that
+    adding variables only writes the new variables and loading can read a
+    subset of them. Variables saved into a single pickle file by earlier
+    versions are loaded directly and converted into a store when variables
+    are added
     
 '''
 
 #%% import necessary packages
 
 import pickle
+import shutil
+import errno
 import os
 
+from ArtifactStore import ArtifactStore
+
 #%% save or load variables
 
 def save_load_variables(directory, variables, fname, opt):
@@ -26,8 +35,9 @@ def save_load_variables(directory, variables, fname, opt):
     '''
     Args:
         directory: path to file
-        variables: variables to save/load/add
-        fname: filename with ending
+        variables: variables to save/add (dict) or names of the variables to
+        load (list, all variables if None)
+        fname: name of the store (or pickle file of earlier versions)
         opt: whether save ('save'), load ('load') or add ('add') variables
         
     Returns:
@@ -38,26 +48,54 @@ def save_load_variables(directory, variables, fname, opt):
     
     if opt == 'save':
         
-        pickle_out = open(file_path, 'wb')
-        pickle.dump(variables, pickle_out)
-        pickle_out.close()
+        # replace the earlier variables completely
+        
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+        elif ArtifactStore.exists(file_path):
+            shutil.rmtree(file_path)
+        
+        ArtifactStore(file_path).save(variables)
         
     elif opt == 'load':
         
-        pickle_in = open(file_path, 'rb')
-        variables = pickle.load(pickle_in)
-        pickle_in.close()
-        return variables
+        if os.path.isfile(file_path):
+            
+            pickle_in = open(file_path, 'rb')
+            old_variables = pickle.load(pickle_in)
+            pickle_in.close()
+            
+            if variables is None:
+                return old_variables
+            else:
+                return dict((key, old_variables[key]) for key in variables)
+        
+        # a missing store is an error instead of an empty store (which the
+        # constructor would create)
+        
+        if not ArtifactStore.exists(file_path):
+            raise FileNotFoundError(errno.ENOENT, 'No saved variables found', file_path)
+        
+        return ArtifactStore(file_path).load(variables)
     
     elif opt == 'add':
         
-        pickle_in = open(file_path, 'rb')
-        old_variables = pickle.load(pickle_in)
-        pickle_in.close()
-        new_variables = {**old_variables, **variables}
-        pickle_out = open(file_path, 'wb')
-        pickle.dump(new_variables, pickle_out)
-        pickle_out.close()
+        if os.path.isfile(file_path):
+            
+            # convert the pickle file of earlier versions into a store
+            
+            pickle_in = open(file_path, 'rb')
+            old_variables = pickle.load(pickle_in)
+            pickle_in.close()
+            
+            tmp_path = file_path + '.tmp'
+            shutil.rmtree(tmp_path, ignore_errors = True)
+            ArtifactStore(tmp_path).save(old_variables)
+            
+            os.remove(file_path)
+            os.rename(tmp_path, file_path)
+        
+        ArtifactStore(file_path).save(variables)
         
     else:
         
@@ -19,11 +19,8 @@ Created on Mon Sep 10 09:16:51 2018
 #%% import necessary packages
 
 from matplotlib import pyplot as plt
-import numpy as np
 from sklearn import metrics
-import tensorflow as tf
-from my_input_fn import my_input_fn
-from construct_feature_columns import construct_feature_columns
+from TrainingEngine import TrainingEngine
 import pandas as pd
 
 #%% define function
@@ -57,51 +54,17 @@ def test_neural_network_classification_model(
         testing_targets: a single column of testing targets (DataFrame)
         
     Returns:
-        A `DNNClassifier` object trained on the training data
+        A `TrainingEngine` object trained on the training data
     '''
     
-    # create neural network classifier object
-    
-    if optimiser == 'GradientDescent':
-        my_optimiser = tf.train.GradientDescentOptimizer(learning_rate = learning_rate)
-    elif optimiser == 'ProximalGradientDescent':
-        my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate)
-        #my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate, l1_regularization_strength = 0.1) # for L1 regularisation
-        #my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate, l2_regularization_strength = 0.1) # for L2 regularisation
-    elif optimiser == 'Adagrad':
-        my_optimiser = tf.train.AdagradOptimizer(learning_rate = learning_rate) # for convex problems
-    elif optimiser == 'ProximalAdagrad':
-        my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate) # for convex problems
-        #my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate, l1_regularization_strength = 0.1) # for L1 regularisation
-        #my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate, l2_regularization_strength = 0.1) # for L2 regularisation
-    elif optimiser == 'Adam':
-        my_optimiser = tf.train.AdamOptimizer(learning_rate = learning_rate) # for non-convex problems
-    else:
-        print('Unknown optimiser type')
-    my_optimiser = tf.contrib.estimator.clip_gradients_by_norm(my_optimiser, 5.0)
-    dnn_classifier = tf.estimator.DNNClassifier(
-            feature_columns = construct_feature_columns(testing_features),
-            model_dir = model_dir,
-            n_classes = 2,
-            hidden_units = hidden_units,
-            weight_column = weight_column,
-            optimizer = my_optimiser,
-            activation_fn = tf.nn.relu,
-            dropout = dropout,
-            batch_norm = batch_norm)
-    
-    # define input function
-    
-    predict_testing_input_fn = lambda: my_input_fn(
-      testing_features, 
-      testing_targets, 
-      num_epochs = 1, 
-      shuffle = False)
+    # load the pretrained neural network classifier object (the architecture
+    # and weights are read from model_dir)
+    
+    dnn_classifier = TrainingEngine(optimiser = optimiser, learning_rate = learning_rate).load(model_dir)
     
     # calculate testing probabilities
             
-    testing_probabilities = dnn_classifier.predict(input_fn = predict_testing_input_fn)
-    testing_probabilities = np.array([item['probabilities'] for item in testing_probabilities])
+    testing_probabilities = dnn_classifier.predict(testing_features)
     
     # calculate loss
     
@@ -130,11 +93,12 @@ def test_neural_network_classification_model(
     
     print('LogLoss (on testing data): %0.2f' % testing_log_loss)
     
-    # calculate and print evaluation metrics
+    # calculate and print evaluation metrics (from the probabilities instead
+    # of evaluating the model again)
     
-    testing_evaluation_metrics = dnn_classifier.evaluate(input_fn = predict_testing_input_fn)
+    testing_auc = metrics.roc_auc_score(testing_targets, testing_probabilities)
 
-    print('AUC (on testing data): %0.2f' % testing_evaluation_metrics['auc'])
+    print('AUC (on testing data): %0.2f' % testing_auc)
     
     # convert outputs to pandas DataFrame
     
@@ -18,14 +18,11 @@ Created on Tue Oct 16 15:38:22 2018
 
 #%% import necessary packages
 
-from matplotlib import pyplot as plt
 import numpy as np
 from sklearn import metrics
-import tensorflow as tf
-from my_input_fn import my_input_fn
-from construct_feature_columns import construct_feature_columns
+from TrainingEngine import TrainingEngine
+from classification_metrics import classification_metrics
 import pandas as pd
-import seaborn as sns
 
 #%% define function
 
@@ -41,7 +38,8 @@ def test_neural_network_softmax_classification_model(
         optimiser,
         model_dir,
         testing_features,
-        testing_targets
+        testing_targets,
+        plot_figures = True
         ):
     
     '''
@@ -58,64 +56,30 @@ def test_neural_network_softmax_classification_model(
         model_dir: directory to save the checkpoint ('None' if no saving)
         testing_features: one or more columns of testing features (DataFrame)
         testing_targets: a single column of testing targets (DataFrame)
+        plot_figures: whether to plot (and save) the figures (True/False)
         
     Returns:
-        A `DNNClassifier` object trained on the training data
+        A `TrainingEngine` object trained on the training data
     '''
     
-    # create neural network classifier object
-    
-    if optimiser == 'GradientDescent':
-        my_optimiser = tf.train.GradientDescentOptimizer(learning_rate = learning_rate)
-    elif optimiser == 'ProximalGradientDescent':
-        my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate)
-        #my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate, l1_regularization_strength = 0.1) # for L1 regularisation
-        #my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate, l2_regularization_strength = 0.1) # for L2 regularisation
-    elif optimiser == 'Adagrad':
-        my_optimiser = tf.train.AdagradOptimizer(learning_rate = learning_rate) # for convex problems
-    elif optimiser == 'ProximalAdagrad':
-        my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate) # for convex problems
-        #my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate, l1_regularization_strength = 0.1) # for L1 regularisation
-        #my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate, l2_regularization_strength = 0.1) # for L2 regularisation
-    elif optimiser == 'Adam':
-        my_optimiser = tf.train.AdamOptimizer(learning_rate = learning_rate) # for non-convex problems
-    else:
-        print('Unknown optimiser type')
-    my_optimiser = tf.contrib.estimator.clip_gradients_by_norm(my_optimiser, 5.0)
-    dnn_classifier = tf.estimator.DNNClassifier(
-            feature_columns = construct_feature_columns(testing_features),
-            model_dir = model_dir,
-            n_classes = n_classes,
-            hidden_units = hidden_units,
-            weight_column = weight_column,
-            optimizer = my_optimiser,
-            activation_fn = tf.nn.relu,
-            dropout = dropout,
-            batch_norm = batch_norm)
-    
-    # define input functions
-    
-    predict_testing_input_fn = lambda: my_input_fn(
-      testing_features, 
-      testing_targets, 
-      num_epochs = 1, 
-      shuffle = False)
-
+    # load the pretrained neural network classifier object (the architecture
+    # and weights are read from model_dir)
+    
+    dnn_classifier = TrainingEngine(optimiser = optimiser, learning_rate = learning_rate).load(model_dir)
+    
     # calculate testing predictions
     
-    testing_predictions = list(dnn_classifier.predict(input_fn = predict_testing_input_fn))
-    testing_probabilities = np.array([item['probabilities'] for item in testing_predictions])    
-    testing_pred_class_id = np.array([item['class_ids'][0] for item in testing_predictions])
-    testing_pred_one_hot = tf.keras.utils.to_categorical(testing_pred_class_id, n_classes)  
+    testing_probabilities = dnn_classifier.predict(testing_features)
+    testing_pred_class_id = np.argmax(testing_probabilities, axis = 1)
     
-    # calculate loss
+    # calculate loss (from the probabilities)
     
-    testing_log_loss = metrics.log_loss(testing_targets, testing_pred_one_hot)
+    testing_metrics = classification_metrics(testing_targets, testing_probabilities)
+    testing_log_loss = testing_metrics['log_loss']
         
-    # Calculate final predictions (not probabilities, as above)
+    # final predictions are the classes with the highest probability
     
-    final_testing_predictions = dnn_classifier.predict(input_fn = predict_testing_input_fn)
-    final_testing_predictions = np.array([item['class_ids'][0] for item in final_testing_predictions])
+    final_testing_predictions = testing_pred_class_id
     
     # calculate accuracy
     
@@ -123,30 +87,39 @@ def test_neural_network_softmax_classification_model(
     
     print('Final accuracy (on testing data): %0.2f' % testing_accuracy)
         
-    # plot and save confusion matrix (testing)
-    
-    plt.figure(figsize = (6, 4))
-    
-    cm = metrics.confusion_matrix(testing_targets, final_testing_predictions)
-    # Normalize the confusion matrix by row (i.e by the number of samples in each class)
-    cm_normalized = cm.astype('float') / cm.sum(axis = 1)[:, np.newaxis]
-    ax = sns.heatmap(cm_normalized, cmap = 'bone_r')
-    ax.set_aspect(1)
-    #plt.title('Confusion matrix (testing)')
-    plt.ylabel('True label')
-    plt.xlabel('Predicted label')
-    
-    if model_dir is not None:
-        plt.savefig(model_dir + '\\' + 'confm_testing.eps', dpi = 600, format = 'eps',
-                    bbox_inches = 'tight', pad_inches = 0)
-        plt.savefig(model_dir + '\\' + 'confm_testing.pdf', dpi = 600, format = 'pdf',
-                    bbox_inches = 'tight', pad_inches = 0)
-        plt.savefig(model_dir + '\\' + 'confm_testing.png', dpi = 600, format = 'png',
-                    bbox_inches = 'tight', pad_inches = 0)
+    # plot figures (skipped in headless runs, where matplotlib is not imported)
+    
+    if plot_figures:
+        
+        from matplotlib import pyplot as plt
+        import seaborn as sns
+        
+        # plot and save confusion matrix (testing)
+    
+        plt.figure(figsize = (6, 4))
+    
+        cm = metrics.confusion_matrix(testing_targets, final_testing_predictions)
+        # Normalize the confusion matrix by row (i.e by the number of samples in each class)
+        cm_normalized = cm.astype('float') / cm.sum(axis = 1)[:, np.newaxis]
+        ax = sns.heatmap(cm_normalized, cmap = 'bone_r')
+        ax.set_aspect(1)
+        #plt.title('Confusion matrix (testing)')
+        plt.ylabel('True label')
+        plt.xlabel('Predicted label')
+    
+        if model_dir is not None:
+            plt.savefig(model_dir + '\\' + 'confm_testing.eps', dpi = 600, format = 'eps',
+                        bbox_inches = 'tight', pad_inches = 0)
+            plt.savefig(model_dir + '\\' + 'confm_testing.pdf', dpi = 600, format = 'pdf',
+                        bbox_inches = 'tight', pad_inches = 0)
+            plt.savefig(model_dir + '\\' + 'confm_testing.png', dpi = 600, format = 'png',
+                        bbox_inches = 'tight', pad_inches = 0)
     
     # display final errors
     
     print('Final LogLoss (on testing data): %0.2f' % testing_log_loss)
+    print('Final Brier score (on testing data): %0.2f' % testing_metrics['brier_score'])
+    print('Final calibration error (on testing data): %0.2f' % testing_metrics['ece'])
     
     # convert outputs to pandas DataFrame
     
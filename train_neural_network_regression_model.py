@@ -17,14 +17,7 @@ Created on Fri Jun  1 10:56:05 2018
 
 #%% import necessary packages
 
-import math
-
-from matplotlib import pyplot as plt
-import numpy as np
-from sklearn import metrics
-import tensorflow as tf
-from my_input_fn import my_input_fn
-from construct_feature_columns import construct_feature_columns
+from TrainingEngine import TrainingEngine
 import pandas as pd
 
 #%% define function
@@ -42,7 +35,9 @@ def train_neural_network_regression_model(
         training_features,
         training_targets,
         validation_features,
-        validation_targets
+        validation_targets,
+        plot_figures = True,
+        evaluation_steps = None
         ):
     
     '''
@@ -60,147 +55,102 @@ def train_neural_network_regression_model(
         training_targets: a single column of training targets (DataFrame)
         validation_features: one or more columns of validation features (DataFrame)
         validation_targets: a single column of validation targets (DataFrame)
+        plot_figures: whether to plot (and save) the figures (True/False)
+        evaluation_steps: number of training steps between the in-graph
+        evaluations of the training and validation sets (None evaluates after
+        each of ten periods)
         
     Returns:
-        A `DNNRegressor` object trained on the training data
+        A `TrainingEngine` object trained on the training data
     '''
     
-    # define periods
-    
-    periods = 10
-    steps_per_period = steps / periods
-    
     # create neural network regressor object
     
-    if optimiser == 'GradientDescent':
-        my_optimiser = tf.train.GradientDescentOptimizer(learning_rate = learning_rate)
-    elif optimiser == 'ProximalGradientDescent':
-        my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate)
-        #my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate, l1_regularization_strength = 0.1) # for L1 regularisation
-        #my_optimiser = tf.train.ProximalGradientDescentOptimizer(learning_rate = learning_rate, l2_regularization_strength = 0.1) # for L2 regularisation
-    elif optimiser == 'Adagrad':
-        my_optimiser = tf.train.AdagradOptimizer(learning_rate = learning_rate) # for convex problems
-    elif optimiser == 'ProximalAdagrad':
-        my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate) # for convex problems
-        #my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate, l1_regularization_strength = 0.1) # for L1 regularisation
-        #my_optimiser = tf.train.ProximalAdagradOptimizer(learning_rate = learning_rate, l2_regularization_strength = 0.1) # for L2 regularisation
-    elif optimiser == 'Adam':
-        my_optimiser = tf.train.AdamOptimizer(learning_rate = learning_rate) # for non-convex problems
-    else:
-        print('Unknown optimiser type')
-    my_optimiser = tf.contrib.estimator.clip_gradients_by_norm(my_optimiser, 5.0)
-    dnn_regressor = tf.estimator.DNNRegressor(
-            feature_columns = construct_feature_columns(training_features),
-            model_dir = model_dir,
+    dnn_regressor = TrainingEngine(
             hidden_units = hidden_units,
-            weight_column = weight_column,
-            optimizer = my_optimiser,
-            activation_fn = tf.nn.relu,
+            optimiser = optimiser,
+            learning_rate = learning_rate,
             dropout = dropout,
-            batch_norm = batch_norm)
-    
-    # define input functions
-    
-    training_input_fn = lambda: my_input_fn(
-      training_features, 
-      training_targets, 
-      batch_size = batch_size)
-    predict_training_input_fn = lambda: my_input_fn(
-      training_features, 
-      training_targets, 
-      num_epochs = 1, 
-      shuffle = False)
-    predict_validation_input_fn = lambda: my_input_fn(
-      validation_features, 
-      validation_targets, 
-      num_epochs = 1, 
-      shuffle = False)
+            batch_norm = batch_norm,
+            weight_column = weight_column)
     
     # print training progress
     
     print('Model training started')
     print('RMSE on training data:')
     
-    training_rmse = []
-    validation_rmse = []
-
-    for period in range (0, periods):
-               
-        # train the model
-               
-        dnn_regressor.train(
-                input_fn = training_input_fn,
-                steps = steps_per_period
-                )
-                
-        # compute predictions
-        
-        training_predictions = dnn_regressor.predict(input_fn = predict_training_input_fn)
-        training_predictions = np.array([item['predictions'][0] for item in training_predictions])
-        
-        validation_predictions = dnn_regressor.predict(input_fn = predict_validation_input_fn)
-        validation_predictions = np.array([item['predictions'][0] for item in validation_predictions])
-        
-        # calculate losses
-        
-        training_root_mean_squared_error = math.sqrt(
-                metrics.mean_squared_error(training_predictions, training_targets))
-        validation_root_mean_squared_error = math.sqrt(
-                metrics.mean_squared_error(validation_predictions, validation_targets))
-        
-        # print the current loss
-        
-        print('Period %02d: %0.2f' % (period, training_root_mean_squared_error))
-        
-        # add loss metrics to the list
-        
-        training_rmse.append(training_root_mean_squared_error)
-        validation_rmse.append(validation_root_mean_squared_error)
-        
-    print('Model training finished')
+    # train the model (the learning curves and the predictions of the last
+    # period are calculated from the evaluated sets)
     
-    # plot and save loss metrics over periods
+    history = dnn_regressor.fit(training_features, training_targets, steps, batch_size, 
+                                evaluation_steps = evaluation_steps, 
+                                evaluation_sets = {'training': (training_features, training_targets), 
+                                                   'validation': (validation_features, validation_targets)})
     
-    plt.figure(figsize = (6, 4))
+    training_rmse = history['training']['rmse']
+    validation_rmse = history['validation']['rmse']
     
-    plt.xlabel('Periods')
-    plt.ylabel('RMSE')
-    #plt.title('Root Mean Squared Error vs. Periods')
-    plt.tight_layout()
-    plt.grid()
-    plt.plot(training_rmse, label = 'Training')
-    plt.plot(validation_rmse, label = 'Validation')
-    plt.legend()
+    training_root_mean_squared_error = training_rmse[-1]
+    validation_root_mean_squared_error = validation_rmse[-1]
     
-    if model_dir is not None:
-        plt.savefig(model_dir + '\\' + 'RMSE.eps', dpi = 600, format = 'eps',
-                    bbox_inches = 'tight', pad_inches = 0)
-        plt.savefig(model_dir + '\\' + 'RMSE.pdf', dpi = 600, format = 'pdf',
-                    bbox_inches = 'tight', pad_inches = 0)
-        plt.savefig(model_dir + '\\' + 'RMSE.png', dpi = 600, format = 'png',
-                    bbox_inches = 'tight', pad_inches = 0)
-    
-    # plot and save predictions scatter plot
-    
-    plt.figure(figsize = (6, 4))
-    
-    plt.xlabel('Targets')
-    plt.ylabel('Predictions')
-    #plt.title('Prediction accuracy')
-    plt.tight_layout()
-    plt.grid()
-    plt.scatter(training_targets, training_predictions, label = 'Training')
-    plt.scatter(validation_targets, validation_predictions, label = 'Validation')
-    plt.plot([0, 100], [0, 100], color = 'k')
-    plt.legend()
+    training_predictions = history['training']['predictions']
+    validation_predictions = history['validation']['predictions']
+    
+    # save the model (only after the training)
     
     if model_dir is not None:
-        plt.savefig(model_dir + '\\' + 'accuracy.eps', dpi = 600, format = 'eps',
-                    bbox_inches = 'tight', pad_inches = 0)
-        plt.savefig(model_dir + '\\' + 'accuracy.pdf', dpi = 600, format = 'pdf',
-                    bbox_inches = 'tight', pad_inches = 0)
-        plt.savefig(model_dir + '\\' + 'accuracy.png', dpi = 600, format = 'png',
-                    bbox_inches = 'tight', pad_inches = 0)
+        dnn_regressor.save(model_dir)
+    
+    print('Model training finished')
+    
+    # plot figures (skipped in headless runs, where matplotlib is not imported)
+    
+    if plot_figures:
+        
+        from matplotlib import pyplot as plt
+        
+        # plot and save loss metrics over periods
+    
+        plt.figure(figsize = (6, 4))
+    
+        plt.xlabel('Periods')
+        plt.ylabel('RMSE')
+        #plt.title('Root Mean Squared Error vs. Periods')
+        plt.tight_layout()
+        plt.grid()
+        plt.plot(training_rmse, label = 'Training')
+        plt.plot(validation_rmse, label = 'Validation')
+        plt.legend()
+    
+        if model_dir is not None:
+            plt.savefig(model_dir + '\\' + 'RMSE.eps', dpi = 600, format = 'eps',
+                        bbox_inches = 'tight', pad_inches = 0)
+            plt.savefig(model_dir + '\\' + 'RMSE.pdf', dpi = 600, format = 'pdf',
+                        bbox_inches = 'tight', pad_inches = 0)
+            plt.savefig(model_dir + '\\' + 'RMSE.png', dpi = 600, format = 'png',
+                        bbox_inches = 'tight', pad_inches = 0)
+    
+        # plot and save predictions scatter plot
+    
+        plt.figure(figsize = (6, 4))
+    
+        plt.xlabel('Targets')
+        plt.ylabel('Predictions')
+        #plt.title('Prediction accuracy')
+        plt.tight_layout()
+        plt.grid()
+        plt.scatter(training_targets, training_predictions, label = 'Training')
+        plt.scatter(validation_targets, validation_predictions, label = 'Validation')
+        plt.plot([0, 100], [0, 100], color = 'k')
+        plt.legend()
+    
+        if model_dir is not None:
+            plt.savefig(model_dir + '\\' + 'accuracy.eps', dpi = 600, format = 'eps',
+                        bbox_inches = 'tight', pad_inches = 0)
+            plt.savefig(model_dir + '\\' + 'accuracy.pdf', dpi = 600, format = 'pdf',
+                        bbox_inches = 'tight', pad_inches = 0)
+            plt.savefig(model_dir + '\\' + 'accuracy.png', dpi = 600, format = 'png',
+                        bbox_inches = 'tight', pad_inches = 0)
     
     # display final errors
     